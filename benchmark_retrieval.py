@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark vector store ingestion, search latency, memory and recall on synthetic corpora
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+# Setup path to allow imports from the main project
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from electroninja.config.settings import Config
+from electroninja.benchmarks.retrieval import DEFAULT_SIZES, INDEX_CONFIGS, format_results, run_benchmark
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Corpus sizes")
+    parser.add_argument("--configs", nargs="+", choices=list(INDEX_CONFIGS), help="Index configurations (default: all)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Results per query and recall cut-off")
+    parser.add_argument("--dim", type=int, default=256, help="Fake embedding dimension")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed")
+    parser.add_argument("--output", help="JSON results file (default: data/benchmarks/retrieval-<timestamp>.json)")
+    parser.add_argument("--verbose", action="store_true", help="Show progress and per-query logging")
+    args = parser.parse_args()
+    # Per-search INFO logging would dominate the measured latencies.
+    logging.getLogger('electroninja').setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    run = run_benchmark(
+        sizes=args.sizes, configs=args.configs, num_queries=args.queries,
+        top_k=args.k, dim=args.dim, seed=args.seed
+    )
+    print(format_results(run))
+
+    output = args.output or os.path.join(
+        Config.BASE_DIR, "data", "benchmarks", f"retrieval-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0 if all("error" not in row for row in run["results"]) else 1
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(main())
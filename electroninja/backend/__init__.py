@@ -11,11 +11,14 @@ from electroninja.backend.chat_response_generator import ChatResponseGenerator
 from electroninja.backend.circuit_generator import CircuitGenerator
 from electroninja.backend.ltspice_manager import LTSpiceManager
 from electroninja.backend.vision_processor import VisionProcessor
+from electroninja.backend.pipeline import PipelineScheduler, RequestPipeline
 
 __all__ = [
     'RequestEvaluator',
     'ChatResponseGenerator',
     'CircuitGenerator',
     'LTSpiceManager',
-    'VisionProcessor'
+    'VisionProcessor',
+    'PipelineScheduler',
+    'RequestPipeline'
 ]
\ No newline at end of file
@@ -20,10 +20,13 @@ class CircuitGenerator:
             asc_code = "Version 4\nSHEET 1 880 680\n" + asc_code
         return asc_code
 
-    def generate_asc_code(self, description: str, prompt_id: int) -> str:
+    def generate_asc_code(self, description: str, prompt_id: int, on_partial=None) -> str:
         """
         Generates ASC code by retrieving examples, building a comprehensive prompt (with instructions),
         and then asking the provider to generate the code.
+
+        on_partial, if given, is called with the (header-complete) ASC code
+        generated so far while the provider streams its answer.
         """
         self.logger.info(f"Generating ASC code for circuit description: '{description}'")
         
@@ -31,7 +34,8 @@ class CircuitGenerator:
         examples = self.vector_store.search(description, top_k=3)
 
         # Generate ASC code using the provider, passing prompt_id to load components/instructions.
-        asc_code = self.provider.generate_asc_code(description, examples, prompt_id)
+        progress = (lambda partial: on_partial(self._ensure_header(partial))) if on_partial else None
+        asc_code = self.provider.generate_asc_code(description, examples, prompt_id, on_partial=progress)
         clean_asc = self.provider.extract_clean_asc_code(asc_code)
         final_asc = self._ensure_header(clean_asc)
         
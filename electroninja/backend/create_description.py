@@ -12,6 +12,9 @@ class CreateDescription:
         self.provider = openai_provider
         self.logger = logger
 
+    def _description_path(self, prompt_id: int) -> str:
+        return os.path.join(self.provider.config.OUTPUT_DIR, f"prompt{prompt_id}", "description.txt")
+
     def create_description(self, previous_description: str, new_request: str) -> str:
         """
         Creates a circuit description by merging a previous description with a new modification request.
@@ -26,13 +29,11 @@ class CreateDescription:
         
     def save_description(self, description: str, prompt_id: int) -> str:
         """
-        Saves the circuit description to a file in the output/prompt<n> directory.
+        Saves the circuit description to a file in the {OUTPUT_DIR}/prompt<n> directory.
         Returns the path to the saved file.
         """
-        output_dir = os.path.join("data", "output", f"prompt{prompt_id}")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        description_path = os.path.join(output_dir, "description.txt")
+        description_path = self._description_path(prompt_id)
+        os.makedirs(os.path.dirname(description_path), exist_ok=True)
         with open(description_path, "w", encoding="utf-8") as f:
             f.write(description)
             
@@ -41,10 +42,10 @@ class CreateDescription:
 
     def load_description(self, prompt_id: int) -> str:
         """
-        Loads the circuit description from a file in the output/prompt<n> directory.
+        Loads the circuit description from a file in the {OUTPUT_DIR}/prompt<n> directory.
         Returns None if the file doesn't exist.
         """
-        description_path = os.path.join("data", "output", f"prompt{prompt_id}", "description.txt")
+        description_path = self._description_path(prompt_id)
         
         if not os.path.exists(description_path):
             self.logger.info(f"No previous description found at: {description_path}")
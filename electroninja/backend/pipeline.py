@@ -0,0 +1,257 @@
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
+from electroninja.llm.metrics import metrics_session
+from electroninja.backend.request_evaluator import RequestEvaluator
+from electroninja.backend.create_description import CreateDescription
+
+logger = logging.getLogger('electroninja')
+
+def is_circuit_request(evaluation: str) -> bool:
+    """True unless the evaluator answered 'N'."""
+    return evaluation is not None and evaluation.strip().upper() != "N"
+
+class PipelineScheduler:
+    """
+    Runs a graph of named stages on the event loop, each as soon as it can start.
+
+    A stage waits only for the stages it depends on and receives their results
+    as keyword arguments, so independent stages overlap. A stage can also be
+    speculative: it starts right away, but is cancelled as soon as a stage it
+    watches finishes with a result for which its cancel_if predicate is true
+    (e.g. the description is dropped when the evaluator answers 'N'). Stages
+    that depend on a cancelled stage are cancelled, and those that depend on
+    a failed stage fail with the same error.
+
+    Coroutine functions are awaited; plain functions run in a worker thread.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def add_stage(self, name: str, func: Callable, depends_on: Iterable[str] = (),
+                  cancel_if: Optional[Dict[str, Callable[[Any], bool]]] = None) -> None:
+        """
+        Args:
+            name (str): Stage name, also the keyword its result is passed as.
+            func (callable): Called with the results of depends_on as keyword arguments.
+            depends_on (iterable): Stages that must finish first.
+            cancel_if (dict): Watched stage -> predicate on its result; the stage is
+                cancelled when a predicate returns True. Watched stages are not waited for.
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        self._stages[name] = {
+            "func": func,
+            "depends_on": list(depends_on),
+            "cancel_if": dict(cancel_if or {}),
+        }
+
+    def order(self) -> List[str]:
+        """
+        Returns:
+            list: Stage names in dependency order.
+
+        Raises:
+            ValueError: If a stage refers to an unknown stage or the dependencies form a cycle.
+        """
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if name not in self._stages:
+                raise ValueError(f"Unknown pipeline stage {name!r} (needed by {path[-1]!r})")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Pipeline stages form a cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            stage = self._stages[name]
+            for dependency in stage["depends_on"] + list(stage["cancel_if"]):
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self._stages:
+            visit(name, [name])
+        return order
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every stage.
+
+        Returns:
+            dict: Per stage {"status": "done", "cancelled" or "failed", "result",
+            "error", "start", "end"}, with times in seconds from the start of the run.
+        """
+        order = self.order()
+        begin = time.perf_counter()
+        report: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "result": None, "error": None, "start": None, "end": None}
+            for name in order
+        }
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def should_cancel(name: str) -> bool:
+            for watched, predicate in self._stages[name]["cancel_if"].items():
+                task = tasks[watched]
+                if task.done() and not task.cancelled() and task.exception() is None and predicate(task.result()):
+                    return True
+            return False
+
+        async def run_stage(name: str) -> Any:
+            stage = self._stages[name]
+            inputs = {}
+            for dependency in stage["depends_on"]:
+                inputs[dependency] = await tasks[dependency]
+            if should_cancel(name):
+                raise asyncio.CancelledError()
+            report[name]["start"] = time.perf_counter() - begin
+            if asyncio.iscoroutinefunction(stage["func"]):
+                return await stage["func"](**inputs)
+            return await asyncio.to_thread(stage["func"], **inputs)
+
+        def finished(name: str) -> Callable[[asyncio.Task], None]:
+            def on_done(_):
+                report[name]["end"] = time.perf_counter() - begin
+            return on_done
+
+        for name in order:
+            tasks[name] = asyncio.create_task(run_stage(name), name=f"pipeline:{name}")
+            tasks[name].add_done_callback(finished(name))
+
+        def watch(name: str) -> None:
+            def on_done(_):
+                if not tasks[name].done() and should_cancel(name):
+                    logger.info(f"Cancelling speculative pipeline stage: {name}")
+                    tasks[name].cancel()
+            for watched in self._stages[name]["cancel_if"]:
+                tasks[watched].add_done_callback(on_done)
+
+        for name in order:
+            watch(name)
+
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for name, task in tasks.items():
+            entry = report[name]
+            if task.cancelled():
+                entry["status"] = "cancelled"
+            elif task.exception() is not None:
+                entry["status"] = "failed"
+                entry["error"] = task.exception()
+                logger.error(f"Pipeline stage {name} failed: {str(task.exception())}")
+            else:
+                entry["status"] = "done"
+                entry["result"] = task.result()
+        return report
+
+class RequestPipeline:
+    """
+    The stages of a new request that do not depend on each other, run concurrently.
+
+    The circuit relevance evaluation, the chat reply and the description are
+    started together instead of one after another. The description is
+    speculative: it is cancelled when the evaluator answers 'N'. Components
+    are saved as soon as they are known, and the description once the
+    evaluator has confirmed a circuit request.
+
+    Stage graph (arrows are dependencies, ~> is cancel-on-'N'):
+
+        evaluate -> save_components
+        chat
+        load_previous -> describe -> save_description
+        evaluate -> save_description
+        evaluate ~> describe, save_components, save_description
+
+    Further stages can be added to `scheduler` before `process` runs them,
+    e.g. a generation stage depending on "describe".
+    """
+
+    def __init__(self, provider: AsyncOpenAIProvider, request_evaluator: RequestEvaluator,
+                 description_creator: CreateDescription):
+        self.provider = provider
+        self.request_evaluator = request_evaluator
+        self.description_creator = description_creator
+        self.logger = logger
+
+    def build(self, prompt: str, prompt_id: int, previous_prompt_id: Optional[int] = None) -> PipelineScheduler:
+        """
+        Returns:
+            PipelineScheduler: The stage graph for one request, ready to run.
+        """
+        not_circuit = lambda evaluation: not is_circuit_request(evaluation)
+        scheduler = PipelineScheduler()
+
+        async def evaluate():
+            return await self.provider.evaluate_circuit_request(prompt)
+
+        async def chat():
+            return await self.provider.generate_chat_response(prompt)
+
+        def load_previous():
+            if previous_prompt_id is None:
+                return None
+            return self.description_creator.load_description(previous_prompt_id)
+
+        async def describe(load_previous):
+            return await self.provider.create_description(load_previous, prompt)
+
+        def save_components(evaluate):
+            if previous_prompt_id is not None:
+                return self.request_evaluator.merge_components(evaluate, previous_prompt_id, prompt_id)
+            self.request_evaluator.save_components(evaluate, prompt_id)
+            return evaluate
+
+        def save_description(describe, evaluate):
+            return self.description_creator.save_description(describe, prompt_id)
+
+        scheduler.add_stage("evaluate", evaluate)
+        scheduler.add_stage("chat", chat)
+        scheduler.add_stage("load_previous", load_previous)
+        scheduler.add_stage("describe", describe, depends_on=["load_previous"], cancel_if={"evaluate": not_circuit})
+        scheduler.add_stage("save_components", save_components, depends_on=["evaluate"],
+                            cancel_if={"evaluate": not_circuit})
+        # Waits for the evaluation too: describe can finish before it answers 'N'
+        scheduler.add_stage("save_description", save_description, depends_on=["describe", "evaluate"],
+                            cancel_if={"evaluate": not_circuit})
+        return scheduler
+
+    async def process(self, prompt: str, prompt_id: int, previous_prompt_id: Optional[int] = None,
+                      scheduler: Optional[PipelineScheduler] = None) -> Dict[str, Any]:
+        """
+        Evaluate a request, write the chat reply and the description concurrently.
+
+        Args:
+            prompt (str): The user's request.
+            prompt_id (int): Identifier of this request's output folder.
+            previous_prompt_id (int): The request this one modifies, if any.
+            scheduler (PipelineScheduler): A graph from build() with extra stages.
+
+        Returns:
+            dict: {"evaluation", "is_circuit", "components", "description" (None when
+            not a circuit request), "chat_response", "stages" (the scheduler's report),
+            "metrics" (the MetricsRegistry of the model calls made)}.
+        """
+        scheduler = scheduler or self.build(prompt, prompt_id, previous_prompt_id)
+        self.logger.info(f"Running request pipeline for prompt {prompt_id}: {scheduler.order()}")
+        # Model calls made by the stages are attributed to this prompt's metrics
+        # session, which is closed with the pipeline and returned with its result
+        with metrics_session(f"prompt{prompt_id}", close=True) as metrics:
+            stages = await scheduler.run()
+        evaluation = stages["evaluate"]["result"]
+        is_circuit = is_circuit_request(evaluation)
+        timings = ", ".join(
+            f"{name} {entry['status']} {entry['end']:.2f}s" for name, entry in stages.items()
+        )
+        self.logger.info(f"Request pipeline finished: {timings}")
+        return {
+            "evaluation": evaluation,
+            "is_circuit": is_circuit,
+            "components": stages["save_components"]["result"],
+            "description": stages["describe"]["result"] if is_circuit else None,
+            "chat_response": stages["chat"]["result"],
+            "stages": stages,
+            "metrics": metrics,
+        }
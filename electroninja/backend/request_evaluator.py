@@ -1,6 +1,7 @@
 import logging
 import os
 from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.asc_parser import component_instances, component_letters
 
 logger = logging.getLogger('electroninja')
 
@@ -13,11 +14,15 @@ class RequestEvaluator:
         self.provider = openai_provider
         self.logger = logger
 
+    def _prompt_dir(self, prompt_id: int) -> str:
+        """The output folder of a prompt, {OUTPUT_DIR}/prompt{prompt_id}, whatever the working directory."""
+        return os.path.join(self.provider.config.OUTPUT_DIR, f"prompt{prompt_id}")
+
     def evaluate_request(self, prompt: str, prompt_id: int) -> str:
         """
         Evaluates a user request. If the request is circuit-related, the model returns component letters 
         (e.g., "R, C"). Otherwise, it returns 'N'. If the result is not 'N', the components are saved 
-        to data/output/prompt{prompt_id}/components.txt.
+        to {OUTPUT_DIR}/prompt{prompt_id}/components.txt.
         
         Args:
             prompt (str): The user's request.
@@ -45,7 +50,7 @@ class RequestEvaluator:
 
     def save_components(self, components: str, prompt_id: int) -> str:
         """
-        Saves the evaluation result (component letters) to data/output/prompt{prompt_id}/components.txt.
+        Saves the evaluation result (component letters) to {OUTPUT_DIR}/prompt{prompt_id}/components.txt.
         
         Args:
             components (str): The evaluation output (e.g., "R, C").
@@ -58,7 +63,7 @@ class RequestEvaluator:
             self.logger.info("Evaluation result is 'N'; nothing to save.")
             return None
 
-        output_dir = os.path.join("data", "output", f"prompt{prompt_id}")
+        output_dir = self._prompt_dir(prompt_id)
         os.makedirs(output_dir, exist_ok=True)
         file_path = os.path.join(output_dir, "components.txt")
         try:
@@ -72,7 +77,7 @@ class RequestEvaluator:
 
     def load_components(self, prompt_id: int) -> str:
         """
-        Loads the evaluation components from data/output/prompt{prompt_id}/components.txt.
+        Loads the evaluation components from {OUTPUT_DIR}/prompt{prompt_id}/components.txt.
         
         Args:
             prompt_id (int): The prompt/session identifier.
@@ -80,7 +85,7 @@ class RequestEvaluator:
         Returns:
             str: The loaded components string, or None if the file does not exist.
         """
-        file_path = os.path.join("data", "output", f"prompt{prompt_id}", "components.txt")
+        file_path = os.path.join(self._prompt_dir(prompt_id), "components.txt")
         if not os.path.exists(file_path):
             self.logger.info(f"Components file not found: {file_path}")
             return None
@@ -113,7 +118,7 @@ class RequestEvaluator:
             merged_components = new_components.strip()
 
         # Save the merged components into the current prompt folder.
-        output_dir = os.path.join("data", "output", f"prompt{current_prompt_id}")
+        output_dir = self._prompt_dir(current_prompt_id)
         os.makedirs(output_dir, exist_ok=True)
         file_path = os.path.join(output_dir, "components.txt")
         try:
@@ -126,7 +131,10 @@ class RequestEvaluator:
     
     def list_components(self, prompt_id: int) -> str:
         """
-        Lists the components based on the code in the file in data/output/prompt{prompt_id}/output0/code.asc
+        Lists the components based on the code in the file in {OUTPUT_DIR}/prompt{prompt_id}/output0/code.asc
+        
+        The letters are read from the SYMBOL lines of the file. The LLM is only
+        asked when COMPONENT_LISTING_LLM_FALLBACK is on and no component could be parsed.
         
         Args:
             prompt_id (int): The prompt/session identifier.
@@ -134,19 +142,26 @@ class RequestEvaluator:
         Returns:
             str: The components string, or None if the file does not exist.
         """
-        asc_path = os.path.join("data", "output", f"prompt{prompt_id}", "output0", "code.asc")
+        asc_path = os.path.join(self._prompt_dir(prompt_id), "output0", "code.asc")
         if not os.path.exists(asc_path):
             self.logger.info(f"ASC file not found: {asc_path}")
             return None
         
-        output_dir = os.path.join("data", "output", f"prompt{prompt_id}")
+        output_dir = self._prompt_dir(prompt_id)
         os.makedirs(output_dir, exist_ok=True)
         file_path = os.path.join(output_dir, "components.txt")
         
         try:
             with open(asc_path, "r", encoding="utf-8") as f:
                 asc_code = f.read()
-            components = self.provider.list_components(asc_code)
+            instances = component_instances(asc_code)
+            components = component_letters(asc_code)
+            self.logger.info(
+                "Components parsed from ASC: "
+                + (", ".join(f"{i['name'] or i['symbol']}={i['value']}" for i in instances) or "none")
+            )
+            if not components and self.provider.config.COMPONENT_LISTING_LLM_FALLBACK:
+                components = self.provider.list_components(asc_code)
             self.logger.info(f"Components extracted from {asc_path}: {components}")
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(components)
@@ -18,6 +18,10 @@ class VisionProcessor:
         self.vision_analyzer = VisionAnalyzer(self.config)
         self.logger = logger
 
+    def _prompt_file(self, prompt_id: int, *parts: str) -> str:
+        """Path of a file in the output folder of a prompt, {OUTPUT_DIR}/prompt{prompt_id}."""
+        return os.path.join(self.config.OUTPUT_DIR, f"prompt{prompt_id}", *parts)
+
     def analyze_circuit_image(self, prompt_id: int, iteration: int) -> str:
         """
         Analyzes the circuit image against the saved circuit description for the given prompt and iteration.
@@ -30,11 +34,11 @@ class VisionProcessor:
             str: 'Y' if the circuit is verified, or an analytical explanation if not.
         """
         # Build the image path based on prompt_id and iteration
-        image_path = os.path.join("data", "output", f"prompt{prompt_id}", f"output{iteration}", "image.png")
+        image_path = self._prompt_file(prompt_id, f"output{iteration}", "image.png")
         self.logger.info(f"Analyzing circuit image from: '{image_path}' for prompt ID: {prompt_id}, iteration: {iteration}")
         
         # Load the circuit description from file
-        description_path = os.path.join("data", "output", f"prompt{prompt_id}", "description.txt")
+        description_path = self._prompt_file(prompt_id, "description.txt")
         if not os.path.exists(description_path):
             error_msg = f"Description file not found: {description_path}"
             self.logger.error(error_msg)
@@ -86,7 +90,7 @@ class VisionProcessor:
             str: The generated circuit description.
         """
         # Load the circuit image
-        image_path = os.path.join("data", "output", f"prompt{prompt_id}", "output0", "image.png")
+        image_path = self._prompt_file(prompt_id, "output0", "image.png")
         if not os.path.exists(image_path):
             error_msg = f"Image file not found: {image_path}"
             self.logger.error(error_msg)
@@ -98,7 +102,7 @@ class VisionProcessor:
         description = self.vision_analyzer.produce_description_of_image(image_path, prompt)
         
         # Save the description to a file
-        description_path = os.path.join("data", "output", f"prompt{prompt_id}", "description.txt")
+        description_path = self._prompt_file(prompt_id, "description.txt")
         with open(description_path, "w", encoding="utf-8") as f:
             f.write(description)
         
@@ -0,0 +1,208 @@
+# electroninja/benchmarks/retrieval.py
+
+import os
+import sys
+import time
+import shutil
+import logging
+import platform
+import tempfile
+import subprocess
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+from electroninja.config.settings import Config
+from electroninja.llm.vector_store import VectorStore
+from electroninja.llm.vector_compression import recall_at_k
+from electroninja.benchmarks.synthetic import FakeEmbedder, synthetic_corpus, synthetic_queries
+
+logger = logging.getLogger('electroninja')
+
+# Index configurations: VECTOR_INDEX_FACTORY and VECTOR_INDEX_STORAGE overrides.
+INDEX_CONFIGS = {
+    "flat": {"VECTOR_INDEX_FACTORY": "Flat"},
+    "auto": {"VECTOR_INDEX_FACTORY": "auto"},
+    "auto-sq8": {"VECTOR_INDEX_FACTORY": "auto", "VECTOR_INDEX_STORAGE": "sq8"},
+    "auto-pq": {"VECTOR_INDEX_FACTORY": "auto", "VECTOR_INDEX_STORAGE": "pq"},
+    "hnsw": {"VECTOR_INDEX_FACTORY": "HNSW32"},
+}
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+def rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        # /proc is enough on Linux when psutil is not installed.
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def _percentile_ms(latencies: List[float], q: float) -> float:
+    return float(np.percentile(np.array(latencies) * 1000, q))
+
+def _benchmark_config(name: str, overrides: Dict[str, Any], texts: List[str], metadatas: List[Dict[str, Any]],
+                      queries: List[str], truth: np.ndarray, embedder: FakeEmbedder, work_dir: str,
+                      top_k: int) -> Dict[str, Any]:
+    """Ingest the corpus with one index configuration, then load it as a reader and query it."""
+    config = Config()
+    for setting, path in vars(Config).items():
+        if setting.startswith("VECTOR_DB_") and isinstance(path, str) and setting != "VECTOR_DB_DIR":
+            setattr(config, setting, os.path.join(work_dir, os.path.basename(path)))
+    config.EMBEDDING_CACHE_ENABLED = False
+    config.VECTOR_DB_RELOAD_INTERVAL = 0
+    for setting, value in overrides.items():
+        setattr(config, setting, value)
+
+    # Ingestion mirrors ingest_examples: batched adds, index type check, training, snapshot.
+    start = time.perf_counter()
+    writer = VectorStore(config, embedder=embedder)
+    writer.add_documents(texts, metadatas)
+    writer.ensure_index_type()
+    writer.train_index()
+    if not writer.save():
+        raise RuntimeError(f"Saving the {name} index failed")
+    ingest_seconds = time.perf_counter() - start
+    factory = writer.index_factory
+    del writer
+
+    # A fresh reader opens the snapshot as serving workers do (memory-mapped).
+    rss_before = rss_bytes()
+    reader = VectorStore(config, embedder=embedder)
+    reader.search(queries[0], top_k=top_k)
+    latencies = []
+    found = np.full((len(queries), top_k), -1, dtype=np.int64)
+    for row, query in enumerate(queries):
+        start = time.perf_counter()
+        results = reader.search(query, top_k=top_k)
+        latencies.append(time.perf_counter() - start)
+        for col, result in enumerate(results):
+            found[row, col] = result["metadata"]["doc_index"]
+    rss_after = rss_bytes()
+
+    snapshot_dir = os.path.dirname(reader._paths["index"])
+    result = {
+        "config": name,
+        "factory": factory,
+        "size": len(texts),
+        "ingest_seconds": ingest_seconds,
+        "ingest_docs_per_second": len(texts) / ingest_seconds if ingest_seconds else None,
+        "search_p50_ms": _percentile_ms(latencies, 50),
+        "search_p99_ms": _percentile_ms(latencies, 99),
+        "search_mean_ms": float(np.mean(latencies) * 1000),
+        f"recall@{top_k}": recall_at_k(truth, found, top_k),
+        "index_bytes": os.path.getsize(reader._paths["index"]),
+        "snapshot_bytes": sum(os.path.getsize(os.path.join(snapshot_dir, f)) for f in os.listdir(snapshot_dir)),
+        "rss_mb": rss_after / 2**20,
+        "reader_rss_delta_mb": (rss_after - rss_before) / 2**20,
+    }
+    reader.documents.close()
+    return result
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES, configs: Optional[Sequence[str]] = None,
+                  num_queries: int = 200, top_k: int = 10, dim: int = 256, seed: int = 0,
+                  work_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Benchmark VectorStore ingestion and search on synthetic corpora.
+
+    For every corpus size and index configuration the corpus is ingested into
+    a fresh store, which is then reopened as a reader and queried with
+    synthetic user requests. Search latency is end to end (query embedding
+    with the fake embedder plus index search and document decoding). Recall
+    is measured against exact search over the same embeddings.
+
+    Args:
+        sizes (list): Corpus sizes.
+        configs (list, optional): Names from INDEX_CONFIGS. Defaults to all.
+        num_queries (int): Queries per configuration.
+        top_k (int): Results per query, and the k of recall@k.
+        dim (int): Embedding dimension of the fake embedder.
+        seed (int): Seed for the corpus and the queries.
+        work_dir (str, optional): Where stores are written. Defaults to a temp directory.
+
+    Returns:
+        dict: Run metadata under "environment" and "params", and one entry per
+        (size, configuration) under "results".
+    """
+    configs = list(configs or INDEX_CONFIGS)
+    unknown = [name for name in configs if name not in INDEX_CONFIGS]
+    if unknown:
+        raise ValueError(f"Unknown index configurations: {', '.join(unknown)}")
+
+    import faiss
+    base_dir = work_dir or tempfile.mkdtemp(prefix="electroninja-bench-")
+    results = []
+    try:
+        for size in sizes:
+            logger.info(f"Generating synthetic corpus of {size} examples")
+            texts, metadatas = synthetic_corpus(size, seed=seed)
+            queries = synthetic_queries(num_queries, seed=seed + 1)
+            embedder = FakeEmbedder(dim)
+            exact = faiss.IndexFlatIP(dim)
+            exact.add(embedder.embed(texts))
+            _, truth = exact.search(embedder.embed(queries), top_k)
+            del exact
+
+            for name in configs:
+                logger.info(f"Benchmarking {name} on {size} examples")
+                store_dir = os.path.join(base_dir, f"{name}-{size}")
+                os.makedirs(store_dir, exist_ok=True)
+                try:
+                    results.append(_benchmark_config(
+                        name, INDEX_CONFIGS[name], texts, metadatas, queries, truth,
+                        embedder, store_dir, top_k
+                    ))
+                except Exception as e:
+                    logger.error(f"Benchmark {name} on {size} examples failed: {str(e)}")
+                    results.append({"config": name, "size": size, "error": str(e)})
+                finally:
+                    shutil.rmtree(store_dir, ignore_errors=True)
+    finally:
+        if work_dir is None:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    return {
+        "environment": _environment(faiss),
+        "params": {
+            "sizes": list(sizes), "configs": configs, "num_queries": num_queries,
+            "top_k": top_k, "dim": dim, "seed": seed, "embedder": FakeEmbedder(dim).name,
+        },
+        "results": results,
+    }
+
+def _environment(faiss) -> Dict[str, Any]:
+    """Describe the code and machine a run was made on, so runs can be compared."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", None),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def format_results(run: Dict[str, Any]) -> str:
+    """Render benchmark results as a plain-text table."""
+    top_k = run["params"]["top_k"]
+    header = (f"{'size':>7} {'config':<9} {'factory':<16} {'docs/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'R@' + str(top_k):>6} {'index MB':>9} {'RSS MB':>8}")
+    lines = [header, "-" * len(header)]
+    for row in run["results"]:
+        prefix = f"{row['size']:>7} {row['config']:<9}"
+        if "error" in row:
+            lines.append(f"{prefix} failed: {row['error'][:70]}")
+            continue
+        lines.append(
+            f"{prefix} {row['factory']:<16} {row['ingest_docs_per_second']:>9.0f} "
+            f"{row['search_p50_ms']:>8.2f} {row['search_p99_ms']:>8.2f} {row[f'recall@{top_k}']:>6.3f} "
+            f"{row['index_bytes'] / 2**20:>9.2f} {row['rss_mb']:>8.1f}"
+        )
+    return "\n".join(lines)
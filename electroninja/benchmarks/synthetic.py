@@ -0,0 +1,186 @@
+# electroninja/benchmarks/synthetic.py
+
+import re
+import hashlib
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Tuple
+from electroninja.llm.embedders import Embedder
+
+# E12 mantissas used for generated component values.
+_E12 = (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2)
+_PREFIXES = ((1e-12, "p"), (1e-9, "n"), (1e-6, "u"), (1e-3, "m"), (1.0, ""), (1e3, "k"), (1e6, "Meg"))
+
+# Circuit families: component symbols in placement order and description phrasings.
+# "{R1}", "{C1}", ... are replaced by the generated values, "{V1}" by the source voltage.
+_TEMPLATES = [
+    ("voltage divider", ["voltage", "res", "res"], [
+        "A voltage divider that scales a {V1}V DC source with {R1} and {R2} resistors in series.",
+        "Resistive divider: {R1} on top and {R2} on the bottom, fed from {V1}V.",
+    ]),
+    ("series resistors", ["voltage", "res", "res", "res"], [
+        "Three resistors ({R1}, {R2} and {R3}) connected in series across a {V1}V supply.",
+        "A series resistor chain of {R1}, {R2} and {R3} powered by a {V1}V DC source.",
+    ]),
+    ("rc low-pass filter", ["voltage", "res", "cap"], [
+        "An RC low-pass filter using a {R1} resistor and a {C1} capacitor driven by {V1}V.",
+        "First-order low pass filter: series {R1} resistor, {C1} capacitor to ground, {V1}V input.",
+    ]),
+    ("rc high-pass filter", ["voltage", "cap", "res"], [
+        "An RC high-pass filter with a {C1} series capacitor and a {R1} resistor to ground, {V1}V source.",
+        "First-order high pass filter built from {C1} and {R1}, driven by a {V1}V signal.",
+    ]),
+    ("lc tank", ["voltage", "ind", "cap"], [
+        "A parallel LC tank circuit with a {L1} inductor and a {C1} capacitor excited by {V1}V.",
+        "Resonant LC circuit: {L1} inductor in parallel with {C1}, driven from a {V1}V source.",
+    ]),
+    ("rlc circuit", ["voltage", "res", "ind", "cap"], [
+        "A series RLC circuit with {R1}, {L1} and {C1} connected to a {V1}V source.",
+        "Damped series resonant circuit using a {R1} resistor, {L1} inductor and {C1} capacitor at {V1}V.",
+    ]),
+    ("half-wave rectifier", ["voltage", "diode", "res"], [
+        "A half-wave rectifier: a diode in series with a {R1} load resistor, {V1}V AC input.",
+        "Single diode rectifier feeding a {R1} load from a {V1}V source.",
+    ]),
+    ("zener regulator", ["voltage", "res", "zener"], [
+        "A zener diode voltage regulator with a {R1} series resistor from a {V1}V supply.",
+        "Shunt regulator: {R1} current limiting resistor and a zener diode, {V1}V input.",
+    ]),
+    ("led current limiter", ["voltage", "res", "diode"], [
+        "An LED driven from {V1}V through a {R1} current limiting resistor.",
+        "Current limited LED circuit with a {R1} resistor and a {V1}V DC source.",
+    ]),
+    ("capacitive divider", ["voltage", "cap", "cap"], [
+        "A capacitive voltage divider with {C1} and {C2} capacitors across a {V1}V source.",
+        "Two series capacitors, {C1} and {C2}, dividing a {V1}V supply.",
+    ]),
+]
+
+_PREFIX_LETTERS = {"voltage": "V", "res": "R", "cap": "C", "ind": "L", "diode": "D", "zener": "D"}
+_UNIT_SUFFIX = {"R": "Ω", "C": "F", "L": "H"}
+_DECADES = {"R": (1.0, 1e6), "C": (1e-12, 1e-4), "L": (1e-9, 1e-1)}
+
+def _format_value(value: float) -> str:
+    """Format a value with an LTspice multiplier suffix, e.g. 4700 -> "4.7k"."""
+    for scale, prefix in reversed(_PREFIXES):
+        if value >= scale * 0.999:
+            return f"{value / scale:g}{prefix}"
+    return f"{value:g}"
+
+def _random_value(rng: np.random.Generator, letter: str) -> float:
+    low, high = _DECADES[letter]
+    exponent = rng.integers(int(np.log10(low)), int(np.log10(high)))
+    return float(rng.choice(_E12)) * 10.0 ** int(exponent)
+
+def _asc_code(symbols: List[str], values: Dict[str, str]) -> str:
+    """Lay components out left to right between a top rail and ground, as our examples do."""
+    lines = ["Version 4", "SHEET 1 880 680"]
+    xs = [80 + 144 * i for i in range(len(symbols))]
+    for left, right in zip(xs, xs[1:]):
+        lines.append(f"WIRE {right} 80 {left} 80")
+        lines.append(f"WIRE {right} 240 {left} 240")
+    for x in xs:
+        lines.append(f"WIRE {x} 128 {x} 80")
+        lines.append(f"WIRE {x} 240 {x} 208")
+    lines.append(f"FLAG {xs[0]} 240 0")
+    counters: Counter = Counter()
+    for x, symbol in zip(xs, symbols):
+        letter = _PREFIX_LETTERS[symbol]
+        counters[letter] += 1
+        name = f"{letter}{counters[letter]}"
+        lines.append(f"SYMBOL {symbol} {x - 16} 112 R0")
+        lines.append(f"SYMATTR InstName {name}")
+        if name in values:
+            lines.append(f"SYMATTR Value {values[name]}")
+    return "\n".join(lines)
+
+def synthetic_example(rng: np.random.Generator) -> Tuple[str, str, str]:
+    """
+    Generate one random circuit.
+
+    Returns:
+        tuple: (circuit family, description, ASC code)
+    """
+    family, symbols, phrasings = _TEMPLATES[rng.integers(len(_TEMPLATES))]
+    values: Dict[str, str] = {}
+    labels: Dict[str, str] = {}
+    counters: Counter = Counter()
+    for symbol in symbols:
+        letter = _PREFIX_LETTERS[symbol]
+        counters[letter] += 1
+        name = f"{letter}{counters[letter]}"
+        if letter == "V":
+            volts = int(rng.choice([3, 5, 9, 12, 15, 24]))
+            values[name] = str(volts)
+            labels[name] = str(volts)
+        elif letter in _DECADES:
+            text = _format_value(_random_value(rng, letter))
+            values[name] = text
+            labels[name] = text + _UNIT_SUFFIX[letter]
+    description = phrasings[rng.integers(len(phrasings))].format(**labels)
+    return family, description, _asc_code(symbols, values)
+
+def synthetic_corpus(size: int, seed: int = 0) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Generate `size` examples shaped like the ones ingest_examples stores.
+
+    Returns:
+        tuple: (texts to embed, metadata dicts with description, pure_asc_code,
+        asc_path and the example's position as doc_index)
+    """
+    rng = np.random.default_rng(seed)
+    texts, metadatas = [], []
+    for i in range(size):
+        family, description, asc_code = synthetic_example(rng)
+        texts.append(f"{description}\n\n{asc_code}")
+        metadatas.append({
+            "asc_path": f"synthetic/{family.replace(' ', '_')}_{i}.asc",
+            "description": description,
+            "pure_asc_code": asc_code,
+            "doc_index": i,
+        })
+    return texts, metadatas
+
+def synthetic_queries(count: int, seed: int = 1) -> List[str]:
+    """Generate user-style circuit requests drawn from the same circuit families."""
+    rng = np.random.default_rng(seed)
+    return [f"Design {description[0].lower()}{description[1:]}" for _, description, _ in
+            (synthetic_example(rng) for _ in range(count))]
+
+class FakeEmbedder(Embedder):
+    """
+    Deterministic, offline embedder for benchmarks.
+
+    Every word maps to a fixed pseudo-random vector seeded by its hash, and a
+    text embeds to the normalized, log-weighted sum of its word vectors. Texts
+    that share words land close together, so indexes see clustered data like
+    real embeddings, while embedding costs microseconds rather than an API call.
+    """
+
+    _WORD_RE = re.compile(r"[a-z0-9.]+")
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"fake-bench-v1:d{dim}"
+        self._word_vectors: Dict[str, np.ndarray] = {}
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            seed = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._word_vectors[word] = vector
+        return vector
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(self._WORD_RE.findall(text.lower()))
+            if not counts:
+                continue
+            words = list(counts)
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(words)))
+            out[row] = weights @ np.vstack([self._word_vector(word) for word in words])
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
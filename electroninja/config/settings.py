@@ -5,6 +5,15 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def _parse_model_pairs(value: str) -> dict:
+    """Parse "model=a:b,model=a:b" into {model: (a, b)}."""
+    pairs = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        model, _, numbers = item.partition("=")
+        first, _, second = numbers.partition(":")
+        pairs[model.strip()] = (float(first or 0), float(second or 0))
+    return pairs
+
 class Config:
     """Centralized configuration for ElectroNinja"""
     
@@ -25,6 +34,56 @@ class Config:
     DESCRIPTION_MODEL = os.getenv("DESCRIPTION_MODEL", "gpt-4o-mini")
     MERGER_MODEL = os.getenv("MERGER_MODEL", "gpt-4o-mini")
     COMPONENT_MODEL = os.getenv("COMPONENT_MODEL", "gpt-4o-mini")
+    # Component letters of generated ASC are read locally; set to 1 to ask
+    # MERGER_MODEL when no component can be parsed from the file
+    COMPONENT_LISTING_LLM_FALLBACK = os.getenv("COMPONENT_LISTING_LLM_FALLBACK", "0") == "1"
+    # Keyword/unit classifier answering clear requests before EVALUATION_MODEL.
+    # Requests of fewer words are never answered 'N' locally. Set FAST_PATH_LOG_PATH
+    # (e.g. logs/classifier_decisions.jsonl) to append every decision, with the
+    # user's request and the model's answer to escalated ones, for tuning; off by default
+    FAST_PATH_CLASSIFIER = os.getenv("FAST_PATH_CLASSIFIER", "1") == "1"
+    FAST_PATH_MIN_WORDS_FOR_N = int(os.getenv("FAST_PATH_MIN_WORDS_FOR_N", "3"))
+    FAST_PATH_LOG_PATH = os.getenv("FAST_PATH_LOG_PATH", "")
+    # Shared HTTP connection pool for all OpenAI calls (chat, vision, embeddings):
+    # pooled connections, idle keep-alive (seconds), connection retries and
+    # per-call connect/read timeouts (seconds)
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_KEEPALIVE_TIMEOUT = float(os.getenv("LLM_KEEPALIVE_TIMEOUT", "60"))
+    LLM_CONNECTION_RETRIES = int(os.getenv("LLM_CONNECTION_RETRIES", "2"))
+    LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+    LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+    # Chat completions go through one scheduler: per-model requests and tokens
+    # per minute (0 disables a limit; LLM_MODEL_RATE_LIMITS is "model=rpm:tpm,..."),
+    # requests in flight (threads and async calls together, streams until they
+    # end), and retries with exponential backoff (seconds)
+    LLM_DEFAULT_RPM = float(os.getenv("LLM_DEFAULT_RPM", "500"))
+    LLM_DEFAULT_TPM = float(os.getenv("LLM_DEFAULT_TPM", "200000"))
+    LLM_MODEL_RATE_LIMITS = _parse_model_pairs(os.getenv("LLM_MODEL_RATE_LIMITS", "gpt-4o=500:30000"))
+    LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "8"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+    # Per-call metrics (tokens, latency, queue wait, cost) kept in memory for the
+    # process and per session; dumped as JSON to METRICS_PATH at exit when set.
+    # LLM_PRICES is "model=input:output" in US dollars per million tokens
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_MAX_CALLS = int(os.getenv("METRICS_MAX_CALLS", "10000"))
+    METRICS_PATH = os.getenv("METRICS_PATH", "")
+    LLM_PRICES = _parse_model_pairs(os.getenv(
+        "LLM_PRICES", "gpt-4o-mini=0.15:0.6,gpt-4o=2.5:10,o3-mini=1.1:4.4"
+    ))
+    # Prompt tokens served from the provider's prompt cache cost this fraction of the input price
+    LLM_CACHED_INPUT_PRICE_RATIO = float(os.getenv("LLM_CACHED_INPUT_PRICE_RATIO", "0.5"))
+    # Measurement mode: request usage for streams too and log the cached share of every prompt
+    PROMPT_CACHE_REPORT = os.getenv("PROMPT_CACHE_REPORT", "0") == "1"
+    # Stream ASC generation and stop once the answer is N, more than
+    # ASC_STREAM_MAX_INVALID_LINES lines of the code are not ASC, or more than
+    # ASC_STREAM_MAX_PREAMBLE_LINES lines of prose come before the code
+    ASC_STREAMING = os.getenv("ASC_STREAMING", "1") == "1"
+    ASC_STREAM_MAX_INVALID_LINES = int(os.getenv("ASC_STREAM_MAX_INVALID_LINES", "3"))
+    ASC_STREAM_MAX_PREAMBLE_LINES = int(os.getenv("ASC_STREAM_MAX_PREAMBLE_LINES", "20"))
+    # Seconds between checks for edited prompt instruction files (0 checks on every prompt)
+    PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "2"))
     
     # Vision configuration
     OPENAI_VISION_MODEL = os.getenv("OPENAI_VISION_MODEL", "gpt-4o")
@@ -32,7 +91,67 @@ class Config:
     # Vector DB configuration
     VECTOR_DB_DIR = os.path.join(BASE_DIR, "data", "vector_db")
     VECTOR_DB_INDEX = os.path.join(VECTOR_DB_DIR, "faiss_index.bin")
+    VECTOR_DB_DOCUMENTS = os.path.join(VECTOR_DB_DIR, "documents.bin")
+    # Legacy pickled metadata, migrated to VECTOR_DB_DOCUMENTS on load
     VECTOR_DB_METADATA = os.path.join(VECTOR_DB_DIR, "metadata_list.pkl")
+    VECTOR_DB_MANIFEST = os.path.join(VECTOR_DB_DIR, "ingest_manifest.json")
+    VECTOR_DB_INDEX_INFO = os.path.join(VECTOR_DB_DIR, "index_info.json")
+    VECTOR_DB_LEXICAL = os.path.join(VECTOR_DB_DIR, "lexical_index.npz")
+    # Saves are committed as versioned snapshot directories holding the files above
+    VECTOR_DB_SNAPSHOTS = os.path.join(VECTOR_DB_DIR, "snapshots")
+    VECTOR_DB_KEEP_SNAPSHOTS = int(os.getenv("VECTOR_DB_KEEP_SNAPSHOTS", "3"))
+    VECTOR_DB_MMAP = os.getenv("VECTOR_DB_MMAP", "1") == "1"
+    # Seconds between checks for a newer snapshot while searching (0 disables)
+    VECTOR_DB_RELOAD_INTERVAL = float(os.getenv("VECTOR_DB_RELOAD_INTERVAL", "5"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    # Ingestion throughput: embedding requests in flight, ASC reader threads, and the
+    # provider limits requests are paced to (0 disables a limit)
+    INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "4"))
+    INGEST_READ_WORKERS = int(os.getenv("INGEST_READ_WORKERS", "8"))
+    EMBEDDING_REQUESTS_PER_SECOND = float(os.getenv("EMBEDDING_REQUESTS_PER_SECOND", "50"))
+    EMBEDDING_TOKENS_PER_MINUTE = float(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000"))
+    # "openai" uses EMBEDDING_MODEL through the API; "local" is an offline NumPy embedder
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    # Output size requested from text-embedding-3-* models (0 keeps the model's full size)
+    EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+    LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "256"))
+    
+    # FAISS index configuration. VECTOR_INDEX_FACTORY is a FAISS factory string
+    # ("Flat", "IVF1024,Flat", "HNSW32", ...) or "auto" to choose by corpus size.
+    VECTOR_INDEX_FACTORY = os.getenv("VECTOR_INDEX_FACTORY", "auto")
+    # Vector storage used by "auto": "float32", "float16", "sq8" or "pq".
+    # PQ stores VECTOR_INDEX_PQ_M bytes per vector (0 = dim / 4, i.e. 16x smaller than float32).
+    VECTOR_INDEX_STORAGE = os.getenv("VECTOR_INDEX_STORAGE", "float32")
+    VECTOR_INDEX_PQ_M = int(os.getenv("VECTOR_INDEX_PQ_M", "0"))
+    VECTOR_INDEX_METRIC = os.getenv("VECTOR_INDEX_METRIC", "cosine")  # "cosine" or "l2"
+    VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+    VECTOR_INDEX_EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))
+    
+    # Retrieval mode for VectorStore.search: "vector", "lexical" (BM25, no API call) or "hybrid"
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+    
+    # Near-duplicate examples collapsed at ingestion: same canonical ASC, or the
+    # same component types with embedding cosine similarity at or above the threshold
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.97"))
+    
+    # Embedding cache configuration
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+    EMBEDDING_CACHE_PATH = os.path.join(VECTOR_DB_DIR, "embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+    
+    # LLM response cache: an in-memory LRU in front of a SQLite file. Only
+    # methods listed here with a positive time to live (seconds) are cached.
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_PATH = os.path.join(BASE_DIR, "data", "llm_cache", "responses.sqlite3")
+    RESPONSE_CACHE_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "256"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+    RESPONSE_CACHE_TTLS = {
+        "evaluate_circuit_request": float(os.getenv("RESPONSE_CACHE_TTL_EVALUATION", "604800")),
+        "create_description": float(os.getenv("RESPONSE_CACHE_TTL_DESCRIPTION", "86400")),
+        "list_components": float(os.getenv("RESPONSE_CACHE_TTL_COMPONENTS", "604800")),
+    }
     
     # Create necessary directories
     @classmethod
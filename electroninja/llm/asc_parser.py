@@ -0,0 +1,225 @@
+# electroninja/llm/asc_parser.py
+
+import re
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# SPICE multipliers, matched case-insensitively ("meg" before "m").
+_SPICE_SUFFIXES = {
+    "f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6,
+    "m": 1e-3, "k": 1e3, "meg": 1e6, "g": 1e9, "t": 1e12,
+}
+_SPICE_VALUE_RE = re.compile(r"^([+-]?\d+(?:\.\d*)?(?:e[+-]?\d+)?)(meg|[fpnuµμmkgt])?[a-zω]*$")
+
+def spice_value(text: str) -> Optional[float]:
+    """
+    Parse a SPICE value such as "4.7k", "100n", "0.1e-6" or "10uF".
+
+    Returns:
+        float: The value, or None if text is not a plain number (e.g. "SINE(0 1 1k)").
+    """
+    match = _SPICE_VALUE_RE.match(text.strip().lower())
+    if not match:
+        return None
+    number, suffix = match.groups()
+    return float(number) * (_SPICE_SUFFIXES[suffix] if suffix else 1.0)
+
+def parse_asc(asc_code: str) -> Dict[str, Any]:
+    """
+    Parse the circuit-relevant parts of an LTspice .asc file.
+
+    Args:
+        asc_code (str): ASC file contents.
+
+    Returns:
+        dict: {
+            "components": [{"symbol", "x", "y", "rotation", "attributes"}] in file
+                order, where attributes maps SYMATTR names (InstName, Value, ...)
+                to their values,
+            "wires": [(x1, y1, x2, y2)],
+            "flags": [(x, y, net name)],
+            "iopins": [(x, y, direction)],
+            "directives": [SPICE directive text, e.g. ".tran 10m"],
+        }
+        Malformed lines are skipped.
+    """
+    schematic: Dict[str, Any] = {"components": [], "wires": [], "flags": [], "iopins": [], "directives": []}
+    component = None
+    for line in asc_code.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        keyword = fields[0].upper()
+        try:
+            if keyword == "SYMBOL" and len(fields) >= 4:
+                component = {
+                    "symbol": fields[1],
+                    "x": int(fields[2]),
+                    "y": int(fields[3]),
+                    "rotation": fields[4] if len(fields) > 4 else "R0",
+                    "attributes": {},
+                }
+                schematic["components"].append(component)
+            elif keyword == "SYMATTR" and len(fields) >= 2 and component is not None:
+                component["attributes"][fields[1]] = line.split(None, 2)[2].strip() if len(fields) > 2 else ""
+            elif keyword == "WIRE" and len(fields) >= 5:
+                schematic["wires"].append(tuple(int(value) for value in fields[1:5]))
+            elif keyword == "FLAG" and len(fields) >= 4:
+                schematic["flags"].append((int(fields[1]), int(fields[2]), fields[3]))
+            elif keyword == "IOPIN" and len(fields) >= 4:
+                schematic["iopins"].append((int(fields[1]), int(fields[2]), fields[3]))
+            elif keyword == "TEXT" and len(fields) >= 6:
+                # TEXT x y alignment size !directive (";" marks a comment)
+                text = line.split(None, 5)[5]
+                if text.startswith("!"):
+                    schematic["directives"].append(text[1:].strip())
+        except ValueError:
+            continue
+    return schematic
+
+def component_signature(asc_code: str) -> Tuple[str, ...]:
+    """Sorted symbol types of a circuit, e.g. ("cap", "res", "voltage")."""
+    return tuple(sorted(component["symbol"].lower() for component in parse_asc(asc_code)["components"]))
+
+def _canonical_value(value: str) -> str:
+    number = spice_value(value)
+    return f"{number:.6g}" if number is not None else " ".join(value.lower().split())
+
+def canonical_asc(asc_code: str) -> str:
+    """
+    Reduce an ASC file to a canonical text that ignores presentation.
+
+    Two schematics with the same canonical form describe the same circuit:
+    the layout is shifted so its top-left corner is at the origin, wire
+    direction, element order, instance names, attribute display windows,
+    comments and value spellings ("1k" vs "1000") are normalized away.
+    Component placement relative to the wires is kept, so a different
+    topology gives a different form.
+    """
+    schematic = parse_asc(asc_code)
+    points = [(c["x"], c["y"]) for c in schematic["components"]]
+    points += [point for x1, y1, x2, y2 in schematic["wires"] for point in ((x1, y1), (x2, y2))]
+    points += [(x, y) for x, y, _ in schematic["flags"] + schematic["iopins"]]
+    origin_x = min((x for x, _ in points), default=0)
+    origin_y = min((y for _, y in points), default=0)
+
+    def shift(x: int, y: int) -> Tuple[int, int]:
+        return x - origin_x, y - origin_y
+
+    lines = []
+    for component in schematic["components"]:
+        x, y = shift(component["x"], component["y"])
+        attributes = " ".join(
+            f"{name.lower()}={_canonical_value(value)}"
+            for name, value in sorted(component["attributes"].items()) if name.lower() != "instname"
+        )
+        lines.append(f"SYMBOL {component['symbol'].lower()} {x} {y} {component['rotation'].upper()} {attributes}".rstrip())
+    for x1, y1, x2, y2 in schematic["wires"]:
+        start, end = sorted([shift(x1, y1), shift(x2, y2)])
+        lines.append(f"WIRE {start[0]} {start[1]} {end[0]} {end[1]}")
+    for keyword, items in (("FLAG", schematic["flags"]), ("IOPIN", schematic["iopins"])):
+        for x, y, name in items:
+            lines.append(f"{keyword} {' '.join(map(str, shift(x, y)))} {name.lower()}")
+    for directive in schematic["directives"]:
+        lines.append(f"DIRECTIVE {' '.join(directive.lower().split())}")
+    return "\n".join(sorted(set(lines)))
+
+def asc_fingerprint(asc_code: str) -> str:
+    """SHA-256 of canonical_asc(); equal fingerprints mean the same circuit."""
+    return hashlib.sha256(canonical_asc(asc_code).encode("utf-8")).hexdigest()
+
+# Keyword -> number of integer coordinates that must follow it (after any
+# leading non-numeric fields) and the minimum number of fields on the line.
+_ASC_LINE_RULES = {
+    "VERSION": (0, 2),
+    "SHEET": (3, 4),
+    "WIRE": (4, 5),
+    "FLAG": (2, 4),
+    "IOPIN": (2, 4),
+    "SYMBOL": (0, 4),
+    "SYMATTR": (0, 2),
+    "WINDOW": (3, 5),
+    "TEXT": (2, 6),
+    "LINE": (4, 6),
+    "RECTANGLE": (4, 6),
+    "CIRCLE": (4, 6),
+    "ARC": (8, 10),
+    "BUSTAP": (4, 5),
+    "DATAFLAG": (2, 4),
+}
+_ROTATIONS = {"R0", "R90", "R180", "R270", "M0", "M90", "M180", "M270"}
+
+def asc_line_error(line: str) -> Optional[str]:
+    """
+    Check a single line of an ASC file.
+
+    Args:
+        line (str): One line, without the newline.
+
+    Returns:
+        str: Why the line is not valid ASC, or None if it is (blank lines are valid).
+    """
+    fields = line.split()
+    if not fields:
+        return None
+    keyword = fields[0].upper()
+    if keyword not in _ASC_LINE_RULES:
+        return f"unknown keyword {fields[0][:20]!r}"
+    coordinates, min_fields = _ASC_LINE_RULES[keyword]
+    if len(fields) < min_fields:
+        return f"{keyword} needs at least {min_fields - 1} fields"
+    # LINE, RECTANGLE, CIRCLE and ARC start with a line style name
+    first = 2 if keyword in ("LINE", "RECTANGLE", "CIRCLE", "ARC") else 1
+    if keyword == "SYMBOL":
+        first, coordinates = 2, 2
+    try:
+        for value in fields[first:first + coordinates]:
+            int(value)
+    except ValueError:
+        return f"{keyword} has non-integer coordinates"
+    if keyword == "SYMBOL" and len(fields) > 4 and fields[4].upper() not in _ROTATIONS:
+        return f"SYMBOL has invalid rotation {fields[4][:10]!r}"
+    return None
+
+# LTspice symbol (without library path) -> component letter used in components.txt.
+# Letters are listed in this order: R, C, L, D.
+COMPONENT_SYMBOLS = {
+    "res": "R", "res2": "R",
+    "cap": "C", "polcap": "C",
+    "ind": "L", "ind2": "L",
+    "diode": "D", "schottky": "D", "zener": "D", "led": "D", "varactor": "D",
+}
+_LETTER_ORDER = "RCLD"
+
+def _symbol_letter(symbol: str) -> Optional[str]:
+    return COMPONENT_SYMBOLS.get(re.split(r"[\\/]", symbol)[-1].lower())
+
+def component_instances(asc_code: str) -> List[Dict[str, Any]]:
+    """
+    List the resistors, capacitors, inductors and diodes of an ASC file.
+
+    Returns:
+        list: {"name" (InstName, or "" if missing), "symbol", "letter", "value"
+        (the Value attribute, or "")} per component, in file order.
+    """
+    instances = []
+    for component in parse_asc(asc_code)["components"]:
+        letter = _symbol_letter(component["symbol"])
+        if letter is not None:
+            instances.append({
+                "name": component["attributes"].get("InstName", ""),
+                "symbol": component["symbol"],
+                "letter": letter,
+                "value": component["attributes"].get("Value", ""),
+            })
+    return instances
+
+def component_letters(asc_code: str) -> str:
+    """
+    The component letters present in an ASC file, e.g. "R, C" (the format of components.txt).
+
+    Returns:
+        str: Distinct letters out of R, C, L and D in that order, or "" if there are none.
+    """
+    letters = {instance["letter"] for instance in component_instances(asc_code)}
+    return ", ".join(letter for letter in _LETTER_ORDER if letter in letters)
@@ -0,0 +1,123 @@
+# electroninja/llm/asc_stream.py
+
+import logging
+from typing import Callable, List, Optional
+from electroninja.llm.asc_parser import asc_line_error
+
+logger = logging.getLogger('electroninja')
+
+class AscStreamParser:
+    """
+    Incremental parser for a streamed ASC completion.
+
+    Text is fed in as it arrives. Every complete line is checked with
+    asc_line_error, and the parser decides as early as possible whether the
+    generation should be aborted:
+
+    - "N": the model refused (its whole answer is the letter N), detected as
+      soon as the character after the N arrives.
+    - "invalid": more than max_invalid_lines lines after the code started
+      are not ASC (prose or garbage), or more than max_preamble_lines lines of
+      prose came before it.
+
+    The code starts at "Version 4" (or at the first other ASC line, for
+    answers that leave the header out); prose before it, such as "Here is
+    the circuit:", is skipped. Code fences are ignored. Accepted lines are exposed through `asc` so
+    callers can show progress before the completion finishes.
+    """
+
+    def __init__(self, max_invalid_lines: int = 3, on_partial: Optional[Callable[[str], None]] = None,
+                 max_preamble_lines: int = 20):
+        """
+        Args:
+            max_invalid_lines (int): Non-ASC lines tolerated in the code before aborting.
+            on_partial (callable): Called with the ASC accepted so far whenever
+                new lines are accepted.
+            max_preamble_lines (int): Lines of prose tolerated before the code.
+        """
+        self.max_invalid_lines = max_invalid_lines
+        self.max_preamble_lines = max_preamble_lines
+        self.preamble_lines = 0
+        self.on_partial = on_partial
+        self.text = ""
+        self.lines: List[str] = []
+        self.invalid_lines = 0
+        self.verdict: Optional[str] = None
+        self.reason = ""
+        self._pending = ""
+
+    @property
+    def aborted(self) -> bool:
+        return self.verdict is not None
+
+    @property
+    def asc(self) -> str:
+        """The valid ASC lines received so far."""
+        return "\n".join(self.lines)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Add streamed text.
+
+        Returns:
+            bool: True if the generation should be aborted (see verdict and reason).
+        """
+        if self.aborted or not chunk:
+            return self.aborted
+        self.text += chunk
+        if not self.lines and self.preamble_lines == 0:
+            answer = self.text.lstrip()
+            # A refusal is the single letter N; "No..." or "NPN" could be anything.
+            if len(answer) >= 2 and answer[0] in "Nn" and not answer[1].isalnum():
+                return self._abort("N", "model answered N")
+        *complete, self._pending = (self._pending + chunk).split("\n")
+        accepted = False
+        for line in complete:
+            accepted |= self._line(line)
+            if self.aborted:
+                break
+        if accepted and self.on_partial is not None:
+            self.on_partial(self.asc)
+        return self.aborted
+
+    def finish(self) -> Optional[str]:
+        """
+        Process the last line once the stream has ended.
+
+        Returns:
+            str: The verdict ("N", "invalid") or None if the completion looks like ASC.
+        """
+        if not self.aborted:
+            if self.text.strip().upper() == "N":
+                self._abort("N", "model answered N")
+            elif self._pending:
+                line, self._pending = self._pending, ""
+                if self._line(line) and self.on_partial is not None:
+                    self.on_partial(self.asc)
+            if not self.aborted and not self.lines:
+                self._abort("invalid", "no ASC lines in the response")
+        return self.verdict
+
+    def _line(self, line: str) -> bool:
+        line = line.rstrip("\r")
+        if not line.strip() or line.strip().startswith("```"):
+            return False
+        error = asc_line_error(line)
+        if error is None:
+            self.lines.append(line)
+            return True
+        if not self.lines:
+            self.preamble_lines += 1
+            if self.preamble_lines > self.max_preamble_lines:
+                self._abort("invalid", f"no ASC after {self.preamble_lines} lines, last: {error}")
+            return False
+        self.invalid_lines += 1
+        if self.invalid_lines > self.max_invalid_lines:
+            self._abort("invalid", f"{self.invalid_lines} non-ASC lines, last: {error}")
+        return False
+
+    def _abort(self, verdict: str, reason: str) -> bool:
+        self.verdict = verdict
+        self.reason = reason
+        logger.info(f"ASC generation rejected: {reason}")
+        return True
@@ -0,0 +1,163 @@
+# electroninja/llm/dedup.py
+
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from electroninja.llm.asc_parser import asc_fingerprint, component_signature
+
+logger = logging.getLogger('electroninja')
+
+def similar_pairs(faiss, vectors: np.ndarray, threshold: float, neighbours: int = 10) -> List[Tuple[int, int, float]]:
+    """
+    Find pairs of rows whose cosine similarity is at least threshold.
+
+    Each row is compared with its `neighbours` nearest rows by exact search,
+    which finds every pair unless a vector has more than that many near
+    duplicates (the extra ones are still linked through the others).
+
+    Returns:
+        list: (i, j, similarity) with i < j.
+    """
+    if len(vectors) < 2:
+        return []
+    normalized = np.ascontiguousarray(vectors, dtype=np.float32).copy()
+    faiss.normalize_L2(normalized)
+    index = faiss.IndexFlatIP(normalized.shape[1])
+    index.add(normalized)
+    similarities, ids = index.search(normalized, min(neighbours + 1, len(normalized)))
+    pairs = []
+    for i, (id_row, similarity_row) in enumerate(zip(ids, similarities)):
+        for j, similarity in zip(id_row, similarity_row):
+            if j > i and similarity >= threshold:
+                pairs.append((i, int(j), float(similarity)))
+    return pairs
+
+class Deduplicator:
+    """
+    Streaming near-duplicate detection for ingestion.
+
+    Examples are duplicates when their ASC files have the same canonical form
+    (see asc_parser.canonical_asc), or when they use the same component types
+    and their embeddings have cosine similarity >= threshold. Examples arrive
+    in file order and the first example of a cluster is kept. Only examples
+    that need embedding are compared by similarity, against each other and
+    against the documents already in the index, so a rerun costs no more than
+    its new examples.
+
+    The state kept per example is its fingerprint, so memory grows with the
+    number of distinct circuits, not with their size.
+    """
+
+    def __init__(self, vector_store, threshold: float, keys_by_id: Dict[int, str]):
+        """
+        Args:
+            vector_store (VectorStore): Store the examples are ingested into.
+            threshold (float): Minimum cosine similarity for near duplicates.
+            keys_by_id (dict): Document id -> example key of indexed examples,
+                kept up to date by the caller.
+        """
+        self.vector_store = vector_store
+        self.threshold = threshold
+        self.keys_by_id = keys_by_id
+        self._fingerprints: Dict[str, str] = {}
+        # Key of a dropped representative -> the example it duplicates.
+        self._aliases: Dict[str, str] = {}
+        self.clusters: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _resolve(self, key: str) -> str:
+        while key in self._aliases:
+            key = self._aliases[key]
+        return key
+
+    def _drop(self, key: str, representative: str, reason: str, similarity: float) -> None:
+        self._aliases[key] = representative
+        duplicates = self.clusters.setdefault(representative, [])
+        duplicates.append({"key": key, "reason": reason, "similarity": similarity})
+        duplicates.extend(self.clusters.pop(key, []))
+
+    def check_fingerprint(self, key: str, asc_code: str) -> Optional[str]:
+        """
+        Register an example's canonical ASC.
+
+        Returns:
+            str: Key of the earlier example with the same circuit, or None if
+            this is the first one.
+        """
+        fingerprint = asc_fingerprint(asc_code)
+        first = self._fingerprints.setdefault(fingerprint, key)
+        if first == key:
+            return None
+        representative = self._resolve(first)
+        self._drop(key, representative, "same circuit", 1.0)
+        return representative
+
+    def check_similar(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> List[Optional[Dict[str, Any]]]:
+        """
+        Compare a batch of embedded examples with the index and with each other.
+
+        Args:
+            records (list): Dicts with "key", "asc_code" and "id" (the example's
+                own document id, or None), in file order.
+            vectors (np.ndarray): Their embeddings.
+
+        Returns:
+            list: For each record, None if it is kept, else {"key", "id",
+            "similarity"} of the example it duplicates ("id" is None when that
+            example is not indexed yet).
+        """
+        signatures = [component_signature(record["asc_code"]) for record in records]
+        matches: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        hits = self.vector_store.similar_documents(vectors, self.threshold)
+        for i, (record, row) in enumerate(zip(records, hits)):
+            for doc_id, score in row:
+                key = self.keys_by_id.get(doc_id)
+                if doc_id == record["id"] or key is None:
+                    continue
+                if self._document_signature(doc_id) == signatures[i]:
+                    matches[i] = {"key": self._resolve(key), "id": doc_id, "similarity": score}
+                    break
+        for i, j, score in similar_pairs(self.vector_store.faiss, vectors, self.threshold):
+            # Pairs come ordered by i, so matches[i] is already final.
+            if matches[j] is None and signatures[i] == signatures[j]:
+                target = matches[i] or {"key": records[i]["key"], "id": None}
+                matches[j] = {"key": target["key"], "id": target["id"], "similarity": score}
+        for record, match in zip(records, matches):
+            if match is not None:
+                self._drop(record["key"], match["key"], "similar", match["similarity"])
+        return matches
+
+    def forget(self, key: str) -> None:
+        """Undo the decision that an example is a duplicate, e.g. because its representative was removed."""
+        representative = self._aliases.pop(key, None)
+        if representative in self.clusters:
+            self.clusters[representative] = [d for d in self.clusters[representative] if d["key"] != key]
+            if not self.clusters[representative]:
+                del self.clusters[representative]
+
+    def _document_signature(self, doc_id: int) -> Optional[Tuple[str, ...]]:
+        position = self.vector_store.documents.position_of(int(doc_id))
+        if position is None:
+            return None
+        document = self.vector_store.documents[position]
+        return component_signature(document.get("pure_asc_code", document.get("asc_code", "")))
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            list: One dict per collapsed cluster: {"representative": key,
+            "duplicates": [{"key", "reason": "same circuit" or "similar", "similarity"}]}.
+        """
+        return [{"representative": key, "duplicates": duplicates}
+                for key, duplicates in self.clusters.items() if duplicates]
+
+def format_clusters(clusters: List[Dict[str, Any]]) -> List[str]:
+    """One log line per collapsed cluster."""
+    lines = []
+    for cluster in clusters:
+        duplicates = ", ".join(
+            f"{duplicate['key']} ({duplicate['reason']}"
+            + (f" {duplicate['similarity']:.3f})" if duplicate["reason"] == "similar" else ")")
+            for duplicate in cluster["duplicates"]
+        )
+        lines.append(f"Kept {cluster['representative']}, dropped {duplicates}")
+    return lines
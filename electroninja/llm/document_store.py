@@ -0,0 +1,251 @@
+# electroninja/llm/document_store.py
+
+import os
+import json
+import mmap
+import struct
+import logging
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger('electroninja')
+
+# Separator used by ingest_examples to build the embedded text from its parts.
+COMBINED_SEPARATOR = "\n\n"
+# Separator used by indexes built before the pure ASC code was stored separately.
+LEGACY_SEPARATOR = "\n\nASC CODE:\n"
+
+class DocumentStore:
+    """
+    Compact on-disk store for vector store documents.
+
+    The file holds a header, a fixed-width offset table with one row per
+    document, and a UTF-8 string heap. It is memory-mapped on open and a
+    document is only decoded when it is accessed, so opening the store costs
+    the same regardless of corpus size. The embedded text is not stored when
+    it can be rebuilt from the description and the pure ASC code, so every
+    ASC body is kept once.
+
+    Every row carries the stable document id used by the vector index. Ids
+    are kept in ascending order so that an id is found by binary search.
+    """
+
+    MAGIC = b"ENDS"
+    VERSION = 2
+    FIELDS = ("text", "description", "pure_asc_code", "asc_path", "extra")
+
+    # Flag bits: one presence bit per field, then how "text" is derived.
+    TEXT_COMBINED = 1 << 8
+    TEXT_LEGACY = 1 << 9
+
+    _HEADER = struct.Struct("<4sIQ")
+    _ROW_DTYPE_V1 = np.dtype([
+        ("offsets", "<u8", (len(FIELDS),)),
+        ("lengths", "<u4", (len(FIELDS),)),
+        ("flags", "<u4"),
+    ])
+    _ROW_DTYPE = np.dtype([
+        ("id", "<i8"),
+        ("offsets", "<u8", (len(FIELDS),)),
+        ("lengths", "<u4", (len(FIELDS),)),
+        ("flags", "<u4"),
+    ])
+
+    def __init__(self):
+        # Each row is either an int (row of the mapped table) or a tuple of
+        # (encoded field values, flags) for documents not yet saved.
+        self._rows: List[Union[int, Tuple[List[bytes], int]]] = []
+        self._ids: List[int] = []
+        self._id_array = None
+        self._file = None
+        self._mmap = None
+        self._table = None
+        self._heap_start = 0
+
+    @classmethod
+    def open(cls, path: str) -> "DocumentStore":
+        """Memory-map an existing document store file."""
+        store = cls()
+        store._map(path)
+        return store
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, Any]]) -> "DocumentStore":
+        """Build an in-memory store from document dicts (e.g. a legacy metadata list), with ids 0..n-1."""
+        store = cls()
+        for doc_id, document in enumerate(documents):
+            store.append(document, doc_id)
+        return store
+
+    def _map(self, path: str) -> None:
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._HEADER.size:
+            self._file.close()
+            self._file = None
+            raise ValueError(f"Document store file is truncated: {path}")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = self._HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC or version not in (1, self.VERSION):
+            self.close()
+            raise ValueError(f"Unsupported document store format in {path}")
+        row_dtype = self._ROW_DTYPE if version == self.VERSION else self._ROW_DTYPE_V1
+        self._table = np.frombuffer(self._mmap, dtype=row_dtype, count=count, offset=self._HEADER.size)
+        self._heap_start = self._HEADER.size + count * row_dtype.itemsize
+        self._rows = list(range(count))
+        # Version 1 stores had no ids; their documents were addressed by position.
+        self._ids = self._table["id"].tolist() if version == self.VERSION else list(range(count))
+        self._id_array = None
+
+    def close(self) -> None:
+        """Release the memory map. Documents that were only on disk become unavailable."""
+        self._table = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return self._decode(*self._row_values(self._rows[position]))
+
+    def get_many(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Decode several documents by position."""
+        return [self[position] for position in positions]
+
+    @property
+    def ids(self) -> List[int]:
+        """Document ids in storage (ascending) order."""
+        return list(self._ids)
+
+    def position_of(self, doc_id: int) -> Optional[int]:
+        """Return the position of a document id, or None if it is not stored."""
+        if self._id_array is None:
+            self._id_array = np.array(self._ids, dtype=np.int64)
+        position = int(np.searchsorted(self._id_array, doc_id))
+        if position < len(self._ids) and self._ids[position] == doc_id:
+            return position
+        return None
+
+    def append(self, document: Dict[str, Any], doc_id: int) -> None:
+        """Append a document dict with an "asc_code" key holding the embedded text."""
+        if self._ids and doc_id <= self._ids[-1]:
+            raise ValueError(f"Document ids must be appended in ascending order (got {doc_id} after {self._ids[-1]})")
+        self._rows.append(self._encode(document))
+        self._ids.append(doc_id)
+        self._id_array = None
+
+    def replace(self, position: int, document: Dict[str, Any]) -> None:
+        """Replace the document at a position, keeping its id."""
+        self._rows[position] = self._encode(document)
+
+    def remove(self, positions: Iterable[int]) -> None:
+        """Remove documents by position."""
+        drop = set(positions)
+        self._rows = [row for i, row in enumerate(self._rows) if i not in drop]
+        self._ids = [doc_id for i, doc_id in enumerate(self._ids) if i not in drop]
+        self._id_array = None
+
+    def clear(self) -> None:
+        self._rows = []
+        self._ids = []
+        self._id_array = None
+
+    def _encode(self, document: Dict[str, Any]) -> Tuple[List[bytes], int]:
+        document = dict(document)
+        text = document.pop("asc_code", "")
+        description = document.pop("description", None)
+        pure_asc = document.pop("pure_asc_code", None)
+        asc_path = document.pop("asc_path", None)
+
+        flags = 0
+        if description is not None and pure_asc is None and LEGACY_SEPARATOR in text:
+            # Legacy entries only kept the combined text; recover the ASC part once.
+            prefix, legacy_asc = text.split(LEGACY_SEPARATOR, 1)
+            if prefix == description:
+                pure_asc = legacy_asc
+        if description is not None and pure_asc is not None:
+            if text == f"{description}{COMBINED_SEPARATOR}{pure_asc}":
+                flags |= self.TEXT_COMBINED
+                text = None
+            elif text == f"{description}{LEGACY_SEPARATOR}{pure_asc}":
+                flags |= self.TEXT_LEGACY
+                text = None
+
+        values = [text, description, pure_asc, asc_path, json.dumps(document) if document else None]
+        encoded = []
+        for bit, value in enumerate(values):
+            if value is None:
+                encoded.append(b"")
+            else:
+                flags |= 1 << bit
+                encoded.append(str(value).encode("utf-8"))
+        return encoded, flags
+
+    def _row_values(self, row: Union[int, Tuple[List[bytes], int]]) -> Tuple[List[bytes], int]:
+        if not isinstance(row, int):
+            return row
+        entry = self._table[row]
+        values = []
+        for offset, length in zip(entry["offsets"], entry["lengths"]):
+            start = self._heap_start + int(offset)
+            values.append(self._mmap[start:start + int(length)])
+        return values, int(entry["flags"])
+
+    def _decode(self, values: List[bytes], flags: int) -> Dict[str, Any]:
+        fields = {}
+        for bit, name in enumerate(self.FIELDS):
+            if flags & (1 << bit):
+                fields[name] = values[bit].decode("utf-8")
+
+        document: Dict[str, Any] = {}
+        if flags & self.TEXT_COMBINED:
+            document["asc_code"] = f"{fields['description']}{COMBINED_SEPARATOR}{fields['pure_asc_code']}"
+        elif flags & self.TEXT_LEGACY:
+            document["asc_code"] = f"{fields['description']}{LEGACY_SEPARATOR}{fields['pure_asc_code']}"
+        else:
+            document["asc_code"] = fields.get("text", "")
+        for name in ("asc_path", "description", "pure_asc_code"):
+            if name in fields:
+                document[name] = fields[name]
+        if "extra" in fields:
+            document.update(json.loads(fields["extra"]))
+        return document
+
+    def save(self, path: str) -> None:
+        """
+        Write the store to path and re-map it from there.
+
+        The file is written next to path and renamed into place, so readers
+        never observe a partially written store.
+        """
+        tmp_path = f"{path}.tmp"
+        count = len(self._rows)
+        table = np.zeros(count, dtype=self._ROW_DTYPE)
+        with open(tmp_path, "wb") as f:
+            f.write(self._HEADER.pack(self.MAGIC, self.VERSION, count))
+            heap_start = self._HEADER.size + count * self._ROW_DTYPE.itemsize
+            f.seek(heap_start)
+            heap_offset = 0
+            for i, row in enumerate(self._rows):
+                values, flags = self._row_values(row)
+                for field, value in enumerate(values):
+                    table[i]["offsets"][field] = heap_offset
+                    table[i]["lengths"][field] = len(value)
+                    f.write(value)
+                    heap_offset += len(value)
+                table[i]["flags"] = flags
+                table[i]["id"] = self._ids[i]
+            f.seek(self._HEADER.size)
+            f.write(table.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Windows refuses to replace a file that is still mapped.
+        self.close()
+        os.replace(tmp_path, path)
+        self._map(path)
@@ -0,0 +1,163 @@
+# electroninja/llm/embedders.py
+
+import re
+import logging
+import numpy as np
+import openai
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from electroninja.config.settings import Config
+from electroninja.llm.http_client import configure_openai
+from electroninja.llm.rate_limit import RateLimiter, estimate_tokens
+
+logger = logging.getLogger('electroninja')
+
+class Embedder(ABC):
+    """Base class for text embedders used by the vector store"""
+
+    # Identifies the embedding space. Vectors from embedders with different
+    # names are not comparable, so the name is recorded next to every index.
+    name: str = ""
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts.
+
+        Args:
+            texts (list): Normalized texts to embed.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim).
+        """
+        pass
+
+class OpenAIEmbedder(Embedder):
+    """
+    Embeds texts with the OpenAI embeddings API.
+
+    text-embedding-3 models can return shortened vectors: with `dim` below
+    the model's full size the API is asked for that many dimensions, which
+    shrinks the index proportionally at a small cost in retrieval quality.
+    """
+
+    # Output sizes of the models we use; others must be given explicitly.
+    MODEL_DIMS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+    # Models that accept the `dimensions` parameter.
+    SHORTENABLE_MODELS = ("text-embedding-3-small", "text-embedding-3-large")
+
+    def __init__(self, config: Optional[Config] = None, model: str = "text-embedding-3-small",
+                 dim: Optional[int] = None):
+        self.config = config or Config()
+        self.request_timeout = configure_openai(self.config)
+        self.model = model
+        full_dim = self.MODEL_DIMS.get(model)
+        self.dim = dim or full_dim or 1536
+        # Only request a size when it differs from what the model returns anyway.
+        self.dimensions = self.dim if full_dim is not None and self.dim != full_dim else None
+        if self.dimensions is not None and model not in self.SHORTENABLE_MODELS:
+            raise ValueError(f"Embedding model {model} does not support custom dimensions")
+        # Shortened vectors live in a different space from full ones.
+        self.name = model if self.dimensions is None else f"{model}:d{self.dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        params = {"dimensions": self.dimensions} if self.dimensions is not None else {}
+        response = openai.Embedding.create(
+            input=texts,
+            model=self.model,
+            request_timeout=self.request_timeout,
+            **params
+        )
+        # The API may return items out of order; each item carries its input index.
+        data = sorted(response["data"], key=lambda item: item["index"])
+        return np.array([item["embedding"] for item in data], dtype=np.float32)
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder built on NumPy only.
+
+    Each text is split into character n-grams, which are hashed and weighted
+    with sublinear term frequency (1 + log tf). The resulting sparse vector is
+    mapped to `dim` dimensions with a sparse random projection: every n-gram
+    hash is added with a pseudo-random sign to a few pseudo-random coordinates.
+    The embedder is stateless, so a text always maps to the same vector.
+    """
+
+    _MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+    _FNV_PRIME = np.uint64(1099511628211)
+    _MIX = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, dim: int = 256, ngram_min: int = 3, ngram_max: int = 5, projections: int = 4):
+        self.dim = dim
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+        self.projections = projections
+        self.name = f"local-hashing-v1:d{dim}:n{ngram_min}-{ngram_max}:p{projections}"
+        self._seeds = [np.uint64((i + 1) * 0x632BE59BD9B4E019 & 0xFFFFFFFFFFFFFFFF) for i in range(projections)]
+
+    def _ngram_hashes(self, text: str) -> np.ndarray:
+        text = " " + re.sub(r"\s+", " ", text.lower()).strip() + " "
+        codes = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        hashes = []
+        with np.errstate(over="ignore"):
+            for n in range(self.ngram_min, self.ngram_max + 1):
+                count = len(codes) - n + 1
+                if count <= 0:
+                    continue
+                h = np.full(count, np.uint64(n), dtype=np.uint64)
+                for j in range(n):
+                    h = (h * self._FNV_PRIME) ^ codes[j:j + count]
+                hashes.append(h)
+        if not hashes:
+            return np.zeros(0, dtype=np.uint64)
+        return np.concatenate(hashes)
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float64)
+        features, counts = np.unique(self._ngram_hashes(text), return_counts=True)
+        if len(features) == 0:
+            return vector.astype(np.float32)
+        weights = 1.0 + np.log(counts)
+        with np.errstate(over="ignore"):
+            for seed in self._seeds:
+                mixed = (features ^ seed) * self._MIX
+                buckets = (mixed >> np.uint64(33)) % np.uint64(self.dim)
+                signs = np.where((mixed >> np.uint64(13)) & np.uint64(1), 1.0, -1.0)
+                np.add.at(vector, buckets.astype(np.int64), signs * weights)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._embed_one(text) for text in texts])
+
+class RateLimitedEmbedder(Embedder):
+    """Wraps an embedder so every embed call waits for a RateLimiter first."""
+
+    def __init__(self, embedder: Embedder, limiter: RateLimiter):
+        self.embedder = embedder
+        self.limiter = limiter
+        self.name = embedder.name
+        self.dim = embedder.dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        self.limiter.acquire(sum(estimate_tokens(text) for text in texts))
+        return self.embedder.embed(texts)
+
+def create_embedder(config: Optional[Config] = None) -> Embedder:
+    """Create the embedder selected by Config.EMBEDDING_BACKEND ("openai" or "local")."""
+    config = config or Config()
+    backend = config.EMBEDDING_BACKEND.lower()
+    if backend == "openai":
+        return OpenAIEmbedder(config, model=config.EMBEDDING_MODEL, dim=config.EMBEDDING_DIMENSIONS or None)
+    if backend == "local":
+        return HashingEmbedder(dim=config.EMBEDDING_DIMENSIONS or config.LOCAL_EMBEDDING_DIM)
+    raise ValueError(f"Unknown embedding backend: {config.EMBEDDING_BACKEND}")
@@ -0,0 +1,128 @@
+# electroninja/llm/http_client.py
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+import aiohttp
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple
+from electroninja.config.settings import Config
+
+logger = logging.getLogger('electroninja')
+
+class _PooledSession(requests.Session):
+    """
+    requests session that is not torn down by openai.
+
+    openai keeps one session per thread and closes it every few minutes to
+    recycle connections. With a shared session that would drop the pool for
+    every thread at once, so close() is a no-op and shutdown() really closes it.
+    """
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+_lock = threading.Lock()
+_session: Optional[_PooledSession] = None
+# One aiohttp session per event loop, shared by every async LLM call on it.
+_async_sessions = weakref.WeakKeyDictionary()
+
+def shared_session(config: Optional[Config] = None) -> requests.Session:
+    """
+    Return the process-wide requests session used for synchronous API calls.
+
+    Connections are kept alive between calls, so chat, vision and embedding
+    requests from any thread reuse the same TCP/TLS connections instead of
+    opening a new one per request. The pool is sized once, from the first
+    config that asks for the session.
+
+    Args:
+        config (Config): Supplies LLM_MAX_CONNECTIONS.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            config = config or Config()
+            _session = _PooledSession()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=config.LLM_MAX_CONNECTIONS,
+                max_retries=config.LLM_CONNECTION_RETRIES
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            logger.info(f"Created shared HTTP session (pool size {config.LLM_MAX_CONNECTIONS})")
+        return _session
+
+def close_shared_session() -> None:
+    """Close the synchronous session; the next call to shared_session creates a new one."""
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is not None:
+        if openai.requestssession is session:
+            openai.requestssession = None
+        session.shutdown()
+
+def shared_async_session(config: Optional[Config] = None) -> aiohttp.ClientSession:
+    """
+    Return the aiohttp session shared by all async API calls on the running event loop.
+
+    Args:
+        config (Config): Supplies LLM_MAX_CONNECTIONS and LLM_KEEPALIVE_TIMEOUT.
+
+    Returns:
+        aiohttp.ClientSession: The loop's shared session.
+    """
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        config = config or Config()
+        connector = aiohttp.TCPConnector(
+            limit=config.LLM_MAX_CONNECTIONS,
+            keepalive_timeout=config.LLM_KEEPALIVE_TIMEOUT
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _async_sessions[loop] = session
+    return session
+
+async def close_async_session() -> None:
+    """Close the running loop's shared session, e.g. when the application shuts down."""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+def request_timeout(config: Optional[Config] = None) -> Tuple[float, float]:
+    """
+    Returns:
+        tuple: (connect, read) timeout in seconds, for openai's request_timeout argument.
+    """
+    config = config or Config()
+    return (config.LLM_CONNECT_TIMEOUT, config.LLM_REQUEST_TIMEOUT)
+
+def configure_openai(config: Optional[Config] = None) -> Tuple[float, float]:
+    """
+    Point the openai module at the API key and the shared session.
+
+    Every OpenAI client calls this instead of setting openai.api_key itself.
+
+    Args:
+        config (Config): Application configuration.
+
+    Returns:
+        tuple: The per-call timeout to pass as request_timeout.
+    """
+    config = config or Config()
+    openai.api_key = config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+    openai.requestssession = shared_session(config)
+    return request_timeout(config)
@@ -0,0 +1,131 @@
+# electroninja/llm/index_factory.py
+
+import re
+import math
+import numpy as np
+
+
+# Below this many vectors a brute-force scan is both exact and fast enough.
+AUTO_FLAT_LIMIT = 2000
+# FAISS wants roughly this many training points per IVF list or PQ centroid.
+MIN_POINTS_PER_LIST = 39
+# PQ trains 256 centroids per sub-quantizer.
+PQ_MIN_TRAINING_POINTS = 256 * MIN_POINTS_PER_LIST
+
+METRIC_COSINE = "cosine"
+METRIC_L2 = "l2"
+
+# Vector storage choices and their FAISS codes (PQ is sized per dimension).
+STORAGE_CODES = {"float32": "Flat", "float16": "SQfp16", "sq8": "SQ8"}
+STORAGE_PQ = "pq"
+
+def storage_code(storage: str, dim: int, pq_m: int = 0) -> str:
+    """
+    Return the FAISS code for a vector storage choice.
+
+    "float32" keeps full vectors, "float16" halves them, "sq8" stores one byte
+    per dimension and "pq" stores pq_m bytes per vector. pq_m defaults to
+    dim / 4 and is lowered to the nearest divisor of dim.
+    """
+    storage = (storage or "float32").lower()
+    if storage in STORAGE_CODES:
+        return STORAGE_CODES[storage]
+    if storage == STORAGE_PQ:
+        m = min(pq_m or max(1, dim // 4), dim)
+        while dim % m:
+            m -= 1
+        # "np" skips polysemous training, which we do not use and which dominates training time.
+        return f"PQ{m}np"
+    raise ValueError(f"Unknown vector storage: {storage}")
+
+def choose_index_factory(num_vectors: int, code: str = "Flat") -> str:
+    """
+    Pick a FAISS index factory string for a corpus of the given size.
+
+    Small corpora are scanned in full; larger ones use an IVF index with
+    about 4 * sqrt(n) lists, capped so that every list gets enough training
+    points. `code` is the vector storage (see storage_code); PQ storage falls
+    back to SQ8 until there are enough vectors to train it.
+    """
+    if code.startswith("PQ") and num_vectors < PQ_MIN_TRAINING_POINTS:
+        code = STORAGE_CODES["sq8"]
+    if num_vectors < AUTO_FLAT_LIMIT:
+        return code
+    nlist = int(4 * math.sqrt(num_vectors))
+    nlist = max(1, min(nlist, num_vectors // MIN_POINTS_PER_LIST))
+    return f"IVF{nlist},{code}"
+
+def resolve_index_factory(configured: str, num_vectors: int, code: str = "Flat") -> str:
+    """Return the configured factory string, resolving "auto" for the corpus size and storage."""
+    if not configured or configured.lower() == "auto":
+        return choose_index_factory(num_vectors, code)
+    return configured
+
+def needs_rebuild(current: str, desired: str) -> bool:
+    """
+    Decide whether an index built with `current` should be rebuilt as `desired`.
+
+    IVF indexes with the same storage are only rebuilt when the list count is
+    off by more than 2x, so that a growing corpus does not trigger a rebuild on
+    every ingestion run.
+    """
+    if current == desired:
+        return False
+    current_ivf = re.match(r"IVF(\d+),(.*)", current or "")
+    desired_ivf = re.match(r"IVF(\d+),(.*)", desired or "")
+    if current_ivf and desired_ivf and current_ivf.group(2) == desired_ivf.group(2):
+        ratio = int(desired_ivf.group(1)) / max(1, int(current_ivf.group(1)))
+        return ratio > 2 or ratio < 0.5
+    return True
+
+def faiss_metric(faiss, metric: str) -> int:
+    """Map a configured metric name to the FAISS metric constant."""
+    if metric == METRIC_COSINE:
+        return faiss.METRIC_INNER_PRODUCT
+    if metric == METRIC_L2:
+        return faiss.METRIC_L2
+    raise ValueError(f"Unknown vector metric: {metric}")
+
+def create_index(faiss, factory: str, dim: int, metric: str):
+    """
+    Create an empty FAISS index from a factory string such as "Flat",
+    "IVF256,Flat" or "HNSW32".
+
+    The index addresses vectors by explicit document ids (see with_ids), so
+    documents can be replaced or deleted without renumbering the others.
+    """
+    return with_ids(faiss, faiss.index_factory(dim, factory, faiss_metric(faiss, metric)))
+
+def with_ids(faiss, index):
+    """
+    Make an index store caller-assigned ids and reconstruct vectors by id.
+
+    IVF indexes support ids natively and get a hash-table direct map; other
+    types are wrapped in an IndexIDMap2. Indexes saved before ids were used
+    hold their vectors under their positions, which become their ids.
+    """
+    if isinstance(index, faiss.IndexIDMap2):
+        return index
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+    # IndexIDMap2 can only wrap an empty index, so move the vectors out first.
+    vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+    index.reset()
+    wrapped = faiss.IndexIDMap2(index)
+    if vectors is not None:
+        wrapped.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    return wrapped
+
+def configure_search(faiss, index, nprobe: int = None, ef_search: int = None) -> None:
+    """Apply query-time parameters that the index supports; others are ignored."""
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if value is None:
+            continue
+        try:
+            params.set_index_parameter(index, name, value)
+        except RuntimeError:
+            # Not applicable to this index type (e.g. nprobe on HNSW).
+            pass
@@ -0,0 +1,337 @@
+# electroninja/llm/ingestion.py
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from electroninja.config.settings import Config
+from electroninja.llm.dedup import Deduplicator
+from electroninja.llm.embedders import RateLimitedEmbedder
+from electroninja.llm.rate_limit import RateLimiter, estimate_tokens
+
+logger = logging.getLogger('electroninja')
+
+# Upper bound on the estimated tokens in one embedding request.
+MAX_BATCH_TOKENS = 250000
+
+def extract_clean_asc_code(asc_code):
+    """
+    Extract only the pure ASC code starting from 'Version 4'
+    This ensures we don't include descriptions in the ASC code examples
+    """
+    if "Version 4" in asc_code:
+        idx = asc_code.find("Version 4")
+        return asc_code[idx:].strip()
+    return asc_code.strip()
+
+def content_hash(description, clean_asc_code):
+    """
+    Hash the parts of an example that determine its embedding and stored metadata
+    """
+    return hashlib.sha256(f"{description}\n\n{clean_asc_code}".encode("utf-8")).hexdigest()
+
+def iter_examples(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the examples of a metadata file one at a time.
+
+    Both a JSON array (metadata.json) and JSON Lines (one object per line)
+    are accepted. The file is decoded incrementally, so memory does not grow
+    with its size.
+
+    Args:
+        path (str): Path to the metadata file.
+        chunk_size (int): Characters read at a time from a JSON array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from _iter_json_array(f, chunk_size)
+            return
+        f.seek(0)
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"{os.path.basename(path)} line {line_number}: invalid JSON ({str(e)})")
+
+def _iter_json_array(f, chunk_size: int) -> Iterator[Any]:
+    """Decode the items of a JSON array whose opening bracket has been consumed."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer):
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+                yield item
+                continue
+            except json.JSONDecodeError:
+                # The item continues in the next chunk.
+                pass
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if pos < len(buffer):
+                decoder.raw_decode(buffer, pos)
+            raise ValueError("Unexpected end of JSON array")
+        buffer, pos = buffer[pos:] + chunk, 0
+
+def _ordered_map(executor: ThreadPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    """executor.map with at most `window` items in flight, so a long input is not submitted all at once."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class IngestionPipeline:
+    """
+    Streaming, concurrent ingestion of examples into a VectorStore.
+
+    Examples are parsed one at a time, ASC files are read by a thread pool,
+    and batches of new or changed examples are embedded by a second pool
+    whose requests are paced by a RateLimiter (requests per second and tokens
+    per minute), so throughput is bounded by the provider's limits rather
+    than by request latency. A single writer, the calling thread, applies the
+    embedded batches to the index in file order. Every stage holds a bounded
+    number of examples, so memory does not grow with the size of the input;
+    only the example keys and the manifest are kept for the whole run.
+
+    The ingestion manifest (VectorStore.manifest) records the content hash and
+    document id of every ingested example, so a rerun only embeds new or
+    changed examples, updates changed ones in place under their existing ids,
+    removes deleted ones and leaves unchanged vectors alone.
+    """
+
+    def __init__(self, vector_store, config: Optional[Config] = None, limiter: Optional[RateLimiter] = None):
+        self.vector_store = vector_store
+        self.config = config or vector_store.config
+        self.limiter = limiter or RateLimiter(
+            self.config.EMBEDDING_REQUESTS_PER_SECOND, self.config.EMBEDDING_TOKENS_PER_MINUTE
+        )
+        self.batch_size = self.config.EMBEDDING_BATCH_SIZE
+        self.stats = {"unchanged": 0, "added": 0, "updated": 0, "removed": 0, "duplicates": 0, "failed": 0}
+        self.manifest = vector_store.manifest
+        self._keys_by_id = {entry["id"]: key for key, entry in self.manifest.items()}
+        self.deduplicator = None
+        if self.config.DEDUP_ENABLED:
+            self.deduplicator = Deduplicator(vector_store, self.config.DEDUP_SIMILARITY_THRESHOLD, self._keys_by_id)
+        # Indexed examples found to duplicate another example; removed at the end.
+        self._duplicate_keys: List[str] = []
+        # Examples dropped as near duplicates of an indexed document: (example, document id).
+        self._deferred: List[Tuple[Dict[str, Any], int]] = []
+
+    def run(self, examples: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Ingest examples and remove the indexed examples that are no longer listed.
+
+        Args:
+            examples (iterable): Dicts with "asc_path" and "description", e.g.
+                from iter_examples().
+
+        Returns:
+            dict: Counts of unchanged, added, updated, removed, duplicate and
+            failed examples. The store is not saved.
+        """
+        seen = set()
+        self._ingest(examples, seen)
+
+        # Drop vectors of deleted examples and of indexed examples that became duplicates.
+        # Examples that are listed but currently unreadable keep their vectors.
+        stale_keys = [key for key in self.manifest if key not in seen]
+        stale_keys += [key for key in self._duplicate_keys if key in self.manifest]
+        removed_ids = set()
+        if stale_keys:
+            removed_ids = {self.manifest[key]["id"] for key in stale_keys}
+            self.stats["removed"] += self.vector_store.remove_documents(sorted(removed_ids))
+            for key in stale_keys:
+                self._keys_by_id.pop(self.manifest.pop(key)["id"], None)
+            logger.info(f"Removed {len(stale_keys)} deleted or duplicate examples")
+
+        # Near duplicates of a document removed above are ingested after all.
+        requeued = [example for example, doc_id in self._deferred if doc_id in removed_ids]
+        if requeued:
+            logger.info(f"Re-checking {len(requeued)} examples whose representative was removed")
+            for example in requeued:
+                self.deduplicator.forget(example["asc_path"])
+            self.stats["duplicates"] -= len(requeued)
+            self._deferred = []
+            self._ingest(requeued, set())
+        return self.stats
+
+    def _ingest(self, examples: Iterable[Dict[str, Any]], seen: set) -> None:
+        original_embedder = self.vector_store.embedder
+        self.vector_store.embedder = RateLimitedEmbedder(original_embedder, self.limiter)
+        read_workers = max(1, self.config.INGEST_READ_WORKERS)
+        embed_workers = max(1, self.config.INGEST_EMBED_WORKERS)
+        try:
+            with ThreadPoolExecutor(read_workers, thread_name_prefix="ingest-read") as readers, \
+                    ThreadPoolExecutor(embed_workers, thread_name_prefix="ingest-embed") as embedders:
+                in_flight = deque()
+                batch: List[Dict[str, Any]] = []
+                batch_tokens = 0
+                for record in _ordered_map(readers, self._read, self._validated(examples, seen), 4 * read_workers):
+                    record = self._classify(record)
+                    if record is None:
+                        continue
+                    tokens = estimate_tokens(record["text"])
+                    if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > MAX_BATCH_TOKENS):
+                        in_flight.append((batch, embedders.submit(self._embed, batch)))
+                        batch, batch_tokens = [], 0
+                        # Bound the embedded batches waiting for the writer.
+                        while len(in_flight) > 2 * embed_workers:
+                            self._write(*self._result(in_flight.popleft()))
+                    batch.append(record)
+                    batch_tokens += tokens
+                if batch:
+                    in_flight.append((batch, embedders.submit(self._embed, batch)))
+                while in_flight:
+                    self._write(*self._result(in_flight.popleft()))
+        finally:
+            self.vector_store.embedder = original_embedder
+
+    def _validated(self, examples: Iterable[Dict[str, Any]], seen: set) -> Iterator[Tuple[int, str, str, str]]:
+        """Yield (number, key, description, path) for every well-formed, unique example."""
+        for i, example in enumerate(examples, 1):
+            key = example.get("asc_path") if isinstance(example, dict) else None
+            if not key:
+                logger.warning(f"Example {i}: Missing asc_path")
+                continue
+            if key in seen:
+                logger.warning(f"Example {i}: Duplicate asc_path {key}")
+                continue
+            seen.add(key)
+            # Convert relative path if needed
+            asc_path = key if os.path.isabs(key) else os.path.join(self.config.BASE_DIR, key)
+            yield i, key, example.get("description", "No description"), asc_path
+
+    def _read(self, item: Tuple[int, str, str, str]) -> Optional[Dict[str, Any]]:
+        """Read and hash one example (runs on a reader thread)."""
+        i, key, description, asc_path = item
+        try:
+            with open(asc_path, "r", encoding="utf-8") as asc_file:
+                full_asc_code = asc_file.read().strip()
+        except FileNotFoundError:
+            logger.warning(f"Example {i}: File not found: {asc_path}")
+            return None
+        except Exception as e:
+            logger.error(f"Example {i}: Error processing {os.path.basename(asc_path)}: {str(e)}")
+            return None
+
+        # Extract only the pure ASC code starting from "Version 4"
+        clean_asc_code = extract_clean_asc_code(full_asc_code)
+        # Store the embeddings for the combined text, but keep ASC code separate from description
+        # in the storage to avoid duplication in prompts
+        return {
+            "number": i,
+            "key": key,
+            "description": description,
+            "digest": content_hash(description, clean_asc_code),
+            "asc_code": clean_asc_code,
+            "text": f"{description}\n\n{clean_asc_code}",
+            "metadata": {
+                "asc_path": asc_path,
+                "description": description,
+                "pure_asc_code": clean_asc_code
+            },
+        }
+
+    def _classify(self, record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return the record if it has to be embedded; count and drop it otherwise."""
+        if record is None:
+            return None
+        entry = self.manifest.get(record["key"])
+        record["id"] = entry["id"] if entry is not None else None
+        stale = entry is None or entry["content_hash"] != record["digest"]
+        if self.deduplicator is not None:
+            representative = self.deduplicator.check_fingerprint(record["key"], record["asc_code"])
+            if representative is not None:
+                self.stats["duplicates"] += 1
+                if entry is not None:
+                    self._duplicate_keys.append(record["key"])
+                return None
+        if not stale:
+            self.stats["unchanged"] += 1
+            return None
+        logger.info(f"Example {record['number']}: {'Changed' if entry is not None else 'New'} {os.path.basename(record['key'])}")
+        return record
+
+    def _embed(self, batch: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Embed one batch (runs on an embedding thread)."""
+        return self.vector_store.embed_texts([record["text"] for record in batch])
+
+    @staticmethod
+    def _result(item: Tuple[List[Dict[str, Any]], Any]) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+        batch, future = item
+        try:
+            return batch, future.result()
+        except Exception as e:
+            logger.error(f"Embedding error: {str(e)}")
+            return batch, None
+
+    def _write(self, batch: List[Dict[str, Any]], vectors: Optional[np.ndarray]) -> None:
+        """Apply one embedded batch to the store (runs on the calling thread only)."""
+        if vectors is None:
+            logger.error(f"Failed to compute embeddings for {len(batch)} examples")
+            self.stats["failed"] += len(batch)
+            return
+
+        keep = np.ones(len(batch), dtype=bool)
+        if self.deduplicator is not None:
+            for i, (record, match) in enumerate(zip(batch, self.deduplicator.check_similar(batch, vectors))):
+                if match is None:
+                    continue
+                keep[i] = False
+                self.stats["duplicates"] += 1
+                if record["id"] is not None:
+                    self._duplicate_keys.append(record["key"])
+                if match["id"] is not None:
+                    self._deferred.append(({"asc_path": record["key"], "description": record["description"]}, match["id"]))
+
+        # Re-embed changed examples under their existing document ids.
+        updates = [i for i in np.flatnonzero(keep) if batch[i]["id"] is not None]
+        if updates:
+            results = self.vector_store.update_documents(
+                [batch[i]["id"] for i in updates],
+                [batch[i]["text"] for i in updates],
+                [batch[i]["metadata"] for i in updates],
+                vectors=vectors[updates]
+            )
+            for i, ok in zip(updates, results):
+                if ok:
+                    self._record(batch[i], batch[i]["id"])
+                    self.stats["updated"] += 1
+                else:
+                    self.stats["failed"] += 1
+
+        additions = [i for i in np.flatnonzero(keep) if batch[i]["id"] is None]
+        if additions:
+            ids = self.vector_store.add_documents(
+                [batch[i]["text"] for i in additions],
+                [batch[i]["metadata"] for i in additions],
+                vectors=vectors[additions]
+            )
+            for i, doc_id in zip(additions, ids):
+                if doc_id is None:
+                    self.stats["failed"] += 1
+                    continue
+                self._record(batch[i], doc_id)
+                self.stats["added"] += 1
+
+    def _record(self, record: Dict[str, Any], doc_id: int) -> None:
+        self.manifest[record["key"]] = {"asc_path": record["key"], "content_hash": record["digest"], "id": doc_id}
+        self._keys_by_id[doc_id] = record["key"]
@@ -0,0 +1,222 @@
+# electroninja/llm/lexical_index.py
+
+import re
+import math
+import numpy as np
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+# SPICE/SI multipliers, matched case-insensitively ("meg" before "m").
+_SI_PREFIXES = {
+    "f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6,
+    "m": 1e-3, "k": 1e3, "meg": 1e6, "g": 1e9, "t": 1e12,
+}
+_VALUE_RE = re.compile(r"^(\d+(?:\.\d+)?(?:e[+-]?\d+)?)(meg|[fpnuµμmkgt])?([a-zω]*)$")
+_WORD_RE = re.compile(r"[a-z0-9µμω_.+-]+")
+
+_UNITS = {
+    "ω": "ohm", "ohm": "ohm", "ohms": "ohm",
+    "v": "volt", "volt": "volt", "volts": "volt",
+    "a": "amp", "amp": "amp", "amps": "amp",
+    "f": "farad", "farad": "farad", "farads": "farad",
+    "h": "henry", "henry": "henry", "henries": "henry",
+    "hz": "hertz", "hertz": "hertz",
+}
+
+# LTspice symbol names and the words used for them in descriptions.
+_SYMBOL_WORDS = {
+    "res": "resistor", "cap": "capacitor", "ind": "inductor",
+    "diode": "diode", "zener": "diode", "voltage": "source", "current": "source",
+}
+
+_STOP_WORDS = {
+    "a", "an", "and", "the", "of", "with", "in", "on", "to", "is", "are", "for",
+    "by", "at", "as", "or", "each", "its", "it", "be", "that", "this", "from",
+}
+
+# ASC lines that only carry layout coordinates.
+_LAYOUT_KEYWORDS = {"version", "sheet", "wire", "window", "iopin", "line", "rectangle", "circle", "arc"}
+
+def _value_token(word: str) -> List[str]:
+    """Turn a SPICE/engineering value such as 2.2k, 10uF or 0.1e-6 into canonical tokens."""
+    match = _VALUE_RE.match(word)
+    if not match:
+        return []
+    number, prefix, unit = match.groups()
+    try:
+        value = float(number) * (_SI_PREFIXES[prefix] if prefix else 1.0)
+    except ValueError:
+        return []
+    tokens = [f"val:{value:.4g}"]
+    if unit in _UNITS:
+        tokens.append(_UNITS[unit])
+    return tokens
+
+def _word_tokens(word: str) -> List[str]:
+    word = word.strip(".,;:+-")
+    if not word or word in _STOP_WORDS:
+        return []
+    if word[0].isdigit():
+        return _value_token(word) or [word]
+    if word in _UNITS:
+        return [_UNITS[word]]
+    if "-" in word:
+        # "low-pass" matches both "low-pass" and "low pass".
+        parts = [token for part in word.split("-") for token in _word_tokens(part)]
+        return parts + [word]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return [word]
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize a description, an ASC file, or a combination of both.
+
+    Prose is lower-cased, stop words are dropped and plurals are folded.
+    ASC lines contribute symbol types (e.g. "symbol:res" and "resistor"),
+    instance names, flag names and SPICE values, while layout coordinates are
+    ignored. Values are canonicalized so "1k", "1000" and "1kΩ" match.
+    """
+    tokens: List[str] = []
+    for line in text.lower().splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        keyword = fields[0]
+        if keyword in _LAYOUT_KEYWORDS:
+            continue
+        if keyword == "symbol" and len(fields) > 1:
+            symbol = fields[1].split("\\")[-1]
+            tokens.append(f"symbol:{symbol}")
+            tokens.append(_SYMBOL_WORDS.get(symbol, symbol))
+            continue
+        if keyword == "flag" and len(fields) > 3:
+            tokens.append(f"flag:{fields[3]}")
+            continue
+        if keyword == "symattr" and len(fields) > 2:
+            fields = fields[2:]
+        for word in _WORD_RE.findall(" ".join(fields)):
+            tokens.extend(_word_tokens(word))
+    return tokens
+
+class LexicalIndex:
+    """
+    In-memory inverted index over description words and ASC tokens, scored with BM25.
+
+    Documents are addressed by the same stable ids as the vector index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str, doc_id: int) -> None:
+        """Index a document under an id, replacing any document already indexed under it."""
+        if doc_id in self.doc_lengths:
+            self.remove([doc_id])
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings[term][doc_id] = tf
+        length = sum(counts.values())
+        self.doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_ids: Iterable[int]) -> None:
+        """Remove documents by id; ids that are not indexed are ignored."""
+        removed = {doc_id for doc_id in doc_ids if doc_id in self.doc_lengths}
+        if not removed:
+            return
+        for term in list(self.postings):
+            postings = self.postings[term]
+            for doc_id in removed.intersection(postings):
+                del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+        for doc_id in removed:
+            self._total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Rank documents for a query with BM25.
+
+        Returns:
+            list: (doc_id, score) pairs, best first. Documents sharing no
+            term with the query are not returned.
+        """
+        n_docs = len(self.doc_lengths)
+        if n_docs == 0 or top_k <= 0:
+            return []
+        avg_length = self._total_length / n_docs or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc] / avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+    def save(self, path: str) -> None:
+        """Write the index as flat NumPy arrays (term table, offsets, doc ids, term frequencies, lengths)."""
+        terms = sorted(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        docs, tfs = [], []
+        for i, term in enumerate(terms):
+            items = sorted(self.postings[term].items())
+            docs.extend(doc for doc, _ in items)
+            tfs.extend(tf for _, tf in items)
+            offsets[i + 1] = len(docs)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=np.array(terms, dtype=np.str_),
+                offsets=offsets,
+                docs=np.array(docs, dtype=np.int64),
+                tfs=np.array(tfs, dtype=np.int32),
+                doc_ids=np.array(list(self.doc_lengths), dtype=np.int64),
+                doc_lengths=np.array(list(self.doc_lengths.values()), dtype=np.int32),
+                params=np.array([self.k1, self.b], dtype=np.float64),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        with np.load(path, allow_pickle=False) as data:
+            k1, b = data["params"].tolist()
+            index = cls(k1=k1, b=b)
+            terms = data["terms"].tolist()
+            offsets = data["offsets"]
+            docs = data["docs"].tolist()
+            tfs = data["tfs"].tolist()
+            for i, term in enumerate(terms):
+                start, end = int(offsets[i]), int(offsets[i + 1])
+                index.postings[term] = dict(zip(docs[start:end], tfs[start:end]))
+            lengths = data["doc_lengths"].tolist()
+            # Indexes written before stable ids addressed documents by position.
+            doc_ids = data["doc_ids"].tolist() if "doc_ids" in data.files else range(len(lengths))
+            index.doc_lengths = dict(zip(doc_ids, lengths))
+            index._total_length = sum(lengths)
+        return index
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[int, float]]], top_k: int,
+                           k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Fuse several ranked (id, score) lists with reciprocal-rank fusion.
+
+    Each list contributes 1 / (k + rank) for every id it contains; raw scores
+    are ignored, so rankings on different scales can be combined.
+    """
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking, start=1):
+            fused[doc] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top_k]
@@ -0,0 +1,249 @@
+# electroninja/llm/metrics.py
+
+import json
+import math
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from electroninja.config.settings import Config
+
+logger = logging.getLogger('electroninja')
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int, prices: Dict[str, Tuple[float, float]],
+              cached_tokens: int = 0, cached_price_ratio: float = 1.0) -> float:
+    """
+    US dollars for a call, from (input, output) prices per million tokens; 0 for unpriced models.
+
+    Prompt tokens served from the provider's prompt cache cost cached_price_ratio
+    times the input price.
+    """
+    input_price, output_price = prices.get(model, (0.0, 0.0))
+    input_cost = (prompt_tokens - cached_tokens + cached_tokens * cached_price_ratio) * input_price
+    return (input_cost + completion_tokens * output_price) / 1e6
+
+class MetricsRegistry:
+    """
+    Thread-safe record of LLM calls with latency, token and cost summaries.
+
+    Each call is a dict with method, model, prompt_tokens, completion_tokens,
+    cached_tokens (prompt tokens the provider served from its prompt cache),
+    estimated (True when the tokens were counted locally, e.g. for streams),
+    latency (seconds from sending the last attempt to the end of the response),
+    first_token (seconds to the first streamed chunk, None for other calls),
+    queue_wait (seconds spent in the request scheduler before that: rate limits,
+    the concurrency bound and retry backoff), attempts, cost, error and time.
+    Only the most recent max_calls calls are kept.
+    """
+
+    def __init__(self, name: str, max_calls: int = 10000):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=max_calls)
+        self.created = time.time()
+
+    def record(self, call: Dict[str, Any]) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self, method: Optional[str] = None, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The recorded calls, optionally only those of one method or model."""
+        with self._lock:
+            calls = list(self._calls)
+        return [
+            call for call in calls
+            if (method is None or call["method"] == method) and (model is None or call["model"] == model)
+        ]
+
+    @staticmethod
+    def _aggregate(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = [call["latency"] for call in calls]
+        waits = [call["queue_wait"] for call in calls]
+        totals = [call["latency"] + call["queue_wait"] for call in calls]
+        first_tokens = [call["first_token"] for call in calls if call.get("first_token") is not None]
+        # Only calls with usage from the API say how much of the prompt was cached
+        measured = [call for call in calls if not call["estimated"]]
+        measured_prompt_tokens = sum(call["prompt_tokens"] for call in measured)
+        cached_tokens = sum(call.get("cached_tokens", 0) for call in measured)
+        return {
+            "calls": len(calls),
+            "errors": sum(1 for call in calls if call["error"]),
+            "estimated": sum(1 for call in calls if call["estimated"]),
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "cached_tokens": cached_tokens,
+            "cached_ratio": cached_tokens / measured_prompt_tokens if measured_prompt_tokens else 0.0,
+            "cost": round(sum(call["cost"] for call in calls), 6),
+            "latency": {
+                "p50": percentile(latencies, 0.5), "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99), "max": max(latencies, default=0.0),
+                "total": sum(latencies),
+            },
+            "queue_wait": {
+                "p50": percentile(waits, 0.5), "p99": percentile(waits, 0.99), "total": sum(waits),
+            },
+            "first_token": {"p50": percentile(first_tokens, 0.5), "p99": percentile(first_tokens, 0.99)},
+            "total_p99": percentile(totals, 0.99),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Totals and latency/queue-wait percentiles for all calls, and the
+            same per method ("by_method") and per model ("by_model").
+        """
+        calls = self.calls()
+        summary = self._aggregate(calls)
+        summary["name"] = self.name
+        summary["by_method"] = {
+            method: self._aggregate([call for call in calls if call["method"] == method])
+            for method in sorted({call["method"] for call in calls})
+        }
+        summary["by_model"] = {
+            model: self._aggregate([call for call in calls if call["model"] == model])
+            for model in sorted({call["model"] for call in calls})
+        }
+        return summary
+
+    def slowest_method(self, fraction: float = 0.99) -> Optional[str]:
+        """The method with the highest queue wait + latency at the given percentile."""
+        by_method: Dict[str, List[float]] = {}
+        for call in self.calls():
+            by_method.setdefault(call["method"], []).append(call["latency"] + call["queue_wait"])
+        if not by_method:
+            return None
+        return max(by_method, key=lambda method: percentile(by_method[method], fraction))
+
+    def prompt_cache_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dict: Per method {"calls", "prompt_tokens", "cached_tokens",
+            "cached_ratio", "first_token_p50", "cost"}, from calls with API usage.
+        """
+        report = {}
+        for method, stats in self.summary()["by_method"].items():
+            report[method] = {
+                "calls": stats["calls"] - stats["estimated"],
+                "prompt_tokens": stats["prompt_tokens"],
+                "cached_tokens": stats["cached_tokens"],
+                "cached_ratio": stats["cached_ratio"],
+                "first_token_p50": stats["first_token"]["p50"],
+                "cost": stats["cost"],
+            }
+        return report
+
+    def to_json(self, include_calls: bool = False) -> str:
+        data = {"summary": self.summary()}
+        if include_calls:
+            data["calls"] = self.calls()
+        return json.dumps(data, indent=2, default=str)
+
+    def dump(self, path: str, include_calls: bool = True) -> str:
+        """
+        Write the summary (and the individual calls) to a JSON file.
+
+        Returns:
+            str: The path written.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(include_calls))
+        logger.info(f"Saved LLM metrics '{self.name}' to {path}")
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+
+_lock = threading.Lock()
+_process: Optional[MetricsRegistry] = None
+_sessions: Dict[str, MetricsRegistry] = {}
+_current_session: ContextVar[Optional[MetricsRegistry]] = ContextVar("electroninja_metrics_session", default=None)
+
+def _dump_process_metrics(path: str) -> None:
+    try:
+        if _process is not None and _process.calls():
+            _process.dump(path)
+    except Exception as e:
+        logger.error(f"Error saving LLM metrics: {str(e)}")
+
+def process_metrics(config: Optional[Config] = None) -> MetricsRegistry:
+    """
+    Return the registry of every LLM call made by this process.
+
+    With METRICS_PATH set, it is dumped there when the process exits.
+    """
+    global _process
+    with _lock:
+        if _process is None:
+            config = config or Config()
+            _process = MetricsRegistry("process", config.METRICS_MAX_CALLS)
+            if config.METRICS_PATH:
+                atexit.register(_dump_process_metrics, config.METRICS_PATH)
+        return _process
+
+def session_metrics(session_id) -> MetricsRegistry:
+    """Return (creating it if needed) the registry of one chat session or prompt."""
+    session_id = str(session_id)
+    with _lock:
+        registry = _sessions.get(session_id)
+        if registry is None:
+            registry = MetricsRegistry(f"session {session_id}")
+            _sessions[session_id] = registry
+        return registry
+
+def close_session(session_id) -> Optional[MetricsRegistry]:
+    """
+    Forget a session once it has ended, so session registries do not pile up.
+
+    Returns:
+        MetricsRegistry: The session's registry, or None if there was none.
+    """
+    with _lock:
+        return _sessions.pop(str(session_id), None)
+
+def current_session_metrics() -> Optional[MetricsRegistry]:
+    return _current_session.get()
+
+@contextmanager
+def metrics_session(session_id, close: bool = False) -> Iterator[MetricsRegistry]:
+    """
+    Attribute the LLM calls made inside the block to a session.
+
+    The session follows the context into asyncio tasks and asyncio.to_thread
+    calls started inside the block.
+
+    Args:
+        session_id: Chat session or prompt the calls belong to.
+        close (bool): Forget the session when the block ends (see close_session);
+            the yielded registry keeps its calls.
+    """
+    registry = session_metrics(session_id)
+    token = _current_session.set(registry)
+    try:
+        yield registry
+    finally:
+        _current_session.reset(token)
+        if close:
+            with _lock:
+                # Another block may have reopened the session id meanwhile
+                if _sessions.get(str(session_id)) is registry:
+                    del _sessions[str(session_id)]
+
+def record_call(call: Dict[str, Any], config: Optional[Config] = None) -> None:
+    """Add a call to the process registry and to the current session's, if any."""
+    process_metrics(config).record(call)
+    session = _current_session.get()
+    if session is not None:
+        session.record(call)
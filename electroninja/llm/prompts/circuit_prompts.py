@@ -106,17 +106,18 @@ VISION_IMAGE_ANALYSIS_PROMPT = (
 )
 
 # Enhanced refinement prompt template for correcting .asc files
+# The instruction files come first, in the same layout as ASC generation, so
+# generation and every refinement iteration share one cacheable prompt prefix
 ASC_REFINEMENT_PROMPT_TEMPLATE = (
+    "{instruction_files}\n"
     "You are a world-class electrical engineer specialized in fixing incorrect LTSpice .asc files.\n"
-    "Your task is to produce the correct .asc code based on the inputs provided below. Do not include any extra commentary.\n\n"
+    "Your task is to produce the correct .asc code based on the instructions above and the inputs provided below. Do not include any extra commentary.\n\n"
     "--- ORIGINAL CIRCUIT DESCRIPTION ---\n"
     "{original_description}\n\n"
     "--- INCORRECT ASC CODE ---\n"
     "{incorrect_asc}\n\n"
     "--- VISION FEEDBACK ---\n"
     "{vision_feedback}\n\n"
-    "--- INSTRUCTION FILES ---\n"
-    "{instruction_files}\n\n"
     "--- FINAL TASK ---\n"
     "Make sure that you leave enough space between the components in your sketching so that they do not overlap or cross each other.\n"
     "Produce ONLY the corrected .asc code with no additional explanation."
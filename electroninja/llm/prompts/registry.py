@@ -0,0 +1,162 @@
+# electroninja/llm/prompts/registry.py
+
+import os
+import time
+import logging
+import threading
+from itertools import combinations
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger('electroninja')
+
+INSTRUCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instructions")
+
+# Component letter -> (section title, instruction file), in prompt order: sorted
+# by letter, so the instruction prefix of a prompt depends only on its set of
+# components and is shared by every call for that set (provider prompt caching)
+COMPONENT_INSTRUCTIONS = {
+    "C": ("CAPACITOR", "capacitor_instruct.txt"),
+    "D": ("DIODE", "diode_instruct.txt"),
+    "L": ("INDUCTOR", "inductor_instruct.txt"),
+    "R": ("RESISTOR", "resistor_instruct.txt"),
+}
+BASE_INSTRUCTIONS = (("GENERAL", "general_instruct.txt"), ("BATTERY", "battery_instruct.txt"))
+
+def component_key(components: str) -> str:
+    """The instruction letters (C, D, L, R) mentioned in an evaluation result such as "V, R, C", sorted."""
+    components = (components or "").upper()
+    return "".join(letter for letter in COMPONENT_INSTRUCTIONS if letter in components)
+
+class PromptRegistry:
+    """
+    In-memory cache of the prompt instruction files and the blocks built from them.
+
+    Instruction files are read once. The instruction block for every one of
+    the 16 combinations of C/D/L/R is assembled up front, so building a
+    prompt is a dictionary lookup plus string formatting. ASC generation and
+    refinement both start their prompt with the same block, so they share
+    the provider-side cached prefix. Files are checked for changes (by mtime) at
+    most every check_interval seconds, and everything is rebuilt when one
+    changed. Per-prompt files (components.txt, description.txt, code.asc)
+    are read with read_file, which does not cache them: they change while the
+    application runs and there is one set per prompt, so caching them would
+    only grow without bound.
+    """
+
+    def __init__(self, instructions_dir: str = INSTRUCTIONS_DIR, check_interval: float = 2.0):
+        """
+        Args:
+            instructions_dir (str): Directory holding the instruction files.
+            check_interval (float): Seconds between mtime checks (0 checks on every call).
+        """
+        self.instructions_dir = instructions_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # Path -> (mtime_ns, size, text)
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        self._checked: Dict[str, float] = {}
+        # Letters -> instruction block
+        self._blocks: Dict[str, str] = {}
+        self._blocks_version: Optional[Tuple] = None
+        self.loads = 0
+
+    @staticmethod
+    def read_file(path: str) -> Optional[str]:
+        """
+        Return the contents of a text file without caching it.
+
+        Returns:
+            str: The file contents, or None if it does not exist.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_text(self, path: str) -> Optional[str]:
+        """
+        Return the contents of an instruction file, re-reading it only when its mtime or size changed.
+
+        Args:
+            path (str): File to read.
+
+        Returns:
+            str: The file contents, or None if it does not exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and now - self._checked.get(path, 0) < self.check_interval:
+                return cached[2]
+            self._checked[path] = now
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._files.pop(path, None)
+                return None
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return cached[2]
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            self._files[path] = (stat.st_mtime_ns, stat.st_size, text)
+            self.loads += 1
+            return text
+
+    def instruction(self, filename: str) -> str:
+        """Return an instruction file's text, or "" if it cannot be read."""
+        try:
+            text = self.read_text(os.path.join(self.instructions_dir, filename))
+            if text is None:
+                raise FileNotFoundError(filename)
+            return text
+        except Exception as e:
+            logger.error(f"Error loading {filename}: {str(e)}")
+            return ""
+
+    def _build_blocks(self, texts: Dict[str, str]) -> Dict[str, str]:
+        blocks = {}
+        letters = list(COMPONENT_INSTRUCTIONS)
+        for size in range(len(letters) + 1):
+            for combo in combinations(letters, size):
+                sections = [(title, texts[filename]) for title, filename in BASE_INSTRUCTIONS]
+                for letter in combo:
+                    title, filename = COMPONENT_INSTRUCTIONS[letter]
+                    sections.append((title, texts[filename]))
+                blocks["".join(combo)] = "\n".join(
+                    f"=== {title} INSTRUCTIONS ===\n{text}\n" for title, text in sections
+                )
+        return blocks
+
+    def instruction_block(self, components: str) -> str:
+        """
+        Return the instruction section that starts ASC generation and refinement prompts.
+
+        Args:
+            components (str): Component letters, e.g. "V, R, C"; C, D, L and R
+                add their instructions, in that order, after the general and
+                battery ones.
+
+        Returns:
+            str: The instruction block.
+        """
+        filenames = [filename for _, filename in BASE_INSTRUCTIONS]
+        filenames += [filename for _, filename in COMPONENT_INSTRUCTIONS.values()]
+        texts = {filename: self.instruction(filename) for filename in filenames}
+        version = tuple(self._files.get(os.path.join(self.instructions_dir, f), (None, None))[:2] for f in filenames)
+        with self._lock:
+            if version != self._blocks_version:
+                self._blocks = self._build_blocks(texts)
+                self._blocks_version = version
+            return self._blocks[component_key(components)]
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+def shared_prompt_registry(check_interval: float = 2.0) -> PromptRegistry:
+    """Return the process-wide registry for the packaged instruction files."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PromptRegistry(check_interval=check_interval)
+        return _registry
@@ -1,4 +1,5 @@
 from electroninja.llm.providers.base import LLMProvider
 from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
 
-__all__ = ['LLMProvider', 'OpenAIProvider']
\ No newline at end of file
+__all__ = ['LLMProvider', 'OpenAIProvider', 'AsyncOpenAIProvider']
\ No newline at end of file
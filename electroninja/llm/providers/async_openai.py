@@ -0,0 +1,216 @@
+import time
+import asyncio
+import openai
+import logging
+from contextlib import contextmanager
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.http_client import shared_async_session
+from electroninja.llm.prompts.circuit_prompts import (
+    ASC_SYSTEM_PROMPT,
+    CIRCUIT_RELEVANCE_EVALUATION_PROMPT,
+    DESCRIPTION_PROMPT
+)
+from electroninja.llm.prompts.chat_prompts import (
+    CIRCUIT_CHAT_PROMPT,
+    VISION_FEEDBACK_PROMPT
+)
+from electroninja.llm.prompts.button_prompts import (
+    COMPILE_CODE_COMP_PROMPT
+)
+
+logger = logging.getLogger('electroninja')
+
+class AsyncOpenAIProvider(OpenAIProvider):
+    """
+    OpenAI provider whose LLM calls are coroutines.
+
+    The methods mirror OpenAIProvider (same prompts, models, return values
+    and error fallbacks) but await openai.ChatCompletion.acreate, through the
+    request scheduler, on the shared aiohttp session (see http_client), so
+    calls from several chat sessions or pipeline stages overlap on one event
+    loop (e.g. the qasync loop in main.py) instead of blocking it. Prompt files are read in a worker thread.
+    """
+
+    @contextmanager
+    def _session(self):
+        # openai reads the session from a context variable, which is per task,
+        # so it is set around each call rather than once.
+        token = openai.aiosession.set(shared_async_session(self.config))
+        try:
+            yield
+        finally:
+            openai.aiosession.reset(token)
+
+    async def _complete(self, method: str, model: str, messages: list) -> str:
+        with self._session():
+            response = await self.scheduler.acreate(
+                method=method,
+                model=model,
+                messages=messages,
+                request_timeout=self.request_timeout
+            )
+        return response.choices[0].message.content.strip()
+
+    async def _cached_complete(self, method: str, model: str, messages: list, use_cache: bool) -> str:
+        # The response cache is SQLite, so it is read and written off the event loop
+        key, result = await asyncio.to_thread(self._cached_response, method, model, messages, use_cache)
+        if result is None:
+            started = time.perf_counter()
+            result = await self._complete(method, model, messages)
+            await asyncio.to_thread(self._store_response, method, key, result, started)
+        return result
+
+    async def _classifier_call(self, func, *args):
+        """Run a fast-path classifier step, off the event loop when it appends to the decision log."""
+        if self.request_classifier is not None and self.request_classifier.log_path:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def evaluate_circuit_request(self, prompt: str, use_cache: bool = True, use_fast_path: bool = True) -> str:
+        try:
+            result = await self._classifier_call(self._fast_path_evaluation, prompt, use_fast_path)
+            if result is not None:
+                return result
+            evaluation_prompt = CIRCUIT_RELEVANCE_EVALUATION_PROMPT.format(prompt=prompt)
+            logger.info(f"Evaluating if request is circuit-related: {prompt}")
+            # Either 'N' or the component letters (e.g., "V, R, C")
+            result = await self._cached_complete("evaluate_circuit_request", self.evaluation_model,
+                                                 [{"role": "user", "content": evaluation_prompt}], use_cache)
+            logger.info(f"Evaluation result for '{prompt}': {result}")
+            await self._classifier_call(self._record_model_evaluation, prompt, result, use_fast_path)
+            return result
+        except Exception as e:
+            logger.error(f"Error evaluating request: {str(e)}")
+            return "N"
+
+    async def create_description(self, previous_description: str, new_request: str, use_cache: bool = True) -> str:
+        """
+        Merge a current circuit description with a new modification request to a new description.
+
+        Args:
+            previous_description: The previous circuit description
+            new_request: The new modification request from the user
+            use_cache: Set to False to skip the response cache
+
+        Returns:
+            A merged, comprehensive circuit description
+        """
+        previous_description = previous_description if previous_description is not None else "None"
+        description_prompt = DESCRIPTION_PROMPT.format(
+            previous_description=previous_description,
+            new_request=new_request
+        )
+        self.logger.info("Generating description using prompt:\n" + description_prompt)
+        try:
+            new_description = await self._cached_complete("create_description", self.description_model,
+                                                          [{"role": "user", "content": description_prompt}], use_cache)
+            self.logger.info("Merged result:\n" + new_description)
+            return new_description
+        except Exception as e:
+            self.logger.error("Error generating description: " + str(e))
+            return new_request
+
+    async def _stream_asc_code(self, messages: list, on_partial=None) -> str:
+        parser = self._new_stream_parser(on_partial)
+        with self._session():
+            stream = await self.scheduler.acreate(
+                method="generate_asc_code",
+                model=self.asc_gen_model,
+                messages=messages,
+                stream=True,
+                request_timeout=self.request_timeout
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and parser.feed(chunk.choices[0].delta.get("content") or ""):
+                        break
+            finally:
+                # Stops reading. With openai 0.28 and the shared aiohttp session the HTTP
+                # response is only released once it is garbage collected.
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+        return self._stream_result(parser)
+
+    async def generate_asc_code(self, description: str, examples=None, prompt_id: int = None, on_partial=None) -> str:
+        """
+        Generates the ASC code for the given circuit description (see OpenAIProvider.generate_asc_code).
+        """
+        self.logger.info(f"Generating ASC code for circuit description: {description}")
+        user_prompt = await asyncio.to_thread(self._build_prompt, description, examples, prompt_id)
+
+        print(f"\n{'='*80}\nASC GENERATION PROMPT:\n{'='*80}")
+        print(user_prompt)
+
+        messages = [
+            {"role": "system", "content": ASC_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+        try:
+            if self.config.ASC_STREAMING:
+                return await self._stream_asc_code(messages, on_partial)
+            asc_code = await self._complete("generate_asc_code", self.asc_gen_model, messages)
+            if asc_code.upper() == "N":
+                return "N"
+            return self.extract_clean_asc_code(asc_code)
+        except Exception as e:
+            self.logger.error(f"Error generating ASC code: {str(e)}")
+            return "Error: Failed to generate circuit"
+
+    async def generate_chat_response(self, prompt: str) -> str:
+        try:
+            chat_prompt = CIRCUIT_CHAT_PROMPT.format(prompt=prompt)
+            logger.info(f"Generating chat response for prompt: {prompt}")
+            return await self._complete("generate_chat_response", self.chat_model,
+                                        [{"role": "user", "content": chat_prompt}])
+        except Exception as e:
+            logger.error(f"Error generating chat response: {str(e)}")
+            return "Error generating chat response"
+
+    async def generate_vision_feedback_response(self, vision_feedback: str) -> str:
+        try:
+            is_success = vision_feedback.strip() == 'Y'
+            prompt = VISION_FEEDBACK_PROMPT.format(vision_feedback=vision_feedback)
+            logger.info(f"Generating vision feedback response (success={is_success})")
+            return await self._complete("generate_vision_feedback_response", self.chat_model,
+                                        [{"role": "user", "content": prompt}])
+        except Exception as e:
+            logger.error(f"Error generating vision feedback response: {str(e)}")
+            return "Error generating vision feedback response"
+
+    async def refine_asc_code(self, prompt_id: int, iteration: int, vision_feedback: str) -> str:
+        """
+        Refines the incorrect ASC code using the composite refinement prompt
+        (see OpenAIProvider.refine_asc_code).
+        """
+        try:
+            refinement_prompt = await asyncio.to_thread(
+                self._build_refinement_prompt, prompt_id, iteration, vision_feedback
+            )
+            self.logger.info("Refining ASC code based on feedback using new refinement prompt.")
+            return await self._complete("refine_asc_code", self.asc_gen_model, [
+                {"role": "system", "content": ASC_SYSTEM_PROMPT},
+                {"role": "user", "content": refinement_prompt}
+            ])
+        except Exception as e:
+            self.logger.error(f"Error refining ASC code: {str(e)}")
+            return "Error refining ASC code"
+
+    async def list_components(self, asc_code: str, use_cache: bool = True) -> str:
+        """
+        Lists the components present in the given ASC code.
+
+        Args:
+            asc_code (str): The ASC code to analyze.
+            use_cache (bool): Set to False to skip the response cache.
+
+        Returns:
+            str: A string listing the components found in the ASC code.
+        """
+        try:
+            prompt = COMPILE_CODE_COMP_PROMPT.format(asc_code=asc_code)
+            self.logger.info("Listing components from ASC code.")
+            return await self._cached_complete("list_components", self.merger_model,
+                                               [{"role": "user", "content": prompt}], use_cache)
+        except Exception as e:
+            self.logger.error(f"Error listing components: {str(e)}")
+            return "Error listing components"
@@ -1,8 +1,14 @@
 import os
-import openai
+import time
 import logging
 from electroninja.config.settings import Config
 from electroninja.llm.providers.base import LLMProvider
+from electroninja.llm.http_client import configure_openai
+from electroninja.llm.request_scheduler import shared_request_scheduler
+from electroninja.llm.response_cache import ResponseCache, shared_response_cache
+from electroninja.llm.asc_stream import AscStreamParser
+from electroninja.llm.prompts.registry import shared_prompt_registry
+from electroninja.llm.request_classifier import RequestClassifier
 from electroninja.llm.prompts.circuit_prompts import (
     ASC_SYSTEM_PROMPT,
     ASC_REFINEMENT_PROMPT_TEMPLATE,
@@ -25,26 +31,80 @@ class OpenAIProvider(LLMProvider):
     
     def __init__(self, config=None):
         self.config = config or Config()
-        openai.api_key = self.config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+        self.request_timeout = configure_openai(self.config)
+        # Rate limits, concurrency bound and retries shared by every model call
+        self.scheduler = shared_request_scheduler(self.config)
         self.asc_gen_model = self.config.ASC_MODEL
         self.chat_model = self.config.CHAT_MODEL
         self.evaluation_model = self.config.EVALUATION_MODEL  
         self.merger_model = self.config.MERGER_MODEL
         self.description_model = self.config.DESCRIPTION_MODEL
+        # Shared memory + disk cache for the deterministic calls (None when disabled)
+        self.response_cache = shared_response_cache(self.config)
+        # Instruction files and their 16 component combinations, kept in memory
+        self.prompts = shared_prompt_registry(self.config.PROMPT_RELOAD_INTERVAL)
+        # Answers clear relevance evaluations locally (None when disabled)
+        self.request_classifier = None
+        if self.config.FAST_PATH_CLASSIFIER:
+            self.request_classifier = RequestClassifier(
+                self.config.FAST_PATH_MIN_WORDS_FOR_N,
+                self.config.FAST_PATH_LOG_PATH or None
+            )
         self.logger = logger        
         
-    def evaluate_circuit_request(self, prompt: str) -> str:
+    def _cached_response(self, method: str, model: str, messages: list, use_cache: bool):
+        """
+        Look up a response in the response cache.
+
+        Returns:
+            tuple: (cache key, cached response or None). The key is None when
+            the result must not be cached.
+        """
+        if not use_cache or self.response_cache is None:
+            return None, None
+        key = ResponseCache.make_key(model, messages)
+        return key, self.response_cache.get(method, key)
+
+    def _store_response(self, method: str, key, response: str, started: float) -> None:
+        if key is not None:
+            self.response_cache.put(method, key, response, time.perf_counter() - started)
+
+    def _fast_path_evaluation(self, prompt: str, use_fast_path: bool):
+        """The local classifier's answer to a relevance evaluation, or None to ask the model."""
+        if not use_fast_path or self.request_classifier is None:
+            return None
+        result = self.request_classifier.classify(prompt)
+        if result is not None:
+            logger.info(f"Evaluation result for '{prompt}' (local): {result}")
+        return result
+
+    def _record_model_evaluation(self, prompt: str, result: str, use_fast_path: bool) -> None:
+        if use_fast_path and self.request_classifier is not None:
+            self.request_classifier.record_model_result(prompt, result)
+
+    def evaluate_circuit_request(self, prompt: str, use_cache: bool = True, use_fast_path: bool = True) -> str:
         try:
+            result = self._fast_path_evaluation(prompt, use_fast_path)
+            if result is not None:
+                return result
             # Format the evaluation prompt with the new instructions
             evaluation_prompt = CIRCUIT_RELEVANCE_EVALUATION_PROMPT.format(prompt=prompt)
             logger.info(f"Evaluating if request is circuit-related: {prompt}")
-            response = openai.ChatCompletion.create(
-                model=self.evaluation_model,
-                messages=[{"role": "user", "content": evaluation_prompt}]
-            )
-            # Return the raw result string: either 'N' or the component letters (e.g., "V, R, C")
-            result = response.choices[0].message.content.strip()
+            messages = [{"role": "user", "content": evaluation_prompt}]
+            key, result = self._cached_response("evaluate_circuit_request", self.evaluation_model, messages, use_cache)
+            if result is None:
+                started = time.perf_counter()
+                response = self.scheduler.create(
+                    method="evaluate_circuit_request",
+                    model=self.evaluation_model,
+                    messages=messages,
+                    request_timeout=self.request_timeout
+                )
+                # Return the raw result string: either 'N' or the component letters (e.g., "V, R, C")
+                result = response.choices[0].message.content.strip()
+                self._store_response("evaluate_circuit_request", key, result, started)
             logger.info(f"Evaluation result for '{prompt}': {result}")
+            self._record_model_evaluation(prompt, result, use_fast_path)
             return result
         except Exception as e:
             logger.error(f"Error evaluating request: {str(e)}")
@@ -52,13 +112,14 @@ class OpenAIProvider(LLMProvider):
             return "N"
 
         
-    def create_description(self, previous_description: str, new_request: str) -> str:
+    def create_description(self, previous_description: str, new_request: str, use_cache: bool = True) -> str:
         """
         Merge a current circuit description with a new modification request to a new description.
         
         Args:
             previous_description: The previous circuit description
             new_request: The new modification request from the user
+            use_cache: Set to False to skip the response cache
             
         Returns:
             A merged, comprehensive circuit description
@@ -72,11 +133,18 @@ class OpenAIProvider(LLMProvider):
         self.logger.info("Generating description using prompt:\n" + description_prompt)
         
         try:
-            response = openai.ChatCompletion.create(
-                model=self.description_model,
-                messages=[{"role": "user", "content": description_prompt}]
-            )
-            new_description = response.choices[0].message.content.strip()
+            messages = [{"role": "user", "content": description_prompt}]
+            key, new_description = self._cached_response("create_description", self.description_model, messages, use_cache)
+            if new_description is None:
+                started = time.perf_counter()
+                response = self.scheduler.create(
+                    method="create_description",
+                    model=self.description_model,
+                    messages=messages,
+                    request_timeout=self.request_timeout
+                )
+                new_description = response.choices[0].message.content.strip()
+                self._store_response("create_description", key, new_description, started)
             
             self.logger.info("Merged result:\n" + new_description)
             
@@ -95,59 +163,39 @@ class OpenAIProvider(LLMProvider):
         """
         Loads an instruction file from electroninja/llm/prompts/instructions/ directory.
         """
-        instruct_path = os.path.join("electroninja", "llm", "prompts", "instructions", filename)
+        return self.prompts.instruction(filename)
+
+    def _prompt_file(self, prompt_id: int, *parts: str) -> str:
+        """Path of a file in the output folder of a prompt, e.g. ("components.txt",)."""
+        return os.path.join(self.config.OUTPUT_DIR, f"prompt{prompt_id}", *parts)
+
+    def _load_components(self, prompt_id: int) -> str:
+        """The component letters saved for a prompt (see RequestEvaluator), or "" if there are none."""
+        if prompt_id is None:
+            return ""
         try:
-            with open(instruct_path, "r", encoding="utf-8") as f:
-                return f.read()
+            return (self.prompts.read_file(self._prompt_file(prompt_id, "components.txt")) or "").strip().upper()
         except Exception as e:
-            self.logger.error(f"Error loading {filename}: {str(e)}")
+            self.logger.error(f"Error reading components file: {str(e)}")
             return ""
 
     def _build_prompt(self, description: str, examples=None, prompt_id: int = None) -> str:
         """
         Builds the complete prompt for ASC generation.
         
-        It includes:
+        Static parts come first, so the prompt prefix (after ASC_SYSTEM_PROMPT)
+        is the same for every request with the same components and can be
+        served from the provider's prompt cache. It includes:
          1. General instructions and battery instructions.
-         2. Additional component instructions based on the components file.
+         2. Additional component instructions based on the components file, sorted by letter.
          3. Top examples from the vector DB.
          4. The final circuit description.
          5. A final task instruction.
         """
-        prompt_parts = []
-
-        # 1. General instructions.
-        general_instruct = self._load_instruction("general_instruct.txt")
-        prompt_parts.append("=== GENERAL INSTRUCTIONS ===\n" + general_instruct + "\n")
+        # 1-2. General, battery and per-component instructions for the saved components.
+        prompt_parts = [self.prompts.instruction_block(self._load_components(prompt_id))]
 
-        # 2. Battery instructions.
-        battery_instruct = self._load_instruction("battery_instruct.txt")
-        prompt_parts.append("=== BATTERY INSTRUCTIONS ===\n" + battery_instruct + "\n")
-
-        # 3. Additional component instructions based on saved components.
-        if prompt_id is not None:
-            components_path = os.path.join("data", "output", f"prompt{prompt_id}", "components.txt")
-            if os.path.exists(components_path):
-                try:
-                    with open(components_path, "r", encoding="utf-8") as f:
-                        components_text = f.read().strip().upper()
-                    # For each component letter, add corresponding instructions.
-                    if "R" in components_text:
-                        resistor_instruct = self._load_instruction("resistor_instruct.txt")
-                        prompt_parts.append("=== RESISTOR INSTRUCTIONS ===\n" + resistor_instruct + "\n")
-                    if "C" in components_text:
-                        capacitor_instruct = self._load_instruction("capacitor_instruct.txt")
-                        prompt_parts.append("=== CAPACITOR INSTRUCTIONS ===\n" + capacitor_instruct + "\n")
-                    if "L" in components_text:
-                        inductor_instruct = self._load_instruction("inductor_instruct.txt")
-                        prompt_parts.append("=== INDUCTOR INSTRUCTIONS ===\n" + inductor_instruct + "\n")
-                    if "D" in components_text:
-                        diode_instruct = self._load_instruction("diode_instruct.txt")
-                        prompt_parts.append("=== DIODE INSTRUCTIONS ===\n" + diode_instruct + "\n")
-                except Exception as e:
-                    self.logger.error(f"Error reading components file: {str(e)}")
-
-        # 4. Include examples from the vector database, if any.
+        # 3. Include examples from the vector database, if any.
         # if examples and len(examples) > 0:
         #     prompt_parts.append(
         #         "You also will be provided with three example ASC files that are relevant to the user's query. " 
@@ -163,19 +211,23 @@ class OpenAIProvider(LLMProvider):
         #         prompt_parts.append(f"Example {i}:\nDescription: {ex_desc}\nASC Code:\n{ex_asc}\n")
         #     prompt_parts.append("\n")
 
-        # 5. Append the circuit description.
+        # 4. Append the circuit description.
         prompt_parts.append("=== CIRCUIT DESCRIPTION ===\n" + description + "\n")
 
-        # 6. Final task instruction.
+        # 5. Final task instruction.
         prompt_parts.append("=== TASK ===\nBased on the above instructions, examples, and circuit description, generate the complete .asc code. Your output must contain only valid .asc code with no extra commentary.")
 
         final_prompt = "\n".join(prompt_parts)
         return final_prompt
 
-    def generate_asc_code(self, description: str, examples=None, prompt_id: int = None) -> str:
+    def generate_asc_code(self, description: str, examples=None, prompt_id: int = None, on_partial=None) -> str:
         """
         Generates the ASC code for the given circuit description by building a composite prompt
         that includes system instructions, various component instructions, examples, and the description.
+
+        With ASC_STREAMING on, the completion is streamed and validated line by
+        line; generation stops as soon as the model answers N or writes lines
+        that are not ASC, and on_partial (if given) receives the ASC accepted so far.
         """
         self.logger.info(f"Generating ASC code for circuit description: {description}")
         system_prompt = ASC_SYSTEM_PROMPT  # This will be sent as the system message
@@ -185,13 +237,18 @@ class OpenAIProvider(LLMProvider):
         print(f"\n{'='*80}\nASC GENERATION PROMPT:\n{'='*80}")
         print(user_prompt)
 
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
         try:
-            response = openai.ChatCompletion.create(
+            if self.config.ASC_STREAMING:
+                return self._stream_asc_code(messages, on_partial)
+            response = self.scheduler.create(
+                method="generate_asc_code",
                 model=self.asc_gen_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
+                request_timeout=self.request_timeout
             )
             asc_code = response.choices[0].message.content.strip()
             if asc_code.upper() == "N":
@@ -204,13 +261,51 @@ class OpenAIProvider(LLMProvider):
 
 
     
+    def _new_stream_parser(self, on_partial=None) -> AscStreamParser:
+        return AscStreamParser(self.config.ASC_STREAM_MAX_INVALID_LINES, on_partial,
+                               self.config.ASC_STREAM_MAX_PREAMBLE_LINES)
+
+    def _stream_asc_code(self, messages: list, on_partial=None) -> str:
+        """Stream an ASC completion, closing the stream as soon as the parser rejects it."""
+        parser = self._new_stream_parser(on_partial)
+        stream = self.scheduler.create(
+            method="generate_asc_code",
+            model=self.asc_gen_model,
+            messages=messages,
+            stream=True,
+            request_timeout=self.request_timeout
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and parser.feed(chunk.choices[0].delta.get("content") or ""):
+                    break
+        finally:
+            # Stops reading. With openai 0.28 the sync stream does not close its HTTP
+            # response here; the connection is only released once it is garbage collected.
+            if hasattr(stream, "close"):
+                stream.close()
+        return self._stream_result(parser)
+
+    def _stream_result(self, parser: AscStreamParser) -> str:
+        """Same return values as generate_asc_code for a streamed completion."""
+        verdict = parser.finish()
+        if verdict == "N":
+            return "N"
+        if verdict == "invalid":
+            self.logger.error(f"Error generating ASC code: {parser.reason}")
+            return "Error: Failed to generate circuit"
+        # Only the lines the parser accepted: prose it skipped stays out of the ASC
+        return parser.asc.strip()
+
     def generate_chat_response(self, prompt: str) -> str:
         try:
             chat_prompt = f"{CIRCUIT_CHAT_PROMPT.format(prompt=prompt)}"
             logger.info(f"Generating chat response for prompt: {prompt}")
-            response = openai.ChatCompletion.create(
+            response = self.scheduler.create(
+                method="generate_chat_response",
                 model=self.chat_model,
-                messages=[{"role": "user", "content": chat_prompt}]
+                messages=[{"role": "user", "content": chat_prompt}],
+                request_timeout=self.request_timeout
             )
             chat_response = response.choices[0].message.content.strip()
             return chat_response
@@ -225,9 +320,11 @@ class OpenAIProvider(LLMProvider):
                 vision_feedback=vision_feedback
             )
             logger.info(f"Generating vision feedback response (success={is_success})")
-            response = openai.ChatCompletion.create(
+            response = self.scheduler.create(
+                method="generate_vision_feedback_response",
                 model=self.chat_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                request_timeout=self.request_timeout
             )
             feedback_response = response.choices[0].message.content.strip()
             return feedback_response
@@ -238,61 +335,29 @@ class OpenAIProvider(LLMProvider):
     def _build_refinement_prompt(self, prompt_id: int, iteration: int, vision_feedback: str) -> str:
         """
         Builds the composite prompt for refining ASC code using the new template.
+        The instruction block comes first, exactly as in _build_prompt, so
+        refinement shares its cached prompt prefix with generation.
         It loads:
-         - The original circuit description from data/output/prompt{prompt_id}/description.txt
-         - The incorrect ASC code from data/output/prompt{prompt_id}/output{iteration}/code.asc
+         - The original circuit description from {OUTPUT_DIR}/prompt{prompt_id}/description.txt
+         - The incorrect ASC code from {OUTPUT_DIR}/prompt{prompt_id}/output{iteration}/code.asc
          - The provided vision feedback
          - The instruction files (general, battery, and additional component instructions)
         Then substitutes these into the ASC_REFINEMENT_PROMPT_TEMPLATE.
         """
         # Load original circuit description
-        description_path = os.path.join("data", "output", f"prompt{prompt_id}", "description.txt")
-        if os.path.exists(description_path):
-            with open(description_path, "r", encoding="utf-8") as f:
-                original_description = f.read().strip()
-        else:
-            original_description = "Description not found."
+        original_description = self.prompts.read_file(self._prompt_file(prompt_id, "description.txt"))
+        original_description = original_description.strip() if original_description is not None else "Description not found."
         
         # Load incorrect ASC code
-        asc_path = os.path.join("data", "output", f"prompt{prompt_id}", f"output{iteration}", "code.asc")
-        if os.path.exists(asc_path):
-            with open(asc_path, "r", encoding="utf-8") as f:
-                incorrect_asc = f.read().strip()
-        else:
-            incorrect_asc = "Incorrect ASC code not found."
+        incorrect_asc = self.prompts.read_file(self._prompt_file(prompt_id, f"output{iteration}", "code.asc"))
+        incorrect_asc = incorrect_asc.strip() if incorrect_asc is not None else "Incorrect ASC code not found."
         
         # Use the provided vision feedback (if empty, default text)
         if not vision_feedback:
             vision_feedback = "No vision feedback provided."
         
-        # Load instruction files
-        general_instruct = self._load_instruction("general_instruct.txt")
-        battery_instruct = self._load_instruction("battery_instruct.txt")
-        instructions_parts = []
-        instructions_parts.append("GENERAL INSTRUCTIONS:\n" + general_instruct)
-        instructions_parts.append("BATTERY INSTRUCTIONS:\n" + battery_instruct)
-        
-        # Additional instructions based on components file
-        components_path = os.path.join("data", "output", f"prompt{prompt_id}", "components.txt")
-        if os.path.exists(components_path):
-            try:
-                with open(components_path, "r", encoding="utf-8") as f:
-                    comp_text = f.read().strip().upper()
-                if "R" in comp_text:
-                    resistor_instruct = self._load_instruction("resistor_instruct.txt")
-                    instructions_parts.append("RESISTOR INSTRUCTIONS:\n" + resistor_instruct)
-                if "C" in comp_text:
-                    capacitor_instruct = self._load_instruction("capacitor_instruct.txt")
-                    instructions_parts.append("CAPACITOR INSTRUCTIONS:\n" + capacitor_instruct)
-                if "L" in comp_text:
-                    inductor_instruct = self._load_instruction("inductor_instruct.txt")
-                    instructions_parts.append("INDUCTOR INSTRUCTIONS:\n" + inductor_instruct)
-                if "D" in comp_text:
-                    diode_instruct = self._load_instruction("diode_instruct.txt")
-                    instructions_parts.append("DIODE INSTRUCTIONS:\n" + diode_instruct)
-            except Exception as e:
-                self.logger.error(f"Error reading components file: {str(e)}")
-        instructions_combined = "\n\n".join(instructions_parts)
+        # General, battery and per-component instructions
+        instructions_combined = self.prompts.instruction_block(self._load_components(prompt_id))
         
         # Build the final prompt using the new template from circuit_prompts.py
         refinement_prompt = ASC_REFINEMENT_PROMPT_TEMPLATE.format(
@@ -318,12 +383,14 @@ class OpenAIProvider(LLMProvider):
         try:
             refinement_prompt = self._build_refinement_prompt(prompt_id, iteration, vision_feedback)
             self.logger.info("Refining ASC code based on feedback using new refinement prompt.")
-            response = openai.ChatCompletion.create(
+            response = self.scheduler.create(
+                method="refine_asc_code",
                 model=self.asc_gen_model,
                 messages=[
                     {"role": "system", "content": ASC_SYSTEM_PROMPT},
                     {"role": "user", "content": refinement_prompt}
-                ]
+                ],
+                request_timeout=self.request_timeout
             )
             refined_asc = response.choices[0].message.content.strip()
             return refined_asc
@@ -331,12 +398,13 @@ class OpenAIProvider(LLMProvider):
             self.logger.error(f"Error refining ASC code: {str(e)}")
             return "Error refining ASC code"
         
-    def list_components(self, asc_code: str) -> str:
+    def list_components(self, asc_code: str, use_cache: bool = True) -> str:
         """
         Lists the components present in the given ASC code.
         
         Args:
             asc_code (str): The ASC code to analyze.
+            use_cache (bool): Set to False to skip the response cache.
         
         Returns:
             str: A string listing the components found in the ASC code.
@@ -344,11 +412,18 @@ class OpenAIProvider(LLMProvider):
         try:
             prompt = COMPILE_CODE_COMP_PROMPT.format(asc_code=asc_code)
             self.logger.info("Listing components from ASC code.")
-            response = openai.ChatCompletion.create(
-                model=self.merger_model,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            components = response.choices[0].message.content.strip()
+            messages = [{"role": "user", "content": prompt}]
+            key, components = self._cached_response("list_components", self.merger_model, messages, use_cache)
+            if components is None:
+                started = time.perf_counter()
+                response = self.scheduler.create(
+                    method="list_components",
+                    model=self.merger_model,
+                    messages=messages,
+                    request_timeout=self.request_timeout
+                )
+                components = response.choices[0].message.content.strip()
+                self._store_response("list_components", key, components, started)
             return components
         except Exception as e:
             self.logger.error(f"Error listing components: {str(e)}")
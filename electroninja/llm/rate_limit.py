@@ -0,0 +1,78 @@
+# electroninja/llm/rate_limit.py
+
+import time
+import threading
+from typing import Callable
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate limiting: about four characters per token for English and ASC text."""
+    return max(1, len(text) // 4)
+
+class RateLimiter:
+    """
+    Thread-safe limiter for requests per second and tokens per minute.
+
+    Both limits are token buckets. A caller reserves its share immediately
+    and then sleeps until the reservation is covered, so concurrent callers
+    queue in arrival order and the combined throughput settles at whichever
+    limit is tighter. Requests per second may burst up to one second's worth
+    of requests and tokens per minute up to one minute's worth of tokens.
+    A limit of 0 disables it.
+    """
+
+    def __init__(self, requests_per_second: float = 0, tokens_per_minute: float = 0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.requests_per_second = requests_per_second
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._request_capacity = max(1.0, float(requests_per_second))
+        self._requests = self._request_capacity
+        self._tokens = float(tokens_per_minute)
+        self._updated = now
+        self.waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self.requests_per_second > 0:
+            self._requests = min(self._request_capacity, self._requests + elapsed * self.requests_per_second)
+        if self.tokens_per_minute > 0:
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Reserve one request and `tokens` tokens without waiting.
+
+        Returns:
+            float: Seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            delay = 0.0
+            if self.requests_per_second > 0:
+                self._requests -= 1
+                if self._requests < 0:
+                    delay = -self._requests / self.requests_per_second
+            if self.tokens_per_minute > 0 and tokens:
+                # A request larger than a minute's budget still goes through, alone.
+                self._tokens -= min(tokens, self.tokens_per_minute)
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens * 60.0 / self.tokens_per_minute)
+            return delay
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request of `tokens` tokens may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self._sleep(delay)
+            with self._lock:
+                self.waited += delay
+        return delay
@@ -0,0 +1,172 @@
+# electroninja/llm/request_classifier.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('electroninja')
+
+_NUMBER = r"\d+(?:[.,]\d+)?"
+_SMALL_PREFIX = r"[pnuµμm]"
+_ANY_PREFIX = r"(?:meg|Meg|MEG|[pnuµμmkKMG])?"
+
+# Evidence for each component letter: component words and quantities with their
+# unit. Words with everyday meanings ("resistance", "inductive", "Henry", "led")
+# and bare F/H units ("70F") are not evidence.
+COMPONENT_PATTERNS = {
+    "R": [
+        re.compile(r"\b(?:resistors?|potentiometers?|rheostats?|ohms?)\b", re.I),
+        re.compile(rf"{_NUMBER}\s*{_ANY_PREFIX}\s*(?:Ω|ω|ohms?\b)", re.I),
+    ],
+    "C": [
+        re.compile(r"\b(?:capacitors?|capacitances?|farads?)\b", re.I),
+        re.compile(rf"{_NUMBER}\s*{_SMALL_PREFIX}F\b"),
+    ],
+    "L": [
+        re.compile(r"\b(?:inductors?|inductances?)\b", re.I),
+        re.compile(rf"{_NUMBER}\s*(?:{_SMALL_PREFIX}H|{_SMALL_PREFIX}?\s*henr(?:y|ys|ies))\b"),
+    ],
+    "D": [
+        re.compile(r"\b(?:diodes?|zeners?|schottky|rectifiers?)\b", re.I),
+        re.compile(r"\bLEDs?\b"),
+    ],
+}
+# Filter and network names that imply their components, e.g. "RC low-pass" (but not "RC car")
+_NETWORK_PATTERN = re.compile(
+    r"\b(RLC|RC|RL|LC)[\s-]+(?:low|high|band|notch|filters?|circuits?|networks?|tank|time|oscillators?|"
+    r"snubbers?|ladders?|series|parallel|integrators?|differentiators?|delay|resonan(?:t|ce))",
+    re.I
+)
+
+# Electrical vocabulary that says nothing about R, C, L or D
+_CONTEXT_PATTERN = re.compile(
+    r"\b(?:circuits?|schematics?|ltspice|spice|netlist|voltages?|volts?|currents?|amps?|amperes?|"
+    r"batter(?:y|ies)|sources?|ground(?:ed)?|filters?|amplifiers?|op-?amps?|transistors?|mosfets?|bjts?|"
+    r"oscillators?|timers?|555|series|parallel|nodes?|wires?|electrical|electronics?|regulators?|"
+    r"dividers?|bridges?|transformers?|switch(?:es)?|relays?|frequenc(?:y|ies)|signals?|pcb|"
+    r"logic|gates?|power supply|simulat(?:e|ion)|components?|impedance|resistance|resistive|capacitive|"
+    r"inductive|henr(?:y|ies)|ac|dc|hz|watts?)\b"
+    rf"|{_NUMBER}\s*{_ANY_PREFIX}\s*(?:V|A|Hz|W)\b",
+    re.I
+)
+# Verbs that ask for a circuit to be built or changed
+_ACTION_PATTERN = re.compile(
+    r"\b(?:design|build|make|create|draw|add|connect|wire|simulate|generate|insert|attach|include|"
+    r"modify|increase|decrease)\b",
+    re.I
+)
+# Edits that remove or swap parts are left to the model
+_NEGATION_PATTERN = re.compile(r"\b(?:without|remove|removing|delete|replace|replacing|instead|except|no|not)\b", re.I)
+_WORD_PATTERN = re.compile(r"\w+")
+
+class RequestClassifier:
+    """
+    Local first stage of the circuit relevance evaluation.
+
+    Answers the same question as CIRCUIT_RELEVANCE_EVALUATION_PROMPT ('N' or
+    component letters such as "R, C") from keywords and unit grammar (ohm,
+    farad, henry and SI prefixes, e.g. "2 ohms", "1mF", "10 uH"), but only
+    when the answer is clear:
+
+    - Components are named or given with their units, the request does not
+      remove or replace anything, and it either asks for something to be built
+      or changed ("design", "add", "connect", ...) or names at least two
+      components: the letters. A single component in a question ("what colour
+      LEDs look best on a desk?") is not enough.
+    - No electrical vocabulary at all in a request of at least min_words_for_n
+      words: 'N'.
+
+    Everything else (e.g. "a 5V battery circuit", "design a 555 timer",
+    "replace the resistor") returns None and goes to the model. Every
+    decision is logged, and appended as a JSON line to log_path when given,
+    together with the model's answer for escalated requests, so the rules
+    and thresholds can be tuned against it.
+    """
+
+    def __init__(self, min_words_for_n: int = 3, log_path: Optional[str] = None):
+        """
+        Args:
+            min_words_for_n (int): Shortest request answered 'N' locally.
+            log_path (str): Optional JSON lines file for decisions.
+        """
+        self.min_words_for_n = min_words_for_n
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self.decisions = {"letters": 0, "N": 0, "escalated": 0}
+
+    def analyze(self, prompt: str) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: {"letters": found component letters in R, C, L, D order,
+            "evidence": matched phrases, "context": electrical words that imply
+            no component, "negation": True if parts are removed or swapped,
+            "action": True if a circuit verb is used, "words": word count}.
+        """
+        evidence: List[str] = []
+        letters = set()
+        for letter, patterns in COMPONENT_PATTERNS.items():
+            for pattern in patterns:
+                for match in pattern.finditer(prompt):
+                    letters.add(letter)
+                    evidence.append(match.group(0))
+        for match in _NETWORK_PATTERN.finditer(prompt):
+            letters.update(match.group(1).upper())
+            evidence.append(match.group(0))
+        return {
+            "letters": [letter for letter in COMPONENT_PATTERNS if letter in letters],
+            "evidence": evidence,
+            "context": [match.group(0) for match in _CONTEXT_PATTERN.finditer(prompt)],
+            "negation": _NEGATION_PATTERN.search(prompt) is not None,
+            "action": _ACTION_PATTERN.search(prompt) is not None,
+            "words": len(_WORD_PATTERN.findall(prompt)),
+        }
+
+    def classify(self, prompt: str) -> Optional[str]:
+        """
+        Classify a request locally.
+
+        Returns:
+            str: 'N' or component letters (e.g. "R, C") when the answer is clear,
+            otherwise None (ask the model).
+        """
+        start = time.perf_counter()
+        analysis = self.analyze(prompt)
+        confident = analysis["action"] or len(analysis["evidence"]) >= 2 or len(analysis["letters"]) >= 2
+        if analysis["letters"] and not analysis["negation"] and confident:
+            result, decision = ", ".join(analysis["letters"]), "letters"
+        elif not analysis["letters"] and not analysis["context"] and analysis["words"] >= self.min_words_for_n:
+            result, decision = "N", "N"
+        else:
+            result, decision = None, "escalated"
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        with self._lock:
+            self.decisions[decision] += 1
+        logger.info(
+            f"Fast-path classifier: {decision}"
+            + (f" -> {result}" if result is not None else "")
+            + f" (evidence={analysis['evidence']}, context={analysis['context'][:5]}, "
+            f"negation={analysis['negation']}, action={analysis['action']}, words={analysis['words']}, {elapsed_us:.0f} us)"
+        )
+        self._record({"prompt": prompt, "decision": decision, "result": result, **analysis})
+        return result
+
+    def record_model_result(self, prompt: str, result: str) -> None:
+        """Log the model's answer to an escalated request next to the local decision."""
+        logger.info(f"Fast-path classifier: model answered '{result}' for escalated request")
+        self._record({"prompt": prompt, "decision": "model", "result": result})
+
+    def _record(self, entry: Dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+        try:
+            entry["time"] = time.time()
+            with self._lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.error(f"Error writing classifier decision: {str(e)}")
@@ -0,0 +1,444 @@
+# electroninja/llm/request_scheduler.py
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import openai
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+from electroninja.config.settings import Config
+from electroninja.llm.rate_limit import RateLimiter, estimate_tokens
+from electroninja.llm.metrics import call_cost, record_call
+
+logger = logging.getLogger('electroninja')
+
+# Rough prompt cost of one image at detail "high" (a 1024x1024 image is 765 tokens)
+IMAGE_TOKENS = 765
+_RETRY_STATUSES = {408, 409, 429}
+
+def _field(obj: Any, name: str) -> Any:
+    """A field of an API object, whether it is a dict (OpenAIObject) or has attributes."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+def estimate_message_tokens(messages) -> int:
+    """Rough prompt token count of chat messages, including image parts."""
+    tokens = 0
+    for message in messages or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += estimate_tokens(content)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += estimate_tokens(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    tokens += IMAGE_TOKENS
+    return max(1, tokens)
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the API asked us to wait (Retry-After / retry-after-ms headers), if any."""
+    headers = getattr(error, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+def is_retryable(error: Exception) -> bool:
+    """
+    True for errors worth retrying: rate limits (except an exhausted quota),
+    timeouts, connection errors, and 408/409/429/5xx responses.
+    """
+    if isinstance(error, openai.error.RateLimitError):
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, (openai.error.Timeout, openai.error.APIConnectionError,
+                          openai.error.ServiceUnavailableError, openai.error.TryAgain)):
+        return True
+    if isinstance(error, openai.error.OpenAIError):
+        status = getattr(error, "http_status", None)
+        return status is not None and (status in _RETRY_STATUSES or status >= 500)
+    return False
+
+class ConcurrencySlots:
+    """
+    A counting semaphore shared by threads and by coroutines on any event loop.
+
+    Waiters are served in arrival order. A released slot is handed directly to
+    the next waiter: a threading.Event for threads, a future (woken through
+    its loop) for coroutines.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    def _take(self) -> bool:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take():
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was already handed to us; pass it on
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(_wake, future)
+                    return
+            self.in_use -= 1
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class _MeteredStream:
+    """
+    Pass a stream through, recording the call and freeing its concurrency slot
+    when the stream is exhausted, fails, is closed or is garbage collected.
+    """
+
+    def __init__(self, scheduler: "RequestScheduler", stream, method: str, kwargs: Dict[str, Any],
+                 entered: float, sent: float, attempts: int):
+        self._scheduler = scheduler
+        self._stream = stream
+        self._call = (method, kwargs, entered, sent, attempts)
+        self._parts = []
+        self._usage = None
+        self._first_token = None
+        self._iterator = None
+        self._finished = False
+
+    def _see(self, chunk) -> None:
+        self._first_token = self._first_token or self._scheduler._clock()
+        self._usage = _field(chunk, "usage") or self._usage
+        choices = _field(chunk, "choices")
+        if choices:
+            self._parts.append(_field(_field(choices[0], "delta"), "content") or "")
+
+    def _finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._scheduler._slots.release()
+        method, kwargs, entered, sent, attempts = self._call
+        self._scheduler._record(method, kwargs, entered, sent, attempts, {"usage": self._usage},
+                                "".join(self._parts), self._first_token)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._stream)
+            chunk = next(self._iterator)
+        except StopIteration:
+            self._finish()
+            raise
+        except BaseException:
+            self.close()
+            raise
+        self._see(chunk)
+        return chunk
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._stream, "close"):
+                self._stream.close()
+        finally:
+            self._finish()
+
+    def __del__(self):
+        self._finish()
+
+class _AsyncMeteredStream(_MeteredStream):
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException:
+            await self.aclose()
+            raise
+        self._see(chunk)
+        return chunk
+
+    async def aclose(self) -> None:
+        try:
+            if hasattr(self._stream, "aclose"):
+                await self._stream.aclose()
+        finally:
+            self._finish()
+
+class RequestScheduler:
+    """
+    Central gate for chat completion calls: rate limits, concurrency and retries.
+
+    Every model has its own RateLimiter with a requests-per-minute and a
+    tokens-per-minute bucket (prompt tokens are estimated locally), so a burst
+    of calls queues in arrival order instead of running into 429s. At most
+    max_concurrent requests are in flight, counted across threads and every
+    event loop together; a stream holds its slot until it is exhausted or
+    closed. Retryable failures are retried up to max_retries
+    times with full-jitter exponential backoff; when the API sends Retry-After
+    the model's bucket is paused for that long, so queued calls for the same
+    model wait too. Other errors, and the last failure, are raised to the
+    caller, whose existing error handling applies.
+
+    Every call is also recorded in the metrics registries (see metrics.py)
+    under the provider method that made it, with its token usage (counted
+    locally for streams), latency and queue wait. With PROMPT_CACHE_REPORT on,
+    streams ask the API for usage too, and every call logs how many of its
+    prompt tokens were served from the provider's prompt cache.
+    """
+
+    def __init__(self, config: Optional[Config] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        self.config = config or Config()
+        self.max_retries = self.config.LLM_MAX_RETRIES
+        self.backoff_base = self.config.LLM_BACKOFF_BASE
+        self.backoff_max = self.config.LLM_BACKOFF_MAX
+        self.max_concurrent = self.config.LLM_MAX_CONCURRENT_REQUESTS
+        self._clock = clock
+        self._sleep = sleep
+        self._random = rng or random.Random()
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, RateLimiter] = {}
+        # Model -> clock time before which no request is sent (after a Retry-After)
+        self._paused_until: Dict[str, float] = {}
+        self._slots = ConcurrencySlots(self.max_concurrent)
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def limits(self, model: str) -> Tuple[float, float]:
+        """
+        Returns:
+            tuple: (requests per minute, tokens per minute) for a model; 0 disables a limit.
+        """
+        return self.config.LLM_MODEL_RATE_LIMITS.get(
+            model, (self.config.LLM_DEFAULT_RPM, self.config.LLM_DEFAULT_TPM)
+        )
+
+    def _limiter(self, model: str) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                rpm, tpm = self.limits(model)
+                limiter = RateLimiter(rpm / 60.0, tpm, clock=self._clock, sleep=self._sleep)
+                self._limiters[model] = limiter
+                self.stats[model] = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0, "queue_wait": 0.0}
+            return limiter
+
+    def _reserve(self, model: str, tokens: int) -> float:
+        """Take a slot in the model's buckets; returns the seconds to wait before sending."""
+        limiter = self._limiter(model)
+        with self._lock:
+            paused = max(0.0, self._paused_until.get(model, 0.0) - self._clock())
+        delay = max(paused, limiter.reserve(tokens))
+        with self._lock:
+            self.stats[model]["requests"] += 1
+            self.stats[model]["queue_wait"] += delay
+        return delay
+
+    def _backoff(self, model: str, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying after `error`, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            with self._lock:
+                self.stats[model]["failures"] += 1
+            return None
+        delay = self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        requested = retry_after(error)
+        with self._lock:
+            self.stats[model]["retries"] += 1
+            if isinstance(error, openai.error.RateLimitError) or getattr(error, "http_status", None) == 429:
+                self.stats[model]["rate_limited"] += 1
+            if requested is not None:
+                delay = max(delay, requested)
+                self._paused_until[model] = max(self._paused_until.get(model, 0.0), self._clock() + requested)
+        logger.warning(
+            f"{model} request failed ({type(error).__name__}: {str(error)}); "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+        )
+        return delay
+
+    def _record(self, method: str, kwargs: Dict[str, Any], entered: float, sent: float, attempts: int,
+                response: Any = None, text: Optional[str] = None, first_token: Optional[float] = None,
+                error: Optional[Exception] = None) -> None:
+        """Add a finished call to the metrics registries (see metrics.MetricsRegistry)."""
+        if not self.config.METRICS_ENABLED:
+            return
+        try:
+            ended = self._clock()
+            model = kwargs["model"]
+            usage = _field(response, "usage")
+            cached_tokens = 0
+            if usage:
+                prompt_tokens = _field(usage, "prompt_tokens") or 0
+                completion_tokens = _field(usage, "completion_tokens") or 0
+                cached_tokens = _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0
+            else:
+                # Streams (and responses without usage) are counted locally
+                prompt_tokens = estimate_message_tokens(kwargs.get("messages"))
+                if text is None and response is not None and error is None:
+                    text = _field(_field(_field(response, "choices")[0], "message"), "content")
+                completion_tokens = estimate_tokens(text) if text else 0
+            record_call({
+                "method": method,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cached_tokens": cached_tokens,
+                "estimated": not usage,
+                "latency": ended - sent,
+                "queue_wait": sent - entered,
+                "first_token": None if first_token is None else first_token - sent,
+                "attempts": attempts,
+                "cost": call_cost(model, prompt_tokens, completion_tokens, self.config.LLM_PRICES,
+                                  cached_tokens, self.config.LLM_CACHED_INPUT_PRICE_RATIO),
+                "error": None if error is None else f"{type(error).__name__}: {str(error)}",
+                "time": time.time(),
+            }, self.config)
+            if self.config.PROMPT_CACHE_REPORT and usage:
+                logger.info(
+                    f"Prompt cache: {method} ({model}) {cached_tokens}/{prompt_tokens} prompt tokens cached "
+                    f"({cached_tokens / max(1, prompt_tokens):.0%})"
+                    + (f", first token after {first_token - sent:.2f}s" if first_token is not None else "")
+                )
+        except Exception as e:
+            logger.error(f"Error recording LLM metrics: {str(e)}")
+
+    def _request_usage(self, kwargs: Dict[str, Any]) -> None:
+        # Streams only report usage (and so cached tokens) in a final chunk when asked to
+        if self.config.PROMPT_CACHE_REPORT and kwargs.get("stream"):
+            kwargs.setdefault("stream_options", {"include_usage": True})
+
+    def create(self, method: str = "chat_completion", **kwargs) -> Any:
+        """
+        openai.ChatCompletion.create, paced, bounded, retried and measured.
+
+        Args:
+            method (str): Name the call is recorded under in the metrics.
+            **kwargs: Arguments for openai.ChatCompletion.create (model and messages required).
+
+        Returns:
+            The API response (a stream when stream=True; only opening it is retried).
+        """
+        model = kwargs["model"]
+        tokens = estimate_message_tokens(kwargs.get("messages"))
+        self._request_usage(kwargs)
+        entered = self._clock()
+        attempt = 0
+        while True:
+            delay = self._reserve(model, tokens)
+            if delay > 0:
+                self._sleep(delay)
+            self._slots.acquire()
+            sent = self._clock()
+            try:
+                response = openai.ChatCompletion.create(**kwargs)
+            except BaseException as e:
+                self._slots.release()
+                if not isinstance(e, Exception):
+                    raise
+                error = e
+            else:
+                if kwargs.get("stream"):
+                    # The slot is released by the stream when it ends
+                    return _MeteredStream(self, response, method, kwargs, entered, sent, attempt + 1)
+                self._slots.release()
+                self._record(method, kwargs, entered, sent, attempt + 1, response)
+                return response
+            delay = self._backoff(model, attempt, error)
+            if delay is None:
+                self._record(method, kwargs, entered, sent, attempt + 1, error=error)
+                raise error
+            self._sleep(delay)
+            attempt += 1
+
+    async def acreate(self, method: str = "chat_completion", **kwargs) -> Any:
+        """openai.ChatCompletion.acreate with the same pacing, bound, retries and metrics as create()."""
+        model = kwargs["model"]
+        tokens = estimate_message_tokens(kwargs.get("messages"))
+        self._request_usage(kwargs)
+        entered = self._clock()
+        attempt = 0
+        while True:
+            delay = self._reserve(model, tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._slots.aacquire()
+            sent = self._clock()
+            try:
+                response = await openai.ChatCompletion.acreate(**kwargs)
+            except BaseException as e:
+                self._slots.release()
+                if not isinstance(e, Exception):
+                    raise
+                error = e
+            else:
+                if kwargs.get("stream"):
+                    return _AsyncMeteredStream(self, response, method, kwargs, entered, sent, attempt + 1)
+                self._slots.release()
+                self._record(method, kwargs, entered, sent, attempt + 1, response)
+                return response
+            delay = self._backoff(model, attempt, error)
+            if delay is None:
+                self._record(method, kwargs, entered, sent, attempt + 1, error=error)
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def shared_request_scheduler(config: Optional[Config] = None) -> RequestScheduler:
+    """Return the process-wide scheduler shared by every provider and the vision analyzer."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(config)
+        return _scheduler
@@ -0,0 +1,236 @@
+# electroninja/llm/response_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from electroninja.config.settings import Config
+
+logger = logging.getLogger('electroninja')
+
+class ResponseCache:
+    """
+    Two-tier cache of LLM responses: an in-memory LRU in front of SQLite.
+
+    Entries are keyed by the method name and a hash of (model, rendered
+    messages, sampling parameters), so a changed prompt template or model
+    never returns a stale answer. Each method has its own time to live; a
+    method without a positive TTL is not cached. Disk entries are evicted in
+    least-recently-used order once the cache grows past max_entries.
+    """
+
+    def __init__(self, path: Optional[str], ttls: Dict[str, float], memory_entries: int = 256,
+                 max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path (str): SQLite file for the disk tier, or None for memory only.
+            ttls (dict): Method name -> seconds an entry stays valid.
+            memory_entries (int): Size of the in-memory tier.
+            max_entries (int): Size of the disk tier.
+            clock (callable): Wall clock, replaceable in tests.
+        """
+        self.path = path
+        self.ttls = dict(ttls)
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (method, key) -> (response, created, latency)
+        self._memory: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " method TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " latency REAL NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " PRIMARY KEY (method, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+        """Return the content address of a request: sha256 of its model, messages and sampling parameters."""
+        payload = json.dumps({"model": model, "messages": messages, "params": params or {}},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, method: str, name: str, amount: float = 1) -> None:
+        counters = self._counters.setdefault(
+            method, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "seconds_saved": 0.0}
+        )
+        counters[name] += amount
+
+    def _remember(self, entry_key: tuple, entry: tuple) -> None:
+        self._memory[entry_key] = entry
+        self._memory.move_to_end(entry_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, method: str, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            method (str): Provider method name, which selects the TTL.
+            key (str): Request key from make_key.
+
+        Returns:
+            str: The cached response, or None on a miss or an expired entry.
+        """
+        ttl = self.ttls.get(method, 0)
+        if ttl <= 0:
+            return None
+        entry_key = (method, key)
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(entry_key)
+            tier = "memory_hits"
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created, latency FROM responses WHERE method = ? AND key = ?",
+                    entry_key
+                ).fetchone()
+                if row is not None:
+                    entry = tuple(row)
+                    tier = "disk_hits"
+            if entry is None or now - entry[1] > ttl:
+                if entry is not None:
+                    self._memory.pop(entry_key, None)
+                self._count(method, "misses")
+                return None
+            self._remember(entry_key, entry)
+            if tier == "disk_hits":
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE method = ? AND key = ?",
+                    (now, method, key)
+                )
+                self._conn.commit()
+            self._count(method, tier)
+            self._count(method, "seconds_saved", entry[2])
+            return entry[0]
+
+    def put(self, method: str, key: str, response: str, latency: float = 0.0) -> None:
+        """
+        Store a response.
+
+        Args:
+            method (str): Provider method name; methods without a TTL are ignored.
+            key (str): Request key from make_key.
+            response (str): The model's answer.
+            latency (float): Seconds the call took, reported as time saved on later hits.
+        """
+        if self.ttls.get(method, 0) <= 0:
+            return
+        now = self._clock()
+        entry = (response, now, latency)
+        with self._lock:
+            self._remember((method, key), entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (method, key, response, created, latency, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (method, key, response, now, latency, now)
+                )
+                self._evict()
+                self._conn.commit()
+            self._count(method, "stores")
+
+    def _evict(self) -> None:
+        """Delete the least recently used disk entries beyond max_entries. Caller holds the lock."""
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            logger.info(f"Evicted {excess} entries from the response cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Totals ("hits", "misses", "hit_rate", "seconds_saved", "memory_entries",
+            "disk_entries") and the same counters per method under "methods".
+        """
+        with self._lock:
+            methods = {method: dict(counters) for method, counters in self._counters.items()}
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            memory_entries = len(self._memory)
+        hits = sum(c["memory_hits"] + c["disk_hits"] for c in methods.values())
+        misses = sum(c["misses"] for c in methods.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "seconds_saved": sum(c["seconds_saved"] for c in methods.values()),
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "methods": methods,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_caches: Dict[Optional[str], ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+def shared_response_cache(config: Optional[Config] = None) -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache for the configured path, so every
+    provider instance shares one memory tier.
+
+    Returns:
+        ResponseCache: The cache, or None when RESPONSE_CACHE_ENABLED is off or it cannot be opened.
+    """
+    config = config or Config()
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    path = config.RESPONSE_CACHE_PATH or None
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            try:
+                cache = ResponseCache(
+                    path,
+                    config.RESPONSE_CACHE_TTLS,
+                    memory_entries=config.RESPONSE_CACHE_MEMORY_ENTRIES,
+                    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                logger.error(f"Failed to open response cache: {str(e)}")
+                return None
+            _caches[path] = cache
+        return cache
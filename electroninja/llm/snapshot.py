@@ -0,0 +1,163 @@
+# electroninja/llm/snapshot.py
+
+import os
+import re
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+logger = logging.getLogger('electroninja')
+
+# Name of the pointer file that holds the version of the committed snapshot.
+CURRENT_FILE = "CURRENT"
+_VERSION_RE = re.compile(r"^v(\d+)$")
+
+class ReadWriteLock:
+    """
+    Lock that admits many readers or a single writer.
+
+    Waiting writers block new readers, so a reload is not starved by a steady
+    stream of searches. The writing thread may re-acquire the lock for reading
+    or writing, which lets write methods call each other.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._writers_waiting += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+
+def snapshot_dir(root: str, version: int) -> str:
+    """Directory of a committed snapshot."""
+    return os.path.join(root, f"v{version:06d}")
+
+def list_versions(root: str) -> List[int]:
+    """Versions of the committed snapshot directories under root, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    versions = []
+    for name in os.listdir(root):
+        match = _VERSION_RE.match(name)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+def current_version(root: str) -> Optional[int]:
+    """Return the version named by the CURRENT pointer, or None if nothing was committed yet."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def begin_snapshot(root: str) -> str:
+    """Create and return a private staging directory for the next snapshot."""
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f".staging-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+def commit_snapshot(root: str, staging: str) -> int:
+    """
+    Publish a fully written staging directory as the next snapshot version.
+
+    The directory is renamed to its versioned name and only then is CURRENT
+    replaced, so readers always see either the previous snapshot or the new
+    one, never a mix of files from both. Renaming onto an existing version
+    fails, so two writers racing for the same version cannot overwrite each other.
+
+    Returns:
+        int: The committed version.
+    """
+    version = max(list_versions(root) + [current_version(root) or 0]) + 1
+    final_dir = snapshot_dir(root, version)
+    for name in os.listdir(staging):
+        with open(os.path.join(staging, name), "r+b") as f:
+            os.fsync(f.fileno())
+    _fsync_dir(staging)
+    os.rename(staging, final_dir)
+    pointer_tmp = os.path.join(root, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(str(version))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILE))
+    _fsync_dir(root)
+    return version
+
+def prune_snapshots(root: str, keep: int) -> None:
+    """
+    Delete all but the newest `keep` snapshots.
+
+    Readers that still map files of a deleted snapshot keep working on POSIX;
+    on Windows the files are locked and the snapshot is left for a later run.
+    """
+    current = current_version(root)
+    for version in list_versions(root)[:-keep] if keep > 0 else []:
+        if version == current:
+            continue
+        try:
+            shutil.rmtree(snapshot_dir(root, version))
+        except OSError as e:
+            logger.info(f"Could not remove old snapshot v{version}: {str(e)}")
+
+def read_index_mmap(faiss, path: str):
+    """Read a FAISS index with its vector storage memory-mapped rather than copied."""
+    flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError:
+        # IVF array inverted lists only accept the plain mmap flag.
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP)
+
+def _fsync_dir(path: str) -> None:
+    """Flush directory entries to disk where the platform allows it."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,143 @@
+# electroninja/llm/vector_compression.py
+
+import time
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+from electroninja.llm import index_factory
+
+logger = logging.getLogger('electroninja')
+
+DEFAULT_STORAGES = ("float32", "float16", "sq8", "pq")
+
+def truncate_dimensions(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Shorten embeddings to their first `dim` components and re-normalize them.
+
+    For text-embedding-3 models this matches what the API returns when asked
+    for `dim` dimensions, so shortened sizes can be evaluated without
+    re-embedding the corpus.
+    """
+    shortened = np.ascontiguousarray(vectors[:, :dim], dtype=np.float32)
+    norms = np.linalg.norm(shortened, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return shortened / norms
+
+def _search_excluding_self(index, queries: np.ndarray, query_ids: np.ndarray, k: int) -> np.ndarray:
+    """Return the top-k ids per query, skipping the query's own document."""
+    _, ids = index.search(queries, k + 1)
+    rows = []
+    for own_id, row in zip(query_ids, ids):
+        row = [int(i) for i in row if i != own_id and i != -1][:k]
+        rows.append(row + [-1] * (k - len(row)))
+    return np.array(rows, dtype=np.int64)
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray, k: int) -> float:
+    """Average fraction of the true top-k neighbours that appear in the found top-k."""
+    hits = 0
+    total = 0
+    for true_row, found_row in zip(truth[:, :k], found[:, :k]):
+        true_ids = {int(i) for i in true_row if i != -1}
+        hits += len(true_ids.intersection(int(i) for i in found_row))
+        total += len(true_ids)
+    return hits / total if total else 0.0
+
+def compression_report(faiss, vectors: np.ndarray, dims: Optional[Sequence[int]] = None,
+                       storages: Sequence[str] = DEFAULT_STORAGES, ks: Sequence[int] = (1, 3, 10),
+                       num_queries: int = 200, pq_m: int = 0, nprobe: int = 16,
+                       seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k against memory for shortened and quantized vector storage.
+
+    The reference is an exact float32 search over the full vectors. A sample
+    of stored vectors is used as queries, and each query's own document is
+    left out of both result lists. Index sizes are measured by serializing
+    the index, so they include every FAISS structure, not just the codes.
+
+    Args:
+        faiss: The faiss module.
+        vectors (np.ndarray): Full-size, normalized document vectors.
+        dims (list, optional): Dimensions to evaluate. Defaults to the full size
+            and its halvings down to 64.
+        storages (list): Storage choices (see index_factory.storage_code).
+        ks (list): Cut-offs to report recall at.
+        num_queries (int): Number of stored vectors used as queries.
+        pq_m (int): PQ bytes per vector (0 = dim / 4).
+        nprobe (int): IVF lists visited per query for corpora large enough for IVF.
+        seed (int): Seed for the query sample.
+
+    Returns:
+        list: One dict per (dim, storage) with the factory string, index bytes,
+        bytes per vector, compression versus float32 at full size, recall@k
+        for each k, query time in ms, or an error message if the index could
+        not be built.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, full_dim = vectors.shape
+    if dims is None:
+        dims = [full_dim]
+        while dims[-1] // 2 >= 64:
+            dims.append(dims[-1] // 2)
+    max_k = max(ks)
+    rng = np.random.default_rng(seed)
+    query_ids = np.sort(rng.choice(count, size=min(num_queries, count), replace=False))
+
+    reference = faiss.IndexFlatIP(full_dim)
+    reference.add(vectors)
+    truth = _search_excluding_self(reference, vectors[query_ids], query_ids, max_k)
+    baseline_bytes = None
+
+    rows = []
+    for dim in dims:
+        shortened = truncate_dimensions(vectors, dim) if dim != full_dim else vectors
+        for storage in storages:
+            row: Dict[str, Any] = {"dim": int(dim), "storage": storage}
+            try:
+                code = index_factory.storage_code(storage, dim, pq_m)
+                # Same index layout as "auto" would pick, with this storage.
+                layout = index_factory.choose_index_factory(count)
+                factory = layout[:-len("Flat")] + code
+                row["factory"] = factory
+                index = faiss.index_factory(dim, factory, faiss.METRIC_INNER_PRODUCT)
+                index_factory.configure_search(faiss, index, nprobe=nprobe)
+                index.train(shortened)
+                index.add(shortened)
+                start = time.perf_counter()
+                found = _search_excluding_self(index, shortened[query_ids], query_ids, max_k)
+                row["query_ms"] = (time.perf_counter() - start) * 1000 / len(query_ids)
+                row["index_bytes"] = int(len(faiss.serialize_index(index)))
+            except Exception as e:
+                logger.warning(f"Could not evaluate {storage} storage at {dim} dims: {str(e)}")
+                row["error"] = str(e)
+                rows.append(row)
+                continue
+            if baseline_bytes is None and dim == full_dim and storage == "float32":
+                baseline_bytes = row["index_bytes"]
+            row["bytes_per_vector"] = row["index_bytes"] / count
+            for k in ks:
+                row[f"recall@{k}"] = recall_at_k(truth, found, k)
+            rows.append(row)
+
+    # Compression is relative to full-size float32 vectors.
+    baseline_bytes = baseline_bytes or count * full_dim * 4
+    for row in rows:
+        if "index_bytes" in row:
+            row["compression"] = baseline_bytes / row["index_bytes"]
+    return rows
+
+def format_report(rows: List[Dict[str, Any]], ks: Sequence[int] = (1, 3, 10)) -> str:
+    """Render compression_report rows as a plain-text table."""
+    header = f"{'dim':>5}  {'storage':<8} {'factory':<16} {'B/vector':>9} {'smaller':>8} " + \
+        " ".join(f"{'R@' + str(k):>6}" for k in ks) + f" {'ms/query':>9}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        prefix = f"{row['dim']:>5}  {row['storage']:<8} {row.get('factory', ''):<16}"
+        if "error" in row:
+            lines.append(f"{prefix} failed: {row['error'][:60]}")
+            continue
+        lines.append(
+            f"{prefix} {row['bytes_per_vector']:>9.1f} {row['compression']:>7.1f}x " +
+            " ".join(f"{row[f'recall@{k}']:>6.3f}" for k in ks) +
+            f" {row['query_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
@@ -1,34 +1,93 @@
 # electroninja/llm/vector_store.py
 
 import os
-import numpy as np
-import logging
+import json
+import time
+import shutil
 import pickle
-import openai
-from typing import List, Dict, Any, Optional
+import logging
+import functools
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
 from electroninja.config.settings import Config
+from electroninja.llm.embedding_cache import EmbeddingCache
+from electroninja.llm.embedders import Embedder, create_embedder
+from electroninja.llm.document_store import DocumentStore
+from electroninja.llm import index_factory, snapshot
+from electroninja.llm.lexical_index import LexicalIndex, reciprocal_rank_fusion
 
 logger = logging.getLogger('electroninja')
 
+def _writes(method):
+    """Run a VectorStore method under the write lock on a writable index."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            self._prepare_write()
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class VectorStore:
-    """Vector database for storing and retrieving circuit examples using semantic search."""
+    """
+    Vector database for storing and retrieving circuit examples using semantic search.
+
+    Saves are committed as versioned snapshots (see electroninja.llm.snapshot),
+    so a process can keep searching while another one ingests, and picks up
+    the new snapshot on its next search. Searches share a read lock; loading a
+    snapshot and every change take the write lock. Documents and queries are
+    embedded before either lock is taken, so a slow embedding call holds up
+    neither searches nor writes.
+    """
+
+    # Embedder of indexes saved before the embedder was recorded.
+    LEGACY_EMBEDDER = "text-embedding-3-small"
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, embedder: Optional[Embedder] = None):
         self.config = config or Config()
-        self.embedding_model = "text-embedding-3-small"
-        self.vector_size = 1536
-        self.metadata_list = []
+        self.embedder = embedder or create_embedder(self.config)
+        self.embedding_model = self.embedder.name
+        self.vector_size = self.embedder.dim
+        self.documents = DocumentStore()
         self.index = None
+        self.index_factory = None
+        self.metric = self.config.VECTOR_INDEX_METRIC
+        # (ids, vectors) waiting for an untrained index (e.g. IVF) to be trained.
+        self._pending_vectors = []
+        # Next stable document id; ids are never reused.
+        self._next_id = 0
+        # BM25 index over the same documents, loaded on first use.
+        self._lexical_index = None
+        # Ingestion manifest: example key -> {"asc_path", "content_hash", "id"}.
+        self.manifest = {}
+
+        # Loaded snapshot version (None for files saved before snapshots) and its files.
+        self.snapshot_version = None
+        self._paths = self._legacy_paths()
+        self._index_mmapped = False
+        # Unsaved changes; a store with unsaved changes is never reloaded.
+        self._dirty = False
+        self._lock = snapshot.ReadWriteLock()
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
 
-        # Set OpenAI API key
-        openai.api_key = self.config.OPENAI_API_KEY
+        # Persistent embedding cache so previously embedded texts skip the API.
+        self.embedding_cache = None
+        if self.config.EMBEDDING_CACHE_ENABLED:
+            try:
+                self.embedding_cache = EmbeddingCache(
+                    self.config.EMBEDDING_CACHE_PATH,
+                    max_entries=self.config.EMBEDDING_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                logger.error(f"Failed to open embedding cache: {str(e)}")
 
         # Import FAISS and initialize index.
         try:
             import faiss
             self.faiss = faiss
-            self.index = faiss.IndexFlatL2(self.vector_size)
-            logger.info("FAISS index initialized")
+            self._new_index(self._resolve_factory(self.config.VECTOR_INDEX_FACTORY, 0))
+            logger.info(f"FAISS index initialized ({self.index_factory}, {self.metric})")
         except ImportError:
             logger.error("Failed to import FAISS. Vector search will not be available.")
             self.faiss = None
@@ -38,8 +97,12 @@ class VectorStore:
 
     def load(self) -> bool:
         """
-        Load the index and metadata from disk.
-        If the files exist, they will be loaded; otherwise, the index remains empty.
+        Load the committed snapshot, or the files of an index saved before
+        snapshots existed.
+        
+        Files are read before the write lock is taken, so searches keep running
+        on the previous snapshot until the new one is swapped in. Snapshot
+        indexes are memory-mapped when Config.VECTOR_DB_MMAP is set.
         
         Returns:
             bool: True if successfully loaded, False otherwise.
@@ -49,25 +112,165 @@ class VectorStore:
                 logger.error("FAISS is not available. Cannot load index.")
                 return False
 
-            index_path = self.config.VECTOR_DB_INDEX
-            metadata_path = self.config.VECTOR_DB_METADATA
-
-            if os.path.exists(index_path) and os.path.exists(metadata_path):
-                self.index = self.faiss.read_index(index_path)
-                with open(metadata_path, "rb") as f:
-                    self.metadata_list = pickle.load(f)
-                logger.info(f"Loaded index with {len(self.metadata_list)} documents")
-                return True
+            version = snapshot.current_version(self.config.VECTOR_DB_SNAPSHOTS)
+            if version is not None:
+                paths = self._snapshot_paths(snapshot.snapshot_dir(self.config.VECTOR_DB_SNAPSHOTS, version))
             else:
+                paths = self._legacy_paths()
+            has_documents = os.path.exists(paths["documents"]) or (
+                version is None and os.path.exists(paths["metadata"])
+            )
+            if not os.path.exists(paths["index"]) or not has_documents:
                 logger.info("No saved index found. Skipping ingestion from metadata.json.")
                 return False
+
+            mmapped = version is not None and self.config.VECTOR_DB_MMAP
+            if mmapped:
+                index = snapshot.read_index_mmap(self.faiss, paths["index"])
+            else:
+                # Indexes saved before stable ids keep their vectors under their positions.
+                index = index_factory.with_ids(self.faiss, self.faiss.read_index(paths["index"]))
+            info = self._read_index_info(paths["info"])
+            embedder_name = info.get("embedder", self.LEGACY_EMBEDDER)
+            if embedder_name != self.embedder.name or index.d != self.vector_size:
+                logger.error(
+                    f"Saved index was built with embedder '{embedder_name}' ({index.d} dims) but the "
+                    f"configured embedder is '{self.embedder.name}' ({self.vector_size} dims). "
+                    "Re-run ingestion to rebuild the index."
+                )
+                return False
+            if os.path.exists(paths["documents"]):
+                documents = DocumentStore.open(paths["documents"])
+            else:
+                documents = self._migrate_legacy_metadata(paths["metadata"], paths["documents"])
+            manifest = {}
+            if os.path.exists(paths["manifest"]):
+                with open(paths["manifest"], "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+
+            with self._lock.write():
+                previous = self.documents
+                self.index = index
+                self._index_mmapped = mmapped
+                self._pending_vectors = []
+                self._apply_index_info(info)
+                self._configure_search()
+                self.documents = documents
+                ids = self.documents.ids
+                self._next_id = max(info.get("next_id", 0), ids[-1] + 1 if ids else 0)
+                self._lexical_index = None
+                self.manifest = manifest
+                self.snapshot_version = version
+                self._paths = paths
+                self._dirty = False
+                previous.close()
+            logger.info(f"Loaded index with {len(self.documents)} documents ({self.index_factory}, {self.metric}"
+                        f"{f', snapshot v{version}' if version is not None else ''})")
+            return True
         except Exception as e:
             logger.error(f"Failed to load index: {str(e)}")
             return False
 
+    def reload_if_changed(self) -> bool:
+        """
+        Load the committed snapshot if another process has published a newer one.
+        Stores with unsaved changes are left alone.
+        
+        Returns:
+            bool: True if a newer snapshot was loaded.
+        """
+        if self._dirty:
+            return False
+        version = snapshot.current_version(self.config.VECTOR_DB_SNAPSHOTS)
+        if version is None or version == self.snapshot_version:
+            return False
+        logger.info(f"Found snapshot v{version} (loaded: v{self.snapshot_version}); reloading")
+        return self.load()
+
+    def _maybe_reload(self) -> None:
+        """Check for a newer snapshot at most every Config.VECTOR_DB_RELOAD_INTERVAL seconds."""
+        interval = self.config.VECTOR_DB_RELOAD_INTERVAL
+        if interval <= 0 or time.monotonic() - self._last_reload_check < interval:
+            return
+        # One thread checks while the others keep searching the current snapshot.
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_reload_check = time.monotonic()
+            self.reload_if_changed()
+        finally:
+            self._reload_lock.release()
+
+    def _legacy_paths(self) -> Dict[str, str]:
+        """Files of an index saved before snapshots existed."""
+        return {
+            "index": self.config.VECTOR_DB_INDEX,
+            "documents": self.config.VECTOR_DB_DOCUMENTS,
+            "metadata": self.config.VECTOR_DB_METADATA,
+            "info": self.config.VECTOR_DB_INDEX_INFO,
+            "lexical": self.config.VECTOR_DB_LEXICAL,
+            "manifest": self.config.VECTOR_DB_MANIFEST,
+        }
+
+    def _snapshot_paths(self, directory: str) -> Dict[str, str]:
+        """Files of a snapshot directory; they keep the names of the legacy files."""
+        return {
+            name: os.path.join(directory, os.path.basename(path))
+            for name, path in self._legacy_paths().items()
+        }
+
+    def _prepare_write(self) -> None:
+        """
+        Mark the store as changed and make a memory-mapped index writable by
+        reading it into memory; mapped indexes must never be modified.
+        """
+        if self._index_mmapped:
+            self.index = self.faiss.read_index(self._paths["index"])
+            self._index_mmapped = False
+            self._configure_search()
+        self._dirty = True
+
+    def _read_index_info(self, path: str) -> Dict[str, Any]:
+        """Read how the saved index was built; indexes without this file are legacy."""
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _apply_index_info(self, info: Dict[str, Any]) -> None:
+        """Adopt the factory and metric of a loaded index; legacy indexes are flat L2."""
+        self.index_factory = info.get("factory", "Flat")
+        if self.index.metric_type == self.faiss.METRIC_INNER_PRODUCT:
+            self.metric = index_factory.METRIC_COSINE
+        else:
+            self.metric = index_factory.METRIC_L2
+
+    def _migrate_legacy_metadata(self, metadata_path: str, documents_path: str) -> DocumentStore:
+        """
+        Convert a pickled metadata list into the memory-mapped document store.
+        
+        The pickle is left in place (it may be tracked in version control); once
+        the document store exists, load() reads that instead. If writing fails,
+        the converted documents are still returned from memory.
+        """
+        logger.info(f"Migrating legacy metadata from {metadata_path}")
+        with open(metadata_path, "rb") as f:
+            documents = DocumentStore.from_documents(pickle.load(f))
+        try:
+            documents.save(documents_path)
+            logger.info(f"Migrated {len(documents)} documents to {documents_path}")
+        except Exception as e:
+            logger.error(f"Failed to write migrated documents: {str(e)}")
+        return documents
+
     def save(self) -> bool:
         """
-        Save the index and metadata to disk.
+        Save the index, documents, lexical index and manifest as a new snapshot.
+        
+        The files are written to a staging directory which is then committed
+        atomically, so readers in other processes never see a new index paired
+        with stale documents. Older snapshots beyond Config.VECTOR_DB_KEEP_SNAPSHOTS
+        are deleted.
         
         Returns:
             bool: True if successfully saved, False otherwise.
@@ -77,11 +280,41 @@ class VectorStore:
                 logger.error("FAISS is not available or index is not initialized.")
                 return False
 
-            os.makedirs(os.path.dirname(self.config.VECTOR_DB_INDEX), exist_ok=True)
-            self.faiss.write_index(self.index, self.config.VECTOR_DB_INDEX)
-            with open(self.config.VECTOR_DB_METADATA, "wb") as f:
-                pickle.dump(self.metadata_list, f)
-            logger.info(f"Saved index with {len(self.metadata_list)} documents")
+            with self._lock.write():
+                self._flush_pending()
+                root = self.config.VECTOR_DB_SNAPSHOTS
+                staging = snapshot.begin_snapshot(root)
+                paths = self._snapshot_paths(staging)
+                try:
+                    self.faiss.write_index(self.index, paths["index"])
+                    with open(paths["info"], "w", encoding="utf-8") as f:
+                        json.dump({
+                            "factory": self.index_factory,
+                            "metric": self.metric,
+                            "embedder": self.embedder.name,
+                            "dim": self.vector_size,
+                            "next_id": self._next_id,
+                        }, f, indent=2)
+                    self._lexical().save(paths["lexical"])
+                    with open(paths["manifest"], "w", encoding="utf-8") as f:
+                        json.dump(self.manifest, f, indent=2)
+                    self.documents.save(paths["documents"])
+                    # Windows cannot rename a directory while a file in it is mapped.
+                    self.documents.close()
+                    try:
+                        version = snapshot.commit_snapshot(root, staging)
+                    except Exception:
+                        self.documents = DocumentStore.open(paths["documents"])
+                        raise
+                except Exception:
+                    shutil.rmtree(staging, ignore_errors=True)
+                    raise
+                self._paths = self._snapshot_paths(snapshot.snapshot_dir(root, version))
+                self.documents = DocumentStore.open(self._paths["documents"])
+                self.snapshot_version = version
+                self._dirty = False
+            snapshot.prune_snapshots(root, self.config.VECTOR_DB_KEEP_SNAPSHOTS)
+            logger.info(f"Saved index with {len(self.documents)} documents as snapshot v{version}")
             return True
         except Exception as e:
             logger.error(f"Failed to save index: {str(e)}")
@@ -103,67 +336,591 @@ class VectorStore:
                 logger.error("FAISS is not available or index is not initialized.")
                 return False
 
+            # Embedding is a network call for the OpenAI backend; searches can run meanwhile.
             vector = self.embed_text(asc_code)
             if vector is None:
                 logger.error("Failed to compute embedding for the document.")
                 return False
 
-            vector = np.expand_dims(vector, axis=0)
-            self.index.add(vector)
-            doc = {"asc_code": asc_code}
-            if metadata:
-                doc.update(metadata)
-            self.metadata_list.append(doc)
-            logger.info(f"Document added. Total documents: {len(self.metadata_list)}")
+            with self._lock.write():
+                self._prepare_write()
+                doc_id = self._next_id
+                self._add_vectors(np.expand_dims(vector, axis=0), [doc_id])
+                self._next_id += 1
+                doc = {"asc_code": asc_code}
+                if metadata:
+                    doc.update(metadata)
+                self._lexical().add(asc_code, doc_id)
+                self.documents.append(doc, doc_id)
+                logger.info(f"Document added. Total documents: {len(self.documents)}")
             return True
         except Exception as e:
             logger.error(f"Failed to add document: {str(e)}")
             return False
 
-    def search(self, query_text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+    def add_documents(self, texts: List[str], metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+                      batch_size: Optional[int] = None, vectors: Optional[np.ndarray] = None) -> List[Optional[int]]:
+        """
+        Add many documents to the vector store, embedding them in batches.
+        
+        Each batch is embedded with a single API request and added to the index
+        with a single index.add call. Only adding takes the write lock, so
+        searches are not blocked while a batch is being embedded.
+        
+        Args:
+            texts (list): ASC code or combined texts to embed.
+            metadatas (list, optional): Metadata dicts aligned with texts.
+            batch_size (int, optional): Inputs per embedding request. Defaults to
+                Config.EMBEDDING_BATCH_SIZE.
+            vectors (np.ndarray, optional): Embeddings already computed for texts
+                (e.g. during deduplication); texts are then not embedded again.
+            
+        Returns:
+            list: The stable document id assigned to each text, or None where it
+            could not be added.
+        """
+        ids: List[Optional[int]] = [None] * len(texts)
+        if self.faiss is None or self.index is None:
+            logger.error("FAISS is not available or index is not initialized.")
+            return ids
+
+        if (metadatas is not None and len(metadatas) != len(texts)) or (vectors is not None and len(vectors) != len(texts)):
+            logger.error("texts, metadatas and vectors must have the same length.")
+            return ids
+
+        batch_size = batch_size or self.config.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(texts), batch_size):
+            batch_texts = texts[start:start + batch_size]
+            batch_vectors = vectors[start:start + batch_size] if vectors is not None else self.embed_texts(batch_texts)
+            if batch_vectors is None:
+                logger.error(f"Failed to compute embeddings for batch starting at {start}.")
+                continue
+            with self._lock.write():
+                self._prepare_write()
+                batch_ids = list(range(self._next_id, self._next_id + len(batch_texts)))
+                try:
+                    self._add_vectors(batch_vectors, batch_ids)
+                except Exception as e:
+                    logger.error(f"Failed to add batch starting at {start}: {str(e)}")
+                    continue
+                self._next_id += len(batch_texts)
+                lexical = self._lexical()
+                for offset, (doc_id, text) in enumerate(zip(batch_ids, batch_texts)):
+                    doc = {"asc_code": text}
+                    if metadatas is not None and metadatas[start + offset]:
+                        doc.update(metadatas[start + offset])
+                    ids[start + offset] = doc_id
+                    lexical.add(text, doc_id)
+                    self.documents.append(doc, doc_id)
+                logger.info(f"Added batch of {len(batch_texts)} documents. Total documents: {len(self.documents)}")
+        return ids
+
+    def update_document(self, doc_id: int, asc_code: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Replace the text and metadata of a document, keeping its id.
+        
+        Args:
+            doc_id (int): Id returned when the document was added.
+            asc_code (str): New ASC code or combined text to embed.
+            metadata (dict, optional): New metadata; replaces the old metadata.
+            
+        Returns:
+            bool: True if the document was updated, False otherwise.
+        """
+        return self.update_documents([doc_id], [asc_code], [metadata])[0]
+
+    def update_documents(self, ids: List[int], texts: List[str],
+                         metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+                         batch_size: Optional[int] = None, vectors: Optional[np.ndarray] = None) -> List[bool]:
+        """
+        Replace documents in place, re-embedding only the given texts.
+        
+        The old vectors are deleted from the index by id and the new ones are
+        added under the same ids, so no other document is touched. Texts are
+        embedded before the write lock is taken.
+        
+        Args:
+            ids (list): Ids of the documents to replace.
+            texts (list): New ASC code or combined texts, aligned with ids.
+            metadatas (list, optional): New metadata dicts aligned with ids.
+            batch_size (int, optional): Inputs per embedding request. Defaults to
+                Config.EMBEDDING_BATCH_SIZE.
+            vectors (np.ndarray, optional): Embeddings already computed for texts.
+            
+        Returns:
+            list: Whether each document was updated, aligned with ids.
+        """
+        updated = [False] * len(ids)
+        if self.faiss is None or self.index is None:
+            logger.error("FAISS is not available or index is not initialized.")
+            return updated
+
+        if len(texts) != len(ids) or any(values is not None and len(values) != len(ids) for values in (metadatas, vectors)):
+            logger.error("ids, texts, metadatas and vectors must have the same length.")
+            return updated
+
+        batch_size = batch_size or self.config.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(ids), batch_size):
+            with self._lock.read():
+                offsets = []
+                for offset in range(start, min(start + batch_size, len(ids))):
+                    if self.documents.position_of(int(ids[offset])) is None:
+                        logger.warning(f"Cannot update unknown document id {ids[offset]}")
+                        continue
+                    offsets.append(offset)
+            if not offsets:
+                continue
+            if vectors is not None:
+                batch_vectors = vectors[offsets]
+            else:
+                batch_vectors = self.embed_texts([texts[offset] for offset in offsets])
+            if batch_vectors is None:
+                logger.error(f"Failed to compute embeddings for update batch starting at {start}.")
+                continue
+            with self._lock.write():
+                self._prepare_write()
+                # Positions are looked up again: documents may have been removed meanwhile.
+                batch, keep = [], []
+                for row, offset in enumerate(offsets):
+                    position = self.documents.position_of(int(ids[offset]))
+                    if position is None:
+                        logger.warning(f"Cannot update unknown document id {ids[offset]}")
+                        continue
+                    batch.append((offset, int(ids[offset]), position))
+                    keep.append(row)
+                if not batch:
+                    continue
+                batch_ids = [doc_id for _, doc_id, _ in batch]
+                try:
+                    self._flush_pending()
+                    self._remove_vectors(batch_ids)
+                    self._add_vectors(batch_vectors[keep], batch_ids)
+                except Exception as e:
+                    logger.error(f"Failed to update batch starting at {start}: {str(e)}")
+                    continue
+                lexical = self._lexical()
+                for offset, doc_id, position in batch:
+                    doc = {"asc_code": texts[offset]}
+                    if metadatas is not None and metadatas[offset]:
+                        doc.update(metadatas[offset])
+                    lexical.add(texts[offset], doc_id)
+                    self.documents.replace(position, doc)
+                    updated[offset] = True
+                logger.info(f"Updated batch of {len(batch)} documents")
+        return updated
+
+    @_writes
+    def remove_documents(self, ids: List[int]) -> int:
+        """
+        Remove documents from the vector store without re-embedding the rest.
+        
+        Ids of the remaining documents do not change. Index types that cannot
+        delete in place (e.g. HNSW) are refilled from their own stored vectors.
+        
+        Args:
+            ids (list): Ids of the documents to remove.
+            
+        Returns:
+            int: Number of documents removed.
+        """
+        try:
+            if self.faiss is None or self.index is None:
+                logger.error("FAISS is not available or index is not initialized.")
+                return 0
+
+            self._flush_pending()
+            positions = {}
+            for doc_id in ids:
+                position = self.documents.position_of(int(doc_id))
+                if position is not None:
+                    positions[int(doc_id)] = position
+            if not positions:
+                return 0
+            removed = self._remove_vectors(list(positions))
+            self._lexical().remove(positions)
+            self.documents.remove(positions.values())
+            logger.info(f"Removed {removed} documents. Total documents: {len(self.documents)}")
+            return int(removed)
+        except Exception as e:
+            logger.error(f"Failed to remove documents: {str(e)}")
+            return 0
+
+    def _remove_vectors(self, ids: List[int]) -> int:
+        """Delete vectors from the index by id and return how many were removed."""
+        id_array = np.array(ids, dtype=np.int64)
+        try:
+            return int(self.index.remove_ids(id_array))
+        except RuntimeError:
+            # The index cannot delete in place; refill it with the other vectors.
+            all_ids, vectors = self._reconstruct_all()
+            keep = ~np.isin(all_ids, id_array)
+            self.index.reset()
+            if keep.any():
+                self.index.add_with_ids(vectors[keep], all_ids[keep])
+            return int(len(all_ids) - keep.sum())
+
+    def search(self, query_text: str, top_k: int = 3, mode: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Search for similar documents.
         
         Args:
             query_text (str): Query text to search for.
             top_k (int): Number of results to return.
+            mode (str, optional): "vector" (embedding similarity), "lexical" (BM25
+                over description words and ASC tokens, no API call) or "hybrid"
+                (reciprocal-rank fusion of both). Defaults to Config.RETRIEVAL_MODE.
+            
+        Returns:
+            list: List of matching documents with metadata and scores. In vector
+            mode with the cosine metric the score is a similarity (higher is
+            closer); with l2 it is a squared distance (lower is closer). Lexical
+            mode returns BM25 scores and hybrid mode fused scores, both higher
+            is closer.
+        """
+        results = self.search_many([query_text], top_k=top_k, mode=mode)[0]
+        logger.info(f"Found {len(results)} similar documents for query: '{query_text[:50]}...'")
+        return results
+
+    def search_many(self, queries: List[str], top_k: int = 3, batch_size: Optional[int] = None,
+                    mode: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar documents for many queries at once.
+        
+        Queries are embedded in batched API requests and searched with a single
+        matrix index.search call. Each document is decoded at most once per call,
+        even when it is returned for several queries.
+        
+        Args:
+            queries (list): Query texts to search for.
+            top_k (int): Number of results to return per query.
+            batch_size (int, optional): Queries per embedding request. Defaults to
+                Config.EMBEDDING_BATCH_SIZE.
+            mode (str, optional): "vector", "lexical" or "hybrid", as in search().
             
         Returns:
-            list: List of matching documents with metadata and scores.
+            list: One result list per query, aligned with queries, in the same
+            format as search().
         """
+        empty = [[] for _ in queries]
+        mode = mode or self.config.RETRIEVAL_MODE
+        if mode not in ("vector", "lexical", "hybrid"):
+            logger.error(f"Unknown search mode: {mode}")
+            return empty
+        self._maybe_reload()
+        query_vectors = None
+        if mode in ("vector", "hybrid") and queries and self.index is not None and len(self.documents):
+            # A network call for the OpenAI backend, so it is made outside the lock.
+            query_vectors = self._embed_queries(queries, batch_size)
+        while True:
+            with self._lock.read():
+                if self._ready_for_search(mode):
+                    return self._search_many(queries, query_vectors, top_k, mode)
+            # Adding staged vectors and building the lexical index change shared
+            # state, which needs the write lock; searches only read.
+            try:
+                with self._lock.write():
+                    self._flush_pending()
+                    if mode != "vector":
+                        self._lexical()
+            except Exception as e:
+                logger.error(f"Search error: {str(e)}")
+                return empty
+
+    def _ready_for_search(self, mode: str) -> bool:
+        return not self._pending_vectors and (mode == "vector" or self._lexical_index is not None)
+
+    def _search_many(self, queries: List[str], query_vectors: Optional[np.ndarray], top_k: int,
+                     mode: str) -> List[List[Dict[str, Any]]]:
+        empty = [[] for _ in queries]
         try:
             if self.faiss is None or self.index is None:
                 logger.error("FAISS is not available or index is not initialized.")
-                return []
+                return empty
 
-            if len(self.metadata_list) == 0:
+            if len(self.documents) == 0:
                 logger.warning("No documents in the vector store. Returning empty results.")
-                return []
-
-            effective_top_k = min(top_k, len(self.metadata_list))
-            query_vector = self.embed_text(query_text)
-            if query_vector is None:
-                logger.error("Failed to compute embedding for the query.")
-                return []
-            query_vector = np.expand_dims(query_vector, axis=0)
-            distances, indices = self.index.search(query_vector, effective_top_k)
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx == -1 or idx >= len(self.metadata_list):
+                return empty
+
+            if not queries:
+                return empty
+
+            effective_top_k = min(top_k, len(self.documents))
+            # Fusion needs a deeper candidate list from each retriever.
+            candidates = effective_top_k if mode != "hybrid" else min(max(4 * effective_top_k, 20), len(self.documents))
+
+            vector_hits = None
+            if mode in ("vector", "hybrid"):
+                vector_hits = self._vector_hits(query_vectors, candidates) if query_vectors is not None else None
+                if vector_hits is None:
+                    if mode == "vector":
+                        return empty
+                    logger.warning("Vector retrieval failed; falling back to lexical results.")
+            lexical_hits = None
+            if mode in ("lexical", "hybrid"):
+                lexical_hits = [self._lexical_index.search(query, candidates) for query in queries]
+
+            if vector_hits is not None and lexical_hits is not None:
+                hits = [
+                    reciprocal_rank_fusion([vector_row, lexical_row], effective_top_k)
+                    for vector_row, lexical_row in zip(vector_hits, lexical_hits)
+                ]
+            elif vector_hits is not None:
+                hits = vector_hits
+            else:
+                hits = [row[:effective_top_k] for row in lexical_hits]
+
+            # Only the returned documents are decoded from the memory-mapped store.
+            decoded = {}
+            for idx in {idx for row in hits for idx, _ in row}:
+                position = self.documents.position_of(int(idx))
+                if position is None:
                     continue
-                metadata = {k: v for k, v in self.metadata_list[idx].items() if k != "asc_code"}
-                full_text = self.metadata_list[idx].get("asc_code", "")
+                document = self.documents[position]
+                full_text = document.get("asc_code", "")
                 asc_code = full_text.split("\nASC CODE:\n", 1)[1] if "\nASC CODE:\n" in full_text else full_text
-                results.append({
-                    "asc_code": asc_code,
-                    "metadata": metadata,
-                    "score": float(distances[0][i])
-                })
-            logger.info(f"Found {len(results)} similar documents for query: '{query_text[:50]}...'")
-            return results
+                decoded[int(idx)] = (asc_code, {k: v for k, v in document.items() if k != "asc_code"})
+
+            all_results = []
+            for row in hits:
+                results = []
+                for idx, score in row:
+                    if int(idx) not in decoded:
+                        continue
+                    asc_code, metadata = decoded[int(idx)]
+                    results.append({
+                        "asc_code": asc_code,
+                        "metadata": dict(metadata),
+                        "score": float(score)
+                    })
+                all_results.append(results)
+            return all_results
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
-            return []
+            return empty
+
+    def _embed_queries(self, queries: List[str], batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+        """Embed queries in batches; None if any batch fails."""
+        batch_size = batch_size or self.config.EMBEDDING_BATCH_SIZE
+        query_vectors = []
+        for start in range(0, len(queries), batch_size):
+            vectors = self.embed_texts(queries[start:start + batch_size])
+            if vectors is None:
+                logger.error("Failed to compute embeddings for the queries.")
+                return None
+            query_vectors.append(vectors)
+        return np.vstack(query_vectors)
+
+    def _vector_hits(self, query_vectors: np.ndarray, top_k: int) -> List[List[Tuple[int, float]]]:
+        """Return (id, score) pairs per query embedding from the FAISS index."""
+        query_matrix = self._prepare_vectors(query_vectors)
+        distances, indices = self.index.search(query_matrix, top_k)
+        return [
+            [(int(idx), float(score)) for idx, score in zip(index_row, distance_row) if idx != -1]
+            for index_row, distance_row in zip(indices, distances)
+        ]
+
+    def similar_documents(self, vectors: np.ndarray, threshold: float, top_k: int = 5) -> List[List[Tuple[int, float]]]:
+        """
+        Find stored documents whose vectors are close to the given embeddings.
+        
+        Candidates come from the index; their cosine similarity is then computed
+        from the stored vectors, so the result does not depend on the metric.
+        
+        Args:
+            vectors (np.ndarray): Embeddings to look up.
+            threshold (float): Minimum cosine similarity.
+            top_k (int): Candidates checked per embedding.
+            
+        Returns:
+            list: (document id, similarity) pairs per embedding, most similar first.
+        """
+        empty = [[] for _ in vectors]
+        if self._pending_vectors:
+            self.train_index()
+        with self._lock.read():
+            try:
+                if self.faiss is None or self.index is None or self.index.ntotal == 0:
+                    return empty
+                queries = np.ascontiguousarray(vectors, dtype=np.float32).copy()
+                self.faiss.normalize_L2(queries)
+                _, indices = self.index.search(self._prepare_vectors(vectors), min(top_k, self.index.ntotal))
+                results = []
+                for query, index_row in zip(queries, indices):
+                    ids = index_row[index_row != -1]
+                    if len(ids) == 0:
+                        results.append([])
+                        continue
+                    stored = self.index.reconstruct_batch(ids)
+                    norms = np.linalg.norm(stored, axis=1)
+                    norms[norms == 0] = 1.0
+                    similarities = stored @ query / norms
+                    results.append([(int(doc_id), float(score)) for doc_id, score in
+                                    sorted(zip(ids, similarities), key=lambda hit: -hit[1]) if score >= threshold])
+                return results
+            except Exception as e:
+                logger.error(f"Similar document search error: {str(e)}")
+                return empty
+
+    def _lexical(self) -> LexicalIndex:
+        """
+        Return the BM25 index, loading it from disk on first use. It is rebuilt
+        from the stored documents if it is missing or out of sync with them.
+        """
+        if self._lexical_index is None:
+            path = self._paths["lexical"]
+            if os.path.exists(path):
+                try:
+                    self._lexical_index = LexicalIndex.load(path)
+                except Exception as e:
+                    logger.error(f"Failed to load lexical index: {str(e)}")
+            ids = self.documents.ids
+            if self._lexical_index is None or set(self._lexical_index.doc_lengths) != set(ids):
+                logger.info(f"Building lexical index over {len(self.documents)} documents")
+                self._lexical_index = LexicalIndex()
+                for position, doc_id in enumerate(ids):
+                    self._lexical_index.add(self.documents[position].get("asc_code", ""), doc_id)
+        return self._lexical_index
+
+    def _resolve_factory(self, configured: str, num_vectors: int) -> str:
+        """Resolve a configured factory string, applying Config.VECTOR_INDEX_STORAGE to "auto"."""
+        code = index_factory.storage_code(
+            self.config.VECTOR_INDEX_STORAGE, self.vector_size, self.config.VECTOR_INDEX_PQ_M
+        )
+        return index_factory.resolve_index_factory(configured, num_vectors, code)
+
+    def _new_index(self, factory: str) -> None:
+        """Replace the index with an empty one built from a FAISS factory string."""
+        self.index = index_factory.create_index(self.faiss, factory, self.vector_size, self.metric)
+        self.index_factory = factory
+        self._pending_vectors = []
+        self._configure_search()
+
+    def _configure_search(self) -> None:
+        index_factory.configure_search(
+            self.faiss, self.index,
+            nprobe=self.config.VECTOR_INDEX_NPROBE,
+            ef_search=self.config.VECTOR_INDEX_EF_SEARCH
+        )
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        """
+        Tune query-time accuracy/speed trade-offs. nprobe applies to IVF indexes,
+        ef_search to HNSW indexes; parameters the index does not use are ignored.
+        """
+        index_factory.configure_search(self.faiss, self.index, nprobe=nprobe, ef_search=ef_search)
+
+    def _prepare_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """Normalize vectors for cosine (inner product) indexes."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.metric == index_factory.METRIC_COSINE:
+            vectors = vectors.copy()
+            self.faiss.normalize_L2(vectors)
+        return vectors
+
+    def _add_vectors(self, vectors: np.ndarray, ids: List[int]) -> None:
+        """Add vectors under ids, or stage them until an untrained index is trained."""
+        vectors = self._prepare_vectors(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.index.is_trained and not self._pending_vectors:
+            self.index.add_with_ids(vectors, ids)
+        else:
+            self._pending_vectors.append((ids, vectors))
+
+    def _flush_pending(self) -> None:
+        """Train the index on staged vectors if needed and add them."""
+        if not self._pending_vectors:
+            return
+        ids = np.concatenate([batch_ids for batch_ids, _ in self._pending_vectors])
+        vectors = np.vstack([batch_vectors for _, batch_vectors in self._pending_vectors])
+        self._pending_vectors = []
+        if not self.index.is_trained:
+            try:
+                logger.info(f"Training {self.index_factory} index on {len(vectors)} vectors")
+                self.index.train(vectors)
+            except RuntimeError as e:
+                # Too few vectors for the requested index (e.g. fewer than nlist).
+                logger.warning(f"Index training failed ({str(e)}); falling back to a flat index")
+                self._new_index("Flat")
+        self.index.add_with_ids(vectors, ids)
+
+    def train_index(self) -> bool:
+        """
+        Train the index on staged vectors and add them. Called automatically
+        before searching and saving; ingestion calls it once all examples are added.
+        
+        Returns:
+            bool: True if the index is trained and holds every document.
+        """
+        try:
+            with self._lock.write():
+                self._flush_pending()
+                return self.index.is_trained
+        except Exception as e:
+            logger.error(f"Failed to train index: {str(e)}")
+            return False
+
+    def _reconstruct_all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ids and vectors of every document in the index, in document order."""
+        ids = np.array(self.documents.ids, dtype=np.int64)
+        if len(ids) == 0:
+            return ids, np.zeros((0, self.vector_size), dtype=np.float32)
+        return ids, self.index.reconstruct_batch(ids)
+
+    def get_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ids and stored vectors of every document, in document order.
+        Vectors come back as the index stores them (normalized for cosine, and
+        approximate for quantized storage).
+        """
+        with self._lock.write():
+            self._flush_pending()
+            return self._reconstruct_all()
+
+    @_writes
+    def rebuild_index(self, factory: Optional[str] = None, metric: Optional[str] = None) -> bool:
+        """
+        Rebuild the index with a different type or metric from the vectors it
+        already stores, without re-embedding any document. Vectors come from
+        the current index, so moving from quantized to full-precision storage
+        does not restore the precision that was lost.
+        
+        Args:
+            factory (str, optional): FAISS factory string or "auto". Defaults to
+                Config.VECTOR_INDEX_FACTORY.
+            metric (str, optional): "cosine" or "l2". Defaults to Config.VECTOR_INDEX_METRIC.
+            
+        Returns:
+            bool: True if the index was rebuilt.
+        """
+        try:
+            self._flush_pending()
+            ids, vectors = self._reconstruct_all()
+            factory = self._resolve_factory(factory or self.config.VECTOR_INDEX_FACTORY, len(vectors))
+            self.metric = metric or self.config.VECTOR_INDEX_METRIC
+            self._new_index(factory)
+            if len(vectors):
+                self._add_vectors(vectors, ids)
+                self._flush_pending()
+            logger.info(f"Rebuilt index as {self.index_factory} ({self.metric}) with {self.index.ntotal} vectors")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to rebuild index: {str(e)}")
+            return False
+
+    def ensure_index_type(self) -> bool:
+        """
+        Rebuild the index if its type or metric no longer matches the
+        configuration for the current corpus size.
+        
+        Returns:
+            bool: True if the index was rebuilt.
+        """
+        desired = self._resolve_factory(self.config.VECTOR_INDEX_FACTORY, len(self.documents))
+        if self.metric == self.config.VECTOR_INDEX_METRIC and not index_factory.needs_rebuild(self.index_factory, desired):
+            return False
+        logger.info(f"Index type {self.index_factory} ({self.metric}) does not match {desired} "
+                    f"({self.config.VECTOR_INDEX_METRIC}); rebuilding")
+        return self.rebuild_index(desired)
 
     def embed_text(self, text: str) -> Optional[np.ndarray]:
         """
@@ -175,27 +932,61 @@ class VectorStore:
         Returns:
             np.ndarray: Embedding vector, or None if embedding fails.
         """
+        vectors = self.embed_texts([text])
+        if vectors is None:
+            return None
+        return vectors[0]
+
+    def embed_texts(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Generate embeddings for several texts with a single embedder call
+        (one API request for the OpenAI backend).
+        
+        Args:
+            texts (list): Texts to embed.
+            
+        Returns:
+            np.ndarray: Matrix of shape (len(texts), vector_size), or None if embedding fails.
+        """
         try:
-            text = text.replace("\n", " ")
-            response = openai.Embedding.create(
-                input=[text],
-                model=self.embedding_model
-            )
-            embedding = response["data"][0]["embedding"]
-            return np.array(embedding, dtype=np.float32)
+            inputs = [text.replace("\n", " ") for text in texts]
+            cached = [None] * len(inputs)
+            if self.embedding_cache is not None:
+                try:
+                    cached = self.embedding_cache.get_many(self.embedding_model, inputs)
+                except Exception as e:
+                    logger.error(f"Embedding cache lookup error: {str(e)}")
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+
+            if missing:
+                fresh = self.embedder.embed([inputs[i] for i in missing])
+                for i, vector in zip(missing, fresh):
+                    cached[i] = vector
+                if self.embedding_cache is not None:
+                    try:
+                        self.embedding_cache.put_many(self.embedding_model, [inputs[i] for i in missing], fresh)
+                    except Exception as e:
+                        logger.error(f"Embedding cache store error: {str(e)}")
+
+            return np.array(cached, dtype=np.float32).reshape(len(inputs), -1)
         except Exception as e:
             logger.error(f"Embedding error: {str(e)}")
             return None
 
     def get_document_count(self) -> int:
         """Return the number of documents in the index."""
-        return len(self.metadata_list)
+        return len(self.documents)
 
+    @_writes
     def clear(self) -> bool:
         """Clear the index and metadata."""
         if self.faiss is not None:
-            self.index = self.faiss.IndexFlatL2(self.vector_size)
-            self.metadata_list = []
+            self.metric = self.config.VECTOR_INDEX_METRIC
+            self._new_index(self._resolve_factory(self.config.VECTOR_INDEX_FACTORY, 0))
+            # _next_id is kept: ids handed out before clearing must not name new documents.
+            self.documents.clear()
+            self._lexical_index = LexicalIndex()
+            self.manifest = {}
             logger.info("Index and metadata cleared")
             return True
         return False
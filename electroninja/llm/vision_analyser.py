@@ -2,8 +2,9 @@
 import os
 import logging
 import base64
-import openai
 from electroninja.config.settings import Config
+from electroninja.llm.http_client import configure_openai
+from electroninja.llm.request_scheduler import shared_request_scheduler
 from electroninja.llm.prompts.circuit_prompts import VISION_IMAGE_ANALYSIS_PROMPT
 
 logger = logging.getLogger('electroninja')
@@ -14,7 +15,8 @@ class VisionAnalyzer:
     def __init__(self, config=None):
         self.config = config or Config()
         self.model = self.config.OPENAI_VISION_MODEL  # Should be "gpt-4o"
-        openai.api_key = self.config.OPENAI_API_KEY
+        self.request_timeout = configure_openai(self.config)
+        self.scheduler = shared_request_scheduler(self.config)
         logger.info(f"Vision Analyzer initialized with OpenAI model: {self.model}")
         
     def analyze_circuit_image(self, image_path, prompt):
@@ -48,7 +50,8 @@ class VisionAnalyzer:
             logger.info("Sending prompt to OpenAI vision model...")
             
             # Call OpenAI API with both text and the image data
-            response = openai.ChatCompletion.create(
+            response = self.scheduler.create(
+                method="analyze_circuit_image",
                 model=self.model,
                 messages=[
                     {
@@ -64,7 +67,8 @@ class VisionAnalyzer:
                             }
                         ]
                     }
-                ]
+                ],
+                request_timeout=self.request_timeout
             )
             
             # Extract and process analysis
@@ -123,7 +127,8 @@ class VisionAnalyzer:
             }
 
             # Call OpenAI API
-            response = openai.ChatCompletion.create(
+            response = self.scheduler.create(
+                method="produce_description_of_image",
                 model=self.model,
                 messages=[
                     system_prompt,
@@ -140,7 +145,8 @@ class VisionAnalyzer:
                             }
                         ]
                     }
-                ]
+                ],
+                request_timeout=self.request_timeout
             )
 
             # Extract and process analysis
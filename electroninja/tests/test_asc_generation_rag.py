@@ -22,7 +22,7 @@ def test_asc_generation_from_description():
     print("\n====== TEST: ASC GENERATION FROM DESCRIPTION ======")
     
     # Path to the saved description file for prompt1
-    description_path = os.path.join("data", "output", f"prompt{prompt_id}", "description.txt")
+    description_path = os.path.join(Config.OUTPUT_DIR, f"prompt{prompt_id}", "description.txt")
     
     if not os.path.exists(description_path):
         print(f"Description file not found at: {description_path}")
@@ -0,0 +1,108 @@
+import os
+import sys
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.asc_parser import asc_line_error
+from electroninja.llm.asc_stream import AscStreamParser
+from electroninja.llm.providers.openai import OpenAIProvider
+
+RC_FILTER = """Version 4
+SHEET 1 880 680
+WIRE 208 80 80 80
+FLAG 80 240 0
+SYMBOL voltage 80 112 R0
+WINDOW 0 36 40 Left 2
+SYMATTR InstName V1
+SYMATTR Value 5
+SYMBOL res 208 64 R90
+SYMATTR InstName R1
+SYMATTR Value 1k
+TEXT 56 280 Left 2 !.tran 10m
+"""
+
+def chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def test_asc_streaming():
+    """Test streamed ASC generation: incremental validation, early abort and partial results."""
+    print("\n====== TEST: STREAMING ASC GENERATION ======")
+
+    assert all(asc_line_error(line) is None for line in RC_FILTER.splitlines())
+    assert asc_line_error("Here is your circuit:") is not None
+    assert asc_line_error("WIRE 208 80 eighty 80") is not None
+    assert asc_line_error("SYMBOL res 208 64 R45") is not None
+
+    parser = AscStreamParser()
+    assert not parser.feed("N")
+    assert parser.feed("\n") and parser.verdict == "N"
+    parser = AscStreamParser()
+    assert not parser.feed("NPN transistor") and parser.verdict is None
+
+    # Prose before the code is skipped; only non-ASC lines after it count
+    parser = AscStreamParser()
+    assert not parser.feed("Sure! Here is an RC filter.\nIt has:\n- a source\n- a resistor\n- a capacitor\n\n")
+    assert not parser.feed(RC_FILTER + "Hope this helps!\n") and parser.finish() is None
+    assert parser.asc == RC_FILTER.strip()
+    parser = AscStreamParser()
+    assert parser.feed(RC_FILTER + "Note:\n" * 4) and parser.verdict == "invalid"
+    parser = AscStreamParser(max_preamble_lines=5)
+    assert parser.feed("Let me think.\n" * 6) and parser.verdict == "invalid"
+
+    config = Config()
+    config.RESPONSE_CACHE_ENABLED = False
+    provider = OpenAIProvider(config)
+    consumed = []
+
+    def fake_create(**kwargs):
+        if not kwargs.get("stream"):
+            message = {"message": {"content": fake_create.answer}}
+            return openai.util.convert_to_openai_object({"choices": [message]})
+        def stream():
+            for piece in chunks(fake_create.answer):
+                consumed.append(piece)
+                yield openai.util.convert_to_openai_object({"choices": [{"delta": {"content": piece}}]})
+        return stream()
+
+    original_create = openai.ChatCompletion.create
+    openai.ChatCompletion.create = fake_create
+    try:
+        # A full answer streams through unchanged, reporting progress line by line
+        partials = []
+        fake_create.answer = "Here is the circuit:\n```\n" + RC_FILTER + "```"
+        asc_code = provider.generate_asc_code("An RC low-pass filter", on_partial=partials.append)
+        assert asc_code.startswith(RC_FILTER.strip())
+        assert len(partials) > 3 and partials[-1] == RC_FILTER.strip()
+        assert partials[0] == "Version 4"
+
+        # Prose skipped by the parser is not returned, even without a Version 4 header
+        headerless = RC_FILTER.split("\n", 1)[1]
+        fake_create.answer = "Here is the circuit:\n" + headerless + "Let me know if you need changes."
+        assert provider.generate_asc_code("An RC low-pass filter") == headerless.strip()
+
+        # A refusal stops at the first chunk
+        consumed.clear()
+        fake_create.answer = "N\n" + "This request is not about circuits. " * 20
+        assert provider.generate_asc_code("Write me a poem") == "N"
+        assert len(consumed) == 1
+
+        # Prose instead of ASC is abandoned after ASC_STREAM_MAX_PREAMBLE_LINES lines
+        consumed.clear()
+        fake_create.answer = "Sure!\nI would love to help.\nFirst, consider the\nrequirements carefully.\n" * 50
+        assert provider.generate_asc_code("An RC filter") == "Error: Failed to generate circuit"
+        print(f"Stopped after {len(consumed)} of {len(chunks(fake_create.answer))} chunks")
+        assert len(consumed) < 60
+
+        # Streaming can be turned off
+        config.ASC_STREAMING = False
+        consumed.clear()
+        fake_create.answer = RC_FILTER
+        assert provider.generate_asc_code("An RC filter") == RC_FILTER.strip()
+        assert consumed == []
+    finally:
+        openai.ChatCompletion.create = original_create
+
+if __name__ == "__main__":
+    test_asc_streaming()
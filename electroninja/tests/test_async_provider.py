@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import types
+import asyncio
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.http_client import close_async_session
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
+
+def test_async_provider():
+    """Test that async provider calls overlap on one event loop and share one HTTP session."""
+    print("\n====== TEST: ASYNC OPENAI PROVIDER ======")
+
+    sessions = []
+
+    async def fake_acreate(**kwargs):
+        sessions.append(openai.aiosession.get())
+        await asyncio.sleep(0.2)
+        prompt = kwargs["messages"][-1]["content"]
+        if "FAIL" in prompt:
+            raise openai.error.APIError("simulated outage")
+        content = "Version 4\nSHEET 1 880 680" if kwargs["model"] == provider.asc_gen_model else "V, R"
+        if kwargs.get("stream"):
+            return fake_stream(content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+    config = Config()
+    config.RESPONSE_CACHE_ENABLED = False
+    config.FAST_PATH_CLASSIFIER = False
+    provider = AsyncOpenAIProvider(config)
+
+    async def fake_stream(content):
+        for line in content.splitlines(keepends=True):
+            yield openai.util.convert_to_openai_object({"choices": [{"delta": {"content": line}}]})
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            provider.evaluate_circuit_request("an RC filter"),
+            provider.generate_chat_response("an RC filter"),
+            provider.create_description(None, "an RC filter"),
+            provider.list_components("Version 4"),
+            provider.generate_asc_code("an RC filter"),
+            provider.evaluate_circuit_request("FAIL"),
+        )
+        elapsed = time.perf_counter() - start
+        await close_async_session()
+        return results, elapsed
+
+    original_acreate = openai.ChatCompletion.acreate
+    openai.ChatCompletion.acreate = fake_acreate
+    try:
+        results, elapsed = asyncio.run(run())
+    finally:
+        openai.ChatCompletion.acreate = original_acreate
+
+    print(f"6 calls in {elapsed:.2f}s")
+    assert elapsed < 0.6
+    assert results[0] == "V, R"
+    assert results[4] == "Version 4\nSHEET 1 880 680"
+    # Errors fall back exactly as in OpenAIProvider
+    assert results[5] == "N"
+    assert len(sessions) == 6 and sessions[0] is not None
+    assert all(session is sessions[0] for session in sessions)
+    assert openai.aiosession.get() is None
+
+if __name__ == "__main__":
+    test_async_provider()
@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.benchmarks.synthetic import FakeEmbedder, synthetic_corpus
+from electroninja.benchmarks.retrieval import format_results, run_benchmark
+
+def test_benchmark():
+    """Test the synthetic corpus, the fake embedder and a small benchmark run."""
+    print("\n====== TEST: RETRIEVAL BENCHMARK ======")
+
+    texts, metadatas = synthetic_corpus(50, seed=3)
+    assert synthetic_corpus(50, seed=3)[0] == texts
+    assert all(meta["pure_asc_code"].startswith("Version 4") for meta in metadatas)
+    assert [meta["doc_index"] for meta in metadatas] == list(range(50))
+
+    embedder = FakeEmbedder(64)
+    vectors = embedder.embed(texts[:2])
+    assert vectors.shape == (2, 64)
+    assert (FakeEmbedder(64).embed(texts[:2]) == vectors).all()
+
+    run = run_benchmark(sizes=[300], configs=["flat", "auto-sq8"], num_queries=20, top_k=5, dim=64)
+    print(format_results(run))
+    json.dumps(run)
+    assert [row["config"] for row in run["results"]] == ["flat", "auto-sq8"]
+    flat, sq8 = run["results"]
+    assert flat["recall@5"] > 0.99
+    assert sq8["index_bytes"] < flat["index_bytes"]
+    assert flat["search_p99_ms"] >= flat["search_p50_ms"] > 0
+
+if __name__ == "__main__":
+    test_benchmark()
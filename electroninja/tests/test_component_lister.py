@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.llm.asc_parser import component_instances, component_letters
+
+# The example from COMPILE_CODE_COMP_PROMPT, plus a diode from a symbol library folder
+RLC_CIRCUIT = """Version 4
+SHEET 1 880 680
+WIRE 192 128 96 128
+WIRE 304 128 272 128
+WIRE 432 128 384 128
+WIRE 96 160 96 128
+WIRE 96 256 96 240
+WIRE 496 256 496 128
+WIRE 496 256 96 256
+WIRE 96 288 96 256
+FLAG 96 288 0
+SYMBOL voltage 96 144 R0
+WINDOW 123 0 0 Left 0
+WINDOW 39 0 0 Left 0
+SYMATTR InstName V1
+SYMATTR Value SINE(0 AC 1)
+SYMBOL res 288 112 R90
+WINDOW 0 0 56 VBottom 2
+WINDOW 3 32 56 VTop 2
+SYMATTR InstName R1
+SYMATTR Value 100
+SYMBOL cap 496 112 R90
+WINDOW 0 0 32 VBottom 2
+WINDOW 3 32 32 VTop 2
+SYMATTR InstName C1
+SYMATTR Value 0.1e-6
+SYMBOL ind 400 112 R90
+WINDOW 0 5 56 VBottom 2
+WINDOW 3 32 56 VTop 2
+SYMATTR InstName L1
+SYMATTR Value 0.01
+SYMBOL Misc\\zener 560 112 R0
+SYMATTR InstName D1
+SYMATTR Value BZX84C6V2L"""
+
+def test_component_lister():
+    """Test the local component lister that replaces the list_components LLM call."""
+    print("\n====== TEST: LOCAL COMPONENT LISTER ======")
+
+    assert component_letters(RLC_CIRCUIT) == "R, C, L, D"
+    instances = component_instances(RLC_CIRCUIT)
+    assert [(i["name"], i["letter"], i["value"]) for i in instances] == [
+        ("R1", "R", "100"), ("C1", "C", "0.1e-6"), ("L1", "L", "0.01"), ("D1", "D", "BZX84C6V2L"),
+    ]
+    # Only a source: nothing to list
+    assert component_letters("Version 4\nSYMBOL voltage 96 144 R0\nSYMATTR InstName V1") == ""
+    assert component_letters("") == ""
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        component_letters(RLC_CIRCUIT)
+    per_call = (time.perf_counter() - start) / 1000
+    print(f"{per_call * 1e6:.0f} us per listing")
+    assert per_call < 0.01
+
+if __name__ == "__main__":
+    test_component_lister()
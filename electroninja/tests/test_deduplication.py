@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.asc_parser import asc_fingerprint, canonical_asc, parse_asc
+from electroninja.llm.vector_store import VectorStore
+from ingest_examples import ingest_examples
+
+DIVIDER = """Version 4
+SHEET 1 880 680
+WIRE 80 80 80 128
+WIRE 224 80 80 80
+WIRE 80 240 80 208
+FLAG 80 240 0
+SYMBOL voltage 80 112 R0
+SYMATTR InstName V1
+SYMATTR Value 5
+SYMBOL res 208 64 R0
+SYMATTR InstName R1
+SYMATTR Value 1k
+SYMBOL res 208 160 R0
+SYMATTR InstName R2
+SYMATTR Value 2.2k"""
+
+# Same circuit moved by (+32, +16), with renamed parts, reordered lines and other value spellings
+DIVIDER_MOVED = """Version 4
+SHEET 1 1200 900
+SYMBOL res 240 176 R0
+SYMATTR InstName R7
+SYMATTR Value 2200
+SYMBOL res 240 80 R0
+WINDOW 0 36 40 Left 2
+SYMATTR InstName R3
+SYMATTR Value 1000
+WIRE 112 96 256 96
+WIRE 112 144 112 96
+WIRE 112 224 112 256
+FLAG 112 256 0
+SYMBOL voltage 112 128 R0
+SYMATTR InstName V2
+SYMATTR Value 5
+TEXT 300 300 Left 2 ;moved copy"""
+
+# Same parts, different topology
+DIVIDER_REWIRED = DIVIDER.replace("WIRE 224 80 80 80", "WIRE 224 240 80 240")
+
+RC_FILTER = """Version 4
+SHEET 1 880 680
+WIRE 208 80 80 80
+WIRE 80 240 80 208
+FLAG 80 240 0
+SYMBOL voltage 80 112 R0
+SYMATTR InstName V1
+SYMATTR Value 5
+SYMBOL res 208 64 R90
+SYMATTR InstName R1
+SYMATTR Value 1k
+SYMBOL cap 288 112 R0
+SYMATTR InstName C1
+SYMATTR Value 100n"""
+
+def make_config(tmp_dir):
+    config = Config()
+    config.EXAMPLES_DIR = tmp_dir
+    config.VECTOR_DB_INDEX = os.path.join(tmp_dir, "faiss_index.bin")
+    config.VECTOR_DB_DOCUMENTS = os.path.join(tmp_dir, "documents.bin")
+    config.VECTOR_DB_METADATA = os.path.join(tmp_dir, "metadata_list.pkl")
+    config.VECTOR_DB_MANIFEST = os.path.join(tmp_dir, "ingest_manifest.json")
+    config.VECTOR_DB_INDEX_INFO = os.path.join(tmp_dir, "index_info.json")
+    config.VECTOR_DB_LEXICAL = os.path.join(tmp_dir, "lexical_index.npz")
+    config.VECTOR_DB_SNAPSHOTS = os.path.join(tmp_dir, "snapshots")
+    config.EMBEDDING_BACKEND = "local"
+    config.EMBEDDING_CACHE_ENABLED = False
+    config.DEDUP_SIMILARITY_THRESHOLD = 0.9
+    return config
+
+def write_examples(tmp_dir, examples):
+    metadata = []
+    for name, description, asc_code in examples:
+        path = os.path.join(tmp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(asc_code)
+        metadata.append({"asc_path": path, "description": description})
+    with open(os.path.join(tmp_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+
+def stored_paths(config):
+    store = VectorStore(config)
+    paths = sorted(os.path.basename(store.documents[i]["asc_path"]) for i in range(len(store.documents)))
+    store.documents.close()
+    return paths
+
+def test_deduplication():
+    """Test canonical ASC fingerprints and near-duplicate collapsing during ingestion."""
+    print("\n====== TEST: NEAR-DUPLICATE DEDUPLICATION ======")
+
+    schematic = parse_asc(DIVIDER)
+    assert [c["attributes"]["InstName"] for c in schematic["components"]] == ["V1", "R1", "R2"]
+    assert len(schematic["wires"]) == 3 and schematic["flags"] == [(80, 240, "0")]
+
+    print(canonical_asc(DIVIDER))
+    assert asc_fingerprint(DIVIDER) == asc_fingerprint(DIVIDER_MOVED)
+    assert asc_fingerprint(DIVIDER) != asc_fingerprint(DIVIDER_REWIRED)
+    assert asc_fingerprint(DIVIDER) != asc_fingerprint(RC_FILTER)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_config(tmp_dir)
+        write_examples(tmp_dir, [
+            ("divider.asc", "A voltage divider with 1k and 2.2k resistors from a 5V source.", DIVIDER),
+            ("divider_moved.asc", "Voltage divider: 1k and 2.2k resistors fed by 5V.", DIVIDER_MOVED),
+            ("divider_rewired.asc", "A voltage divider with 1k and 2.2k resistors from a 5V source!", DIVIDER_REWIRED),
+            ("rc_filter.asc", "An RC low-pass filter with a 1k resistor and a 100n capacitor.", RC_FILTER),
+        ])
+        assert ingest_examples(config)
+        # The moved copy has the same canonical ASC; the rewired one embeds almost identically.
+        assert stored_paths(config) == ["divider.asc", "rc_filter.asc"]
+
+        # A rerun keeps the same representatives without re-adding the duplicates
+        assert ingest_examples(config)
+        assert stored_paths(config) == ["divider.asc", "rc_filter.asc"]
+
+        # When the representative is deleted, its duplicates are ingested again
+        # unless they are duplicates of each other (the wording differs too much here)
+        with open(os.path.join(tmp_dir, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        with open(os.path.join(tmp_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata[1:], f)
+        assert ingest_examples(config)
+        assert stored_paths(config) == ["divider_moved.asc", "divider_rewired.asc", "rc_filter.asc"]
+
+        with open(os.path.join(tmp_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        config.DEDUP_ENABLED = False
+        assert ingest_examples(config)
+        assert len(stored_paths(config)) == 4
+
+if __name__ == "__main__":
+    test_deduplication()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.llm.document_store import DocumentStore
+
+def test_document_store_roundtrip():
+    """Test that documents survive a save/open cycle and shared fields are stored once."""
+    print("\n====== TEST: DOCUMENT STORE ROUNDTRIP ======")
+
+    documents = [
+        {
+            "asc_code": "An RC filter\n\nVersion 4\nSYMBOL res 16 16 R0",
+            "description": "An RC filter",
+            "pure_asc_code": "Version 4\nSYMBOL res 16 16 R0",
+            "asc_path": "data/examples_asc/rc_filter.asc",
+        },
+        {
+            # Legacy pickled entries only carried the combined text.
+            "asc_code": "A divider\n\nASC CODE:\nVersion 4\nSYMBOL res 32 32 R0",
+            "description": "A divider",
+            "asc_path": "data/examples_asc/voltage_divider.asc",
+        },
+        {"asc_code": "free-form text", "source": "manual"},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "documents.bin")
+        store = DocumentStore.from_documents(documents)
+        store.save(path)
+        store.close()
+
+        # Each ASC body appears exactly once in the file.
+        with open(path, "rb") as f:
+            raw = f.read()
+        assert raw.count(b"SYMBOL res 16 16 R0") == 1
+        assert raw.count(b"SYMBOL res 32 32 R0") == 1
+
+        store = DocumentStore.open(path)
+        print(f"Loaded {len(store)} documents")
+        assert len(store) == 3
+        assert store[0] == documents[0]
+        assert store[1]["asc_code"] == documents[1]["asc_code"]
+        assert store[1]["pure_asc_code"] == "Version 4\nSYMBOL res 32 32 R0"
+        assert store[2] == documents[2]
+
+        # Ids stay attached to their documents across removals and saves.
+        store.remove([0])
+        store.append({"asc_code": "appended"}, 7)
+        store.replace(store.position_of(2), {"asc_code": "replaced"})
+        store.save(path)
+        assert store.ids == [1, 2, 7]
+        assert store.position_of(7) == 2
+        assert store.position_of(0) is None
+        assert [doc["asc_code"] for doc in store.get_many(range(len(store)))] == [
+            documents[1]["asc_code"], "replaced", "appended"
+        ]
+        store.close()
+
+if __name__ == "__main__":
+    test_document_store_roundtrip()
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.llm.embedding_cache import EmbeddingCache
+
+def test_embedding_cache():
+    """Test cache hits, misses and least-recently-used eviction."""
+    print("\n====== TEST: EMBEDDING CACHE ======")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = EmbeddingCache(os.path.join(tmp_dir, "cache.sqlite3"), max_entries=2)
+        model = "text-embedding-3-small"
+        vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+        cache.put_many(model, ["first", "second"], vectors[:2])
+        results = cache.get_many(model, ["first", "second", "third"])
+        print(f"Lookup results: {results}")
+        assert np.array_equal(results[0], vectors[0])
+        assert np.array_equal(results[1], vectors[1])
+        assert results[2] is None
+
+        # Touch "second" so that "first" becomes the eviction candidate.
+        cache.get_many(model, ["second"])
+        cache.put_many(model, ["third"], vectors[2:])
+        results = cache.get_many(model, ["first", "second", "third"])
+        assert results[0] is None
+        assert results[1] is not None and results[2] is not None
+
+        # Entries are scoped to the model that produced them.
+        assert cache.get_many("other-model", ["second"]) == [None]
+
+        stats = cache.stats()
+        print(f"Cache stats: {stats}")
+        assert stats["entries"] == 2
+        cache.close()
+
+if __name__ == "__main__":
+    test_embedding_cache()
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import threading
+import openai
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.http_client import close_shared_session, shared_session
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.vision_analyser import VisionAnalyzer
+from electroninja.llm.embedders import OpenAIEmbedder
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_POST(self):
+        KeepAliveHandler.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_http_client():
+    """Test that all OpenAI clients share one pooled keep-alive session with per-call timeouts."""
+    print("\n====== TEST: SHARED HTTP CLIENT ======")
+
+    close_shared_session()
+    config = Config()
+    config.OPENAI_API_KEY = "test-key"
+    config.RESPONSE_CACHE_ENABLED = False
+    config.LLM_MAX_CONNECTIONS = 4
+    config.LLM_CONNECT_TIMEOUT = 3
+    config.LLM_REQUEST_TIMEOUT = 30
+
+    provider = OpenAIProvider(config)
+    vision = VisionAnalyzer(config)
+    embedder = OpenAIEmbedder(config)
+    session = shared_session()
+    assert openai.requestssession is session and openai.api_key == "test-key"
+    assert provider.request_timeout == vision.request_timeout == embedder.request_timeout == (3, 30)
+    assert session.get_adapter("https://api.openai.com")._pool_maxsize == 4
+
+    # Every call carries the configured timeout
+    calls = []
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        return {"data": [{"index": 0, "embedding": [0.0] * embedder.dim}]}
+    original_create = openai.Embedding.create
+    openai.Embedding.create = fake_create
+    try:
+        embedder.embed(["an RC filter"])
+    finally:
+        openai.Embedding.create = original_create
+    assert calls[0]["request_timeout"] == (3, 30)
+
+    # openai recycles its per-thread session by closing it; the shared pool survives
+    session.close()
+    assert shared_session() is session
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+        def post(i):
+            response = session.post(url, json={"i": i}, timeout=(3, 30))
+            return response.json()["ok"]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert all(pool.map(post, range(40)))
+        print(f"40 requests from 4 threads used {len(KeepAliveHandler.connections)} connections")
+        assert len(KeepAliveHandler.connections) <= 4
+    finally:
+        server.shutdown()
+        server.server_close()
+        close_shared_session()
+    assert openai.requestssession is None and shared_session() is not session
+    close_shared_session()
+
+if __name__ == "__main__":
+    test_http_client()
@@ -15,10 +15,7 @@ logging.basicConfig(level=logging.INFO)
 def test_vision_description(prompt_id):
     """Test vision description of circuit images using prompt_id and iteration for description loading."""
     # Build the image path based on prompt_id and iteration (for informational display)
-    image_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-        "data", "output", f"prompt{prompt_id}", f"output0", "image.png"
-    )
+    image_path = os.path.join(Config.OUTPUT_DIR, f"prompt{prompt_id}", "output0", "image.png")
     
     print("\n====== TEST: IMAGE DESCRIPTION ======")
     print(f"Image path: {image_path}")
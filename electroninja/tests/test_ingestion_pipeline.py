@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.ingestion import IngestionPipeline, iter_examples
+from electroninja.llm.rate_limit import RateLimiter
+from electroninja.llm.vector_store import VectorStore
+
+def make_config(tmp_dir):
+    config = Config()
+    config.EXAMPLES_DIR = tmp_dir
+    config.VECTOR_DB_INDEX = os.path.join(tmp_dir, "faiss_index.bin")
+    config.VECTOR_DB_DOCUMENTS = os.path.join(tmp_dir, "documents.bin")
+    config.VECTOR_DB_METADATA = os.path.join(tmp_dir, "metadata_list.pkl")
+    config.VECTOR_DB_MANIFEST = os.path.join(tmp_dir, "ingest_manifest.json")
+    config.VECTOR_DB_INDEX_INFO = os.path.join(tmp_dir, "index_info.json")
+    config.VECTOR_DB_LEXICAL = os.path.join(tmp_dir, "lexical_index.npz")
+    config.VECTOR_DB_SNAPSHOTS = os.path.join(tmp_dir, "snapshots")
+    config.EMBEDDING_BACKEND = "local"
+    config.EMBEDDING_CACHE_ENABLED = False
+    config.EMBEDDING_BATCH_SIZE = 16
+    config.INGEST_EMBED_WORKERS = 3
+    config.INGEST_READ_WORKERS = 4
+    return config
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ingestion_pipeline():
+    """Test streaming metadata parsing, the rate limiter and concurrent ingestion."""
+    print("\n====== TEST: INGESTION PIPELINE ======")
+
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_second=2, tokens_per_minute=600, clock=clock, sleep=lambda s: None)
+    assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now = 10.0
+    assert limiter.reserve(600) == 0.0
+    assert limiter.reserve(300) == 30.0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        examples = []
+        for i in range(150):
+            path = os.path.join(tmp_dir, f"divider_{i}.asc")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"Version 4\nSYMBOL res 16 16 R0\nSYMATTR InstName R1\nSYMATTR Value {i + 1}k\n"
+                        f"SYMBOL res 16 96 R0\nSYMATTR InstName R2\nSYMATTR Value {2 * i + 1}k")
+            examples.append({"asc_path": path, "description": f"Divider [{i}], \"{i + 1}k\" over {2 * i + 1}k ⏚"})
+
+        # A JSON array decoded in chunks much smaller than an example, and JSON Lines
+        array_path = os.path.join(tmp_dir, "metadata.json")
+        with open(array_path, "w", encoding="utf-8") as f:
+            json.dump(examples, f, indent=2, ensure_ascii=False)
+        assert list(iter_examples(array_path, chunk_size=7)) == examples
+        lines_path = os.path.join(tmp_dir, "metadata.jsonl")
+        with open(lines_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(example) for example in examples[:10]) + "\n\n")
+        assert list(iter_examples(lines_path)) == examples[:10]
+
+        config = make_config(tmp_dir)
+        store = VectorStore(config)
+        pipeline = IngestionPipeline(store, config, limiter=RateLimiter(requests_per_second=1000))
+        stats = pipeline.run(iter_examples(array_path))
+        assert stats["added"] == 150 and stats["failed"] == 0 and stats["duplicates"] == 0
+        # The single writer applies batches in file order
+        manifest = store.manifest
+        assert [manifest[example["asc_path"]]["id"] for example in examples] == list(range(150))
+        assert store.search(examples[42]["description"], top_k=1)[0]["metadata"]["asc_path"] == examples[42]["asc_path"]
+        assert store.save()
+
+        # A rerun from JSON Lines keeps the first ten and removes the rest
+        store = VectorStore(config)
+        stats = IngestionPipeline(store, config).run(iter_examples(lines_path))
+        assert stats["unchanged"] == 10 and stats["added"] == 0 and stats["removed"] == 140
+        assert store.get_document_count() == 10
+
+if __name__ == "__main__":
+    test_ingestion_pipeline()
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.llm.lexical_index import LexicalIndex, tokenize, reciprocal_rank_fusion
+
+EXAMPLES = [
+    "A voltage divider with two 1kΩ resistors and a 5V source\n\n"
+    "Version 4\nSYMBOL res 16 16 R0\nSYMATTR InstName R1\nSYMATTR Value 1k",
+    "An RC low-pass filter with a 1kΩ resistor and a 100nF capacitor\n\n"
+    "Version 4\nSYMBOL res 16 16 R0\nSYMATTR Value 1000\nSYMBOL cap 64 16 R0\nSYMATTR Value 100n",
+    "A zener regulator using a 5.1V zener diode\n\n"
+    "Version 4\nSYMBOL zener 16 16 R0\nSYMATTR Value BZX84C5V1",
+]
+
+def test_lexical_search():
+    """Test BM25 ranking over descriptions and ASC tokens, persistence and removal."""
+    print("\n====== TEST: LEXICAL SEARCH ======")
+
+    # SPICE values are canonicalized so "1k", "1000" and "1kΩ" match.
+    assert "val:1000" in tokenize("SYMATTR Value 1k")
+    assert "val:1000" in tokenize("a 1kΩ resistor")
+    assert "val:1e-07" in tokenize("SYMATTR Value 100n")
+
+    index = LexicalIndex()
+    for doc_id, text in enumerate(EXAMPLES):
+        index.add(text, doc_id)
+
+    results = index.search("capacitor filter", top_k=3)
+    print(f"'capacitor filter' -> {results}")
+    assert results[0][0] == 1
+
+    results = index.search("diode regulator", top_k=3)
+    print(f"'diode regulator' -> {results}")
+    assert results[0][0] == 2
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "lexical_index.npz")
+        index.save(path)
+        loaded = LexicalIndex.load(path)
+        assert loaded.search("diode regulator", top_k=3) == results
+
+    # Removing a document leaves the ids of the others unchanged.
+    index.remove([0])
+    assert index.search("diode regulator", top_k=1)[0][0] == 2
+
+    # Adding under an existing id replaces that document.
+    index.add("A full-wave bridge rectifier with four diodes", 2)
+    assert len(index) == 2
+    assert index.search("bridge rectifier", top_k=1)[0][0] == 2
+    assert index.search("zener", top_k=1) == []
+
+    fused = reciprocal_rank_fusion([[(1, 0.9), (2, 0.5)], [(2, 7.0), (0, 3.0)]], top_k=3)
+    print(f"Fused ranking: {fused}")
+    assert fused[0][0] == 2
+
+if __name__ == "__main__":
+    test_lexical_search()
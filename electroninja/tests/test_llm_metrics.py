@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm import metrics
+from electroninja.llm.metrics import MetricsRegistry, close_session, metrics_session, percentile, process_metrics
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
+from electroninja.llm.vision_analyser import VisionAnalyzer
+from electroninja.llm.request_scheduler import RequestScheduler
+
+ASC = "Version 4\nSHEET 1 880 680\nSYMBOL res 288 112 R90\nSYMATTR InstName R1\n"
+
+USAGE = {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200,
+         "prompt_tokens_details": {"cached_tokens": 768}}
+
+def fake_create(**kwargs):
+    if kwargs.get("stream"):
+        def stream():
+            for line in ASC.splitlines(keepends=True):
+                yield openai.util.convert_to_openai_object({"choices": [{"delta": {"content": line}}]})
+            if kwargs.get("stream_options", {}).get("include_usage"):
+                yield openai.util.convert_to_openai_object({"choices": [], "usage": USAGE})
+        return stream()
+    if "FAIL" in str(kwargs["messages"]):
+        raise openai.error.InvalidRequestError("bad request", None)
+    return openai.util.convert_to_openai_object({
+        "choices": [{"message": {"content": "Y"}}],
+        "usage": USAGE,
+    })
+
+async def fake_acreate(**kwargs):
+    await asyncio.sleep(0.01)
+    return fake_create(**kwargs)
+
+def test_llm_metrics():
+    """Test per-call token, latency, queue wait and cost metrics per session and per process."""
+    print("\n====== TEST: LLM METRICS ======")
+
+    assert percentile([], 0.99) == 0.0
+    assert percentile([float(i) for i in range(1, 101)], 0.99) == 99.0
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+
+    config = Config()
+    config.RESPONSE_CACHE_ENABLED = False
+    config.FAST_PATH_CLASSIFIER = False
+    process_calls = len(process_metrics().calls())
+
+    original_create, original_acreate = openai.ChatCompletion.create, openai.ChatCompletion.acreate
+    openai.ChatCompletion.create, openai.ChatCompletion.acreate = fake_create, fake_acreate
+    try:
+        provider = OpenAIProvider(config)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image_path = os.path.join(tmp_dir, "circuit.png")
+            with open(image_path, "wb") as f:
+                f.write(b"\x89PNG fake image")
+
+            with metrics_session("metrics-test") as session:
+                assert provider.generate_chat_response("hi") == "Y"
+                assert provider.generate_asc_code("A resistor").startswith("Version 4")
+                assert provider.generate_chat_response("FAIL") == "Error generating chat response"
+                assert VisionAnalyzer(config).analyze_circuit_image(image_path, "Is it right?") == "Y"
+            # Calls outside the block are not attributed to the session
+            provider.generate_chat_response("hi")
+
+            chat = session.calls(method="generate_chat_response")
+            assert len(chat) == 2 and chat[0]["model"] == config.CHAT_MODEL
+            assert chat[0]["prompt_tokens"] == 1000 and chat[0]["completion_tokens"] == 200
+            assert not chat[0]["estimated"] and chat[0]["attempts"] == 1
+            assert chat[0]["latency"] >= 0 and chat[0]["queue_wait"] >= 0
+            # Cached prompt tokens are billed at half the input price
+            assert chat[0]["cached_tokens"] == 768
+            assert abs(chat[0]["cost"] - ((232 + 768 * 0.5) * 0.15 + 200 * 0.6) / 1e6) < 1e-12
+            assert chat[1]["error"].startswith("InvalidRequestError")
+
+            # Streams are counted locally once consumed
+            stream = session.calls(method="generate_asc_code")[0]
+            assert stream["estimated"] and stream["completion_tokens"] == len(ASC.strip()) // 4
+            assert stream["first_token"] is not None
+
+            vision = session.calls(method="analyze_circuit_image")[0]
+            assert vision["model"] == config.OPENAI_VISION_MODEL
+
+            summary = session.summary()
+            print(json.dumps({k: summary[k] for k in ("calls", "errors", "cost", "latency")}, indent=2))
+            assert summary["calls"] == 4 and summary["errors"] == 1
+            assert set(summary["by_method"]) == {"generate_chat_response", "generate_asc_code", "analyze_circuit_image"}
+            assert summary["by_model"][config.OPENAI_VISION_MODEL]["cost"] > 0
+            assert session.slowest_method() in summary["by_method"]
+            assert len(process_metrics().calls()) == process_calls + 5
+
+            path = session.dump(os.path.join(tmp_dir, "metrics.json"))
+            with open(path, encoding="utf-8") as f:
+                dumped = json.load(f)
+            assert dumped["summary"]["calls"] == 4 and len(dumped["calls"]) == 4
+
+        # Measurement mode asks streams for usage, so their cached share is reported too
+        report_config = Config()
+        report_config.RESPONSE_CACHE_ENABLED = False
+        report_config.PROMPT_CACHE_REPORT = True
+        provider.scheduler = RequestScheduler(report_config)
+        with metrics_session("metrics-cache") as session:
+            provider.generate_asc_code("A resistor")
+            provider.generate_chat_response("hi")
+        stream = session.calls(method="generate_asc_code")[0]
+        assert not stream["estimated"] and stream["cached_tokens"] == 768
+        report = session.prompt_cache_report()
+        print(json.dumps(report, indent=2))
+        assert report["generate_asc_code"]["cached_ratio"] == 0.768
+        assert session.summary()["cached_ratio"] == 0.768
+
+        # Concurrent async calls in one session are all attributed to it
+        async_provider = AsyncOpenAIProvider(config)
+
+        async def run():
+            with metrics_session("metrics-async") as session:
+                await asyncio.gather(
+                    async_provider.generate_chat_response("a"),
+                    async_provider.evaluate_circuit_request("b"),
+                    async_provider.create_description(None, "c"),
+                )
+            return session
+
+        session = asyncio.run(run())
+        assert sorted(call["method"] for call in session.calls()) == [
+            "create_description", "evaluate_circuit_request", "generate_chat_response"
+        ]
+    finally:
+        openai.ChatCompletion.create, openai.ChatCompletion.acreate = original_create, original_acreate
+
+    # Ended sessions are forgotten, so the session table does not grow without bound
+    assert close_session("metrics-test") is not None and close_session("metrics-test") is None
+    with metrics_session("metrics-closed", close=True) as session:
+        assert "metrics-closed" in metrics._sessions
+    assert "metrics-closed" not in metrics._sessions and session.name == "session metrics-closed"
+
+    registry = MetricsRegistry("bounded", max_calls=2)
+    for i in range(3):
+        registry.record({"method": "m", "model": "x", "latency": i, "queue_wait": 0, "error": None,
+                         "estimated": False, "prompt_tokens": 1, "completion_tokens": 1, "cost": 0})
+    assert [call["latency"] for call in registry.calls()] == [1, 2]
+
+if __name__ == "__main__":
+    test_llm_metrics()
@@ -0,0 +1,33 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.llm.embedders import HashingEmbedder
+
+def test_local_embedder():
+    """Test that the offline embedder is deterministic and ranks related circuits closer."""
+    print("\n====== TEST: LOCAL EMBEDDER ======")
+
+    embedder = HashingEmbedder(dim=256)
+    texts = [
+        "An RC low-pass filter with a 1k resistor and a 100nF capacitor",
+        "RC low pass filter using a resistor and capacitor",
+        "A zener diode voltage regulator",
+    ]
+    vectors = embedder.embed(texts)
+    print(f"Embedder: {embedder.name}, shape: {vectors.shape}")
+    assert vectors.shape == (3, 256)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+    # A fresh instance produces identical vectors (no per-process hash salt).
+    assert np.array_equal(HashingEmbedder(dim=256).embed(texts), vectors)
+
+    similarity = vectors @ vectors.T
+    print(f"Similarities:\n{similarity}")
+    assert similarity[0, 1] > similarity[0, 2]
+
+if __name__ == "__main__":
+    test_local_embedder()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.backend.request_evaluator import RequestEvaluator
+from electroninja.backend.create_description import CreateDescription
+from electroninja.backend.vision_processor import VisionProcessor
+
+def test_output_paths():
+    """Test that per-prompt files are written and read under OUTPUT_DIR, not the working directory."""
+    print("\n====== TEST: OUTPUT PATHS ======")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Config()
+        config.OUTPUT_DIR = os.path.join(tmp_dir, "output")
+        config.RESPONSE_CACHE_ENABLED = False
+        elsewhere = os.path.join(tmp_dir, "elsewhere")
+        os.makedirs(elsewhere)
+
+        cwd = os.getcwd()
+        os.chdir(elsewhere)
+        try:
+            provider = OpenAIProvider(config)
+            evaluator = RequestEvaluator(provider)
+            describer = CreateDescription(provider)
+
+            evaluator.save_components("V, C", 1)
+            describer.save_description("An RC low-pass filter", 1)
+            assert evaluator.load_components(1) == "V, C"
+            assert describer.load_description(1) == "An RC low-pass filter"
+            assert evaluator.merge_components("R", 1, 2) == "V, C, R"
+
+            os.makedirs(os.path.join(config.OUTPUT_DIR, "prompt1", "output0"))
+            with open(os.path.join(config.OUTPUT_DIR, "prompt1", "output0", "code.asc"), "w", encoding="utf-8") as f:
+                f.write("Version 4\nSHEET 1 880 680\nSYMBOL res 288 112 R90\nSYMATTR InstName R1\n")
+            with open(os.path.join(config.OUTPUT_DIR, "prompt1", "output0", "image.png"), "wb") as f:
+                f.write(b"\x89PNG fake image")
+            assert evaluator.list_components(1) == "R"
+            evaluator.save_components("V, C", 1)
+
+            # The prompts pick up what the backend wrote
+            prompt = provider._build_prompt("An RC low-pass filter", None, 1)
+            assert "=== CAPACITOR INSTRUCTIONS ===" in prompt
+            refinement = provider._build_refinement_prompt(1, 0, "Missing ground")
+            assert "An RC low-pass filter" in refinement and "Description not found." not in refinement
+            assert "SYMATTR InstName R1" in refinement
+
+            seen = []
+
+            def fake_create(**kwargs):
+                seen.append(kwargs["messages"][-1]["content"][0]["text"])
+                return openai.util.convert_to_openai_object({"choices": [{"message": {"content": "Y"}}]})
+
+            original_create = openai.ChatCompletion.create
+            openai.ChatCompletion.create = fake_create
+            try:
+                assert VisionProcessor(config).analyze_circuit_image(1, 0) == "Y"
+            finally:
+                openai.ChatCompletion.create = original_create
+            assert "An RC low-pass filter" in seen[0]
+
+            # Nothing was written relative to the working directory
+            assert os.listdir(elsewhere) == []
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_output_paths()
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.backend.pipeline import PipelineScheduler, RequestPipeline
+from electroninja.backend.request_evaluator import RequestEvaluator
+from electroninja.backend.create_description import CreateDescription
+from electroninja.llm import metrics
+
+class FakeProvider:
+    """Stands in for AsyncOpenAIProvider: the evaluation takes 0.1s, other calls 0.2s."""
+
+    def __init__(self, evaluation, config, evaluate_delay=0.1):
+        self.config = config
+        self.evaluation = evaluation
+        self.evaluate_delay = evaluate_delay
+        self.calls = []
+        self.cancelled = []
+
+    async def _call(self, name, result):
+        self.calls.append(name)
+        try:
+            await asyncio.sleep(0.2 if name != "evaluate" else self.evaluate_delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        return result
+
+    async def evaluate_circuit_request(self, prompt):
+        return await self._call("evaluate", self.evaluation)
+
+    async def create_description(self, previous_description, new_request):
+        return await self._call("describe", f"A circuit: {new_request}")
+
+    async def generate_chat_response(self, prompt):
+        return await self._call("chat", "Sure!")
+
+def test_pipeline():
+    """Test that evaluate, describe and chat overlap and that speculative work is cancelled on 'N'."""
+    print("\n====== TEST: REQUEST PIPELINE ======")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Config()
+        config.OUTPUT_DIR = os.path.join(tmp_dir, "output")
+        output_dir = config.OUTPUT_DIR
+        # Files land in OUTPUT_DIR whatever the working directory
+        cwd = os.getcwd()
+        os.makedirs(os.path.join(tmp_dir, "elsewhere"))
+        os.chdir(os.path.join(tmp_dir, "elsewhere"))
+        try:
+            provider = FakeProvider("R, C", config)
+            pipeline = RequestPipeline(provider, RequestEvaluator(provider), CreateDescription(provider))
+            start = time.perf_counter()
+            result = asyncio.run(pipeline.process("An RC low-pass filter", 1))
+            elapsed = time.perf_counter() - start
+            print(f"Circuit request: {elapsed:.2f}s for {provider.calls}")
+            assert sorted(provider.calls) == ["chat", "describe", "evaluate"]
+            assert elapsed < 0.35  # sequential would take 0.5s
+            assert result["is_circuit"] and result["components"] == "R, C"
+            assert result["description"] == "A circuit: An RC low-pass filter"
+            assert result["chat_response"] == "Sure!"
+            # The prompt's metrics session ends with the pipeline
+            assert result["metrics"].name == "session prompt1" and "prompt1" not in metrics._sessions
+            with open(os.path.join(output_dir, "prompt1", "description.txt"), encoding="utf-8") as f:
+                assert f.read() == result["description"]
+            with open(os.path.join(output_dir, "prompt1", "components.txt"), encoding="utf-8") as f:
+                assert f.read() == "R, C"
+
+            # A follow-up request builds on the previous description and components
+            result = asyncio.run(pipeline.process("Add a diode", 2, previous_prompt_id=1))
+            assert result["components"] == "R, C, R, C"
+
+            # Not a circuit: the speculative description is cancelled and nothing is saved
+            provider = FakeProvider("N", config)
+            pipeline = RequestPipeline(provider, RequestEvaluator(provider), CreateDescription(provider))
+            result = asyncio.run(pipeline.process("Tell me a joke", 3))
+            stages = result["stages"]
+            assert provider.cancelled == ["describe"]
+            assert stages["describe"]["status"] == "cancelled"
+            assert stages["save_description"]["status"] == "cancelled"
+            assert stages["save_components"]["status"] == "cancelled"
+            assert result["description"] is None and result["chat_response"] == "Sure!"
+            assert not os.path.exists(os.path.join(output_dir, "prompt3"))
+
+            # The description can finish before the evaluation says 'N': it is not saved or returned
+            provider = FakeProvider("N", config, evaluate_delay=0.3)
+            pipeline = RequestPipeline(provider, RequestEvaluator(provider), CreateDescription(provider))
+            result = asyncio.run(pipeline.process("Tell me a joke", 4))
+            assert result["stages"]["describe"]["status"] == "done"
+            assert result["stages"]["save_description"]["status"] == "cancelled"
+            assert result["description"] is None and not result["is_circuit"]
+            assert not os.path.exists(os.path.join(output_dir, "prompt4"))
+            assert os.listdir(".") == []
+        finally:
+            os.chdir(cwd)
+
+    # Stage graphs are validated before anything runs
+    scheduler = PipelineScheduler()
+    scheduler.add_stage("a", lambda b: b, depends_on=["b"])
+    scheduler.add_stage("b", lambda a: a, depends_on=["a"])
+    try:
+        scheduler.order()
+        assert False, "cycle not detected"
+    except ValueError as e:
+        assert "cycle" in str(e)
+
+    # A failing stage only takes its dependents down with it
+    async def boom():
+        raise RuntimeError("boom")
+    scheduler = PipelineScheduler()
+    scheduler.add_stage("boom", boom)
+    scheduler.add_stage("after", lambda boom: boom, depends_on=["boom"])
+    scheduler.add_stage("other", lambda: 42)
+    report = asyncio.run(scheduler.run())
+    assert report["boom"]["status"] == "failed" and report["after"]["status"] == "failed"
+    assert report["other"]["result"] == 42
+
+if __name__ == "__main__":
+    test_pipeline()
@@ -0,0 +1,85 @@
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.prompts.registry import INSTRUCTIONS_DIR, PromptRegistry, component_key
+from electroninja.llm.providers.openai import OpenAIProvider
+
+def test_prompt_registry():
+    """Test cached instruction files, the precomputed component blocks, stable prompt prefixes and cwd-independent prompt building."""
+    print("\n====== TEST: PROMPT REGISTRY ======")
+
+    assert component_key("V, R, C") == "CR"
+    assert component_key("l, d") == "DL"
+    assert component_key("N") == ""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        instructions_dir = os.path.join(tmp_dir, "instructions")
+        shutil.copytree(INSTRUCTIONS_DIR, instructions_dir)
+        registry = PromptRegistry(instructions_dir, check_interval=0)
+
+        block = registry.instruction_block("V, R, D")
+        assert block.startswith("=== GENERAL INSTRUCTIONS ===")
+        assert "=== RESISTOR INSTRUCTIONS ===" in block and "=== DIODE INSTRUCTIONS ===" in block
+        assert "CAPACITOR" not in block
+        # Component instructions are sorted by letter whatever the evaluation order
+        assert block.index("=== DIODE INSTRUCTIONS ===") < block.index("=== RESISTOR INSTRUCTIONS ===")
+        assert registry.instruction_block("D, R") == block
+        assert len(registry._blocks) == 16 and registry.loads == 6
+
+        # Repeated prompts do not touch the files again
+        for components in ("R", "C", "L", "D", "RCLD", ""):
+            registry.instruction_block(components)
+        assert registry.loads == 6
+
+        # An edited instruction file is picked up and the blocks are rebuilt
+        path = os.path.join(instructions_dir, "diode_instruct.txt")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\nUse the 1N4148 model.")
+        assert "1N4148" in registry.instruction_block("D")
+        assert "1N4148" in registry.instruction_block("RD")
+        assert registry.loads == 7
+
+        # Prompts are built from the configured output folder, whatever the working directory
+        config = Config()
+        config.OUTPUT_DIR = os.path.join(tmp_dir, "output")
+        config.RESPONSE_CACHE_ENABLED = False
+        prompt_dir = os.path.join(config.OUTPUT_DIR, "prompt3")
+        os.makedirs(os.path.join(prompt_dir, "output0"))
+        with open(os.path.join(prompt_dir, "components.txt"), "w", encoding="utf-8") as f:
+            f.write("V, C")
+        with open(os.path.join(prompt_dir, "description.txt"), "w", encoding="utf-8") as f:
+            f.write("An RC low-pass filter")
+        with open(os.path.join(prompt_dir, "output0", "code.asc"), "w", encoding="utf-8") as f:
+            f.write("Version 4\nSHEET 1 880 680")
+
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            provider = OpenAIProvider(config)
+            prompt = provider._build_prompt("An RC low-pass filter", None, 3)
+            assert "=== CAPACITOR INSTRUCTIONS ===" in prompt and "RESISTOR" not in prompt
+            assert "=== CIRCUIT DESCRIPTION ===\nAn RC low-pass filter" in prompt
+            refinement = provider._build_refinement_prompt(3, 0, "Missing ground")
+            assert "An RC low-pass filter" in refinement and "SHEET 1 880 680" in refinement
+            # Generation and refinement start with the same static prefix; per-request content follows it
+            block = provider.prompts.instruction_block("V, C")
+            assert prompt.startswith(block) and refinement.startswith(block)
+            assert refinement.index("Missing ground") > len(block)
+
+            # Session files are re-checked on every prompt
+            with open(os.path.join(prompt_dir, "components.txt"), "w", encoding="utf-8") as f:
+                f.write("V, R, L")
+            prompt = provider._build_prompt("An RL circuit", None, 3)
+            assert "=== INDUCTOR INSTRUCTIONS ===" in prompt and "CAPACITOR" not in prompt
+            # ... and never kept in memory, which holds only the instruction files
+            assert all(path.startswith(INSTRUCTIONS_DIR) for path in provider.prompts._files)
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_prompt_registry()
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import types
+import asyncio
+import tempfile
+import threading
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.request_classifier import RequestClassifier
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
+
+CASES = [
+    # Clear circuit requests: answered locally with the component letters
+    ("Make a circuit with a 5V battery and a resistor 2 ohms in parallel with a capacitor 1mF.", "R, C"),
+    ("Create a circuit with two resistors in parallel", "R"),
+    ("Design a simple RC low-pass filter", "R, C"),
+    ("a 10kΩ pull-up and 100 nF decoupling", "R, C"),
+    ("add a 10 uH inductor and an LED", "L, D"),
+    ("bridge rectifier with smoothing capacitor", "C, D"),
+    ("an LC tank at 1 MHz", "C, L"),
+    ("add an LED", "D"),
+    # Clearly unrelated: answered 'N' locally
+    ("Tell me about World War 2", "N"),
+    ("It's 70F today, what should I wear", "N"),
+    ("What events led to the fall of Rome?", "N"),
+    # Ambiguous: left to the model
+    ("What events led to the French resistance?", None),
+    ("Tell me about Henry VIII", None),
+    ("replace the resistor with a capacitor", None),
+    ("design a 555 timer", None),
+    ("a 5V battery circuit", None),
+    ("hi", None),
+    # A single component without a circuit verb may not be about circuits at all
+    ("what colour LEDs look best on a desk?", None),
+    ("are resistors expensive", None),
+]
+
+def test_request_classifier():
+    """Test the local fast path in front of the circuit relevance evaluation."""
+    print("\n====== TEST: FAST-PATH REQUEST CLASSIFIER ======")
+
+    classifier = RequestClassifier()
+    for prompt, expected in CASES:
+        result = classifier.classify(prompt)
+        print(f"{str(result):>6} | {prompt}")
+        assert result == expected, (prompt, result)
+    assert classifier.decisions == {"letters": 8, "N": 3, "escalated": 8}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Config()
+        config.RESPONSE_CACHE_ENABLED = False
+        config.FAST_PATH_LOG_PATH = os.path.join(tmp_dir, "decisions.jsonl")
+        calls = []
+        def fake_create(**kwargs):
+            calls.append(kwargs)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="N"))])
+
+        original_create = openai.ChatCompletion.create
+        openai.ChatCompletion.create = fake_create
+        try:
+            provider = OpenAIProvider(config)
+            assert provider.evaluate_circuit_request("Design a simple RC low-pass filter") == "R, C"
+            assert provider.evaluate_circuit_request("Tell me about World War 2") == "N"
+            assert calls == []
+            assert provider.evaluate_circuit_request("Tell me about Henry VIII") == "N"
+            assert provider.evaluate_circuit_request("Design a simple RC low-pass filter", use_fast_path=False) == "N"
+            assert len(calls) == 2
+        finally:
+            openai.ChatCompletion.create = original_create
+
+        with open(config.FAST_PATH_LOG_PATH, encoding="utf-8") as f:
+            decisions = [json.loads(line) for line in f]
+        assert [d["decision"] for d in decisions] == ["letters", "N", "escalated", "model"]
+        assert decisions[3] == {**decisions[3], "prompt": "Tell me about Henry VIII", "result": "N"}
+
+        # The async provider appends to the log off the event loop
+        async_provider = AsyncOpenAIProvider(config)
+        log_threads = []
+        record = async_provider.request_classifier._record
+
+        def spy(entry):
+            log_threads.append(threading.get_ident())
+            record(entry)
+
+        async_provider.request_classifier._record = spy
+
+        async def fake_complete(method, model, messages):
+            return "N"
+
+        async def run():
+            async_provider._complete = fake_complete
+            assert await async_provider.evaluate_circuit_request("Design a simple RC low-pass filter") == "R, C"
+            assert await async_provider.evaluate_circuit_request("Tell me about Henry VIII") == "N"
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+        assert len(log_threads) == 3 and loop_thread not in log_threads
+
+if __name__ == "__main__":
+    test_request_classifier()
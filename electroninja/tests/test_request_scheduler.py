@@ -0,0 +1,190 @@
+import os
+import sys
+import types
+import random
+import asyncio
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.request_scheduler import RequestScheduler, estimate_message_tokens, is_retryable
+from electroninja.llm.providers.openai import OpenAIProvider
+
+def fake_response(content):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+def test_request_scheduler():
+    """Test per-model pacing, Retry-After, jittered backoff, error classification and bounded concurrency (streams included)."""
+    print("\n====== TEST: REQUEST SCHEDULER ======")
+
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    config = Config()
+    config.LLM_DEFAULT_RPM = 60
+    config.LLM_DEFAULT_TPM = 0
+    config.LLM_MODEL_RATE_LIMITS = {"slow-model": (6, 0)}
+    config.LLM_MAX_RETRIES = 3
+    config.LLM_BACKOFF_BASE = 1
+    config.LLM_BACKOFF_MAX = 30
+    scheduler = RequestScheduler(config, clock=lambda: now[0], sleep=sleep, rng=random.Random(0))
+
+    calls = []
+    outcomes = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs["model"])
+        outcome = outcomes.pop(0) if outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        return fake_response("ok")
+
+    original_create = openai.ChatCompletion.create
+    openai.ChatCompletion.create = fake_create
+    try:
+        messages = [{"role": "user", "content": "hello"}]
+
+        # A burst queues at 1 request per second; another model has its own bucket
+        for _ in range(3):
+            scheduler.create(model="gpt-4o-mini", messages=messages)
+        assert sleeps == [1.0, 1.0]
+        scheduler.create(model="slow-model", messages=messages)
+        assert sleeps == [1.0, 1.0]
+        assert scheduler.stats["gpt-4o-mini"]["queue_wait"] == 2.0
+
+        # A 429 with Retry-After pauses the model for at least that long, then succeeds
+        now[0] += 100
+        sleeps.clear()
+        outcomes[:] = [openai.error.RateLimitError("slow down", headers={"retry-after": "7"})]
+        assert scheduler.create(model="gpt-4o-mini", messages=messages).choices[0].message.content == "ok"
+        assert sleeps and sleeps[0] >= 7
+        assert scheduler.stats["gpt-4o-mini"]["rate_limited"] == 1
+
+        # Server errors back off with jitter, bounded by base * 2^attempt; each retry
+        # is still paced by the model's bucket (6 per minute: one every 10s)
+        sleeps.clear()
+        outcomes[:] = [openai.error.ServiceUnavailableError("busy"), openai.error.Timeout("slow")]
+        scheduler.create(model="slow-model", messages=messages)
+        assert len(sleeps) == 4 and sleeps[0] <= 1 and sleeps[2] <= 2
+        assert abs(sleeps[0] + sleeps[1] - 10) < 1e-9 and abs(sleeps[2] + sleeps[3] - 10) < 1e-9
+
+        # Retries stop after LLM_MAX_RETRIES and the last error reaches the caller
+        calls.clear()
+        outcomes[:] = [openai.error.APIError("bad gateway", http_status=502)] * 4
+        try:
+            scheduler.create(model="gpt-4o-mini", messages=messages)
+            assert False, "error not raised"
+        except openai.error.APIError:
+            pass
+        assert len(calls) == 4
+
+        # Errors that cannot succeed on retry are raised at once
+        for error in (openai.error.InvalidRequestError("bad prompt", None),
+                      openai.error.RateLimitError("quota", code="insufficient_quota"),
+                      openai.error.AuthenticationError("no key")):
+            assert not is_retryable(error)
+            calls.clear()
+            outcomes[:] = [error]
+            try:
+                scheduler.create(model="gpt-4o-mini", messages=messages)
+                assert False, "error not raised"
+            except type(error):
+                pass
+            assert len(calls) == 1
+
+        # Providers go through the scheduler, so a transient failure no longer becomes an "Error" string
+        provider_config = Config()
+        provider_config.RESPONSE_CACHE_ENABLED = False
+        provider_config.LLM_BACKOFF_BASE = 0.01
+        provider = OpenAIProvider(provider_config)
+        provider.scheduler = RequestScheduler(provider_config)
+        outcomes[:] = [openai.error.APIConnectionError("reset")]
+        assert provider.generate_chat_response("hi") == "ok"
+    finally:
+        openai.ChatCompletion.create = original_create
+
+    # Vision messages count their images
+    assert estimate_message_tokens([{"role": "user", "content": [
+        {"type": "text", "text": "x" * 40}, {"type": "image_url", "image_url": {"url": "data:"}}
+    ]}]) == 10 + 765
+
+    # Async calls share the buckets and at most LLM_MAX_CONCURRENT_REQUESTS run at once
+    config = Config()
+    config.LLM_DEFAULT_RPM = 0
+    config.LLM_DEFAULT_TPM = 0
+    config.LLM_MAX_CONCURRENT_REQUESTS = 2
+    config.LLM_BACKOFF_BASE = 0.01
+    scheduler = RequestScheduler(config)
+    in_flight = [0, 0]
+    failures = [openai.error.TryAgain("again")]
+
+    async def fake_acreate(**kwargs):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        if failures:
+            raise failures.pop()
+        return fake_response("ok")
+
+    async def run():
+        return await asyncio.gather(*[
+            scheduler.acreate(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}]) for _ in range(6)
+        ])
+
+    original_acreate = openai.ChatCompletion.acreate
+    openai.ChatCompletion.acreate = fake_acreate
+    try:
+        responses = asyncio.run(run())
+    finally:
+        openai.ChatCompletion.acreate = original_acreate
+    assert [r.choices[0].message.content for r in responses] == ["ok"] * 6
+    assert in_flight[1] == 2
+    assert scheduler.stats["gpt-4o-mini"]["retries"] == 1
+
+    # A stream holds its slot until it ends, and threads and event loops share the limit
+    config.LLM_MAX_CONCURRENT_REQUESTS = 1
+    scheduler = RequestScheduler(config)
+    messages = [{"role": "user", "content": "hi"}]
+
+    def fake_stream(**kwargs):
+        def stream():
+            for part in ("a", "b"):
+                yield {"choices": [{"delta": {"content": part}}]}
+        return stream()
+
+    order = []
+
+    async def queued():
+        await scheduler.acreate(model="gpt-4o-mini", messages=messages)
+        order.append("async")
+
+    async def run_with_stream(stream):
+        task = asyncio.create_task(queued())
+        await asyncio.sleep(0.05)
+        assert order == [] and scheduler._slots.in_use == 1
+        order.append("stream")
+        assert [chunk["choices"][0]["delta"]["content"] for chunk in stream] == ["a", "b"]
+        await task
+
+    openai.ChatCompletion.create, openai.ChatCompletion.acreate = fake_stream, fake_acreate
+    try:
+        stream = scheduler.create(model="gpt-4o-mini", messages=messages, stream=True)
+        asyncio.run(run_with_stream(stream))
+        assert order == ["stream", "async"] and scheduler._slots.in_use == 0
+
+        # Closing a stream early frees its slot too
+        stream = scheduler.create(model="gpt-4o-mini", messages=messages, stream=True)
+        next(stream)
+        stream.close()
+        assert scheduler._slots.in_use == 0
+    finally:
+        openai.ChatCompletion.create, openai.ChatCompletion.acreate = original_create, original_acreate
+
+if __name__ == "__main__":
+    test_request_scheduler()
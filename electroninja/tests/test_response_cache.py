@@ -0,0 +1,112 @@
+import os
+import sys
+import types
+import asyncio
+import tempfile
+import threading
+import openai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.response_cache import ResponseCache
+from electroninja.llm.providers.openai import OpenAIProvider
+from electroninja.llm.providers.async_openai import AsyncOpenAIProvider
+
+def test_response_cache():
+    """Test the memory + disk response cache, its TTLs, bypass flag and metrics."""
+    print("\n====== TEST: LLM RESPONSE CACHE ======")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "responses.sqlite3")
+        now = [1000.0]
+        ttls = {"evaluate_circuit_request": 60, "create_description": 0}
+        cache = ResponseCache(path, ttls, memory_entries=2, clock=lambda: now[0])
+
+        messages = [{"role": "user", "content": "Is an RC filter a circuit?"}]
+        key = ResponseCache.make_key("gpt-4o-mini", messages)
+        assert key != ResponseCache.make_key("gpt-4o", messages)
+        assert key != ResponseCache.make_key("gpt-4o-mini", messages, {"temperature": 0})
+
+        assert cache.get("evaluate_circuit_request", key) is None
+        cache.put("evaluate_circuit_request", key, "R, C", latency=2.0)
+        assert cache.get("evaluate_circuit_request", key) == "R, C"
+        # Methods without a positive TTL are never cached
+        cache.put("create_description", key, "An RC filter")
+        assert cache.get("create_description", key) is None
+
+        # Pushed out of the two-entry memory tier, the entry is still on disk
+        for i in range(3):
+            cache.put("evaluate_circuit_request", f"other{i}", "N")
+        assert cache.get("evaluate_circuit_request", key) == "R, C"
+        methods = cache.stats()["methods"]["evaluate_circuit_request"]
+        assert methods["memory_hits"] == 1 and methods["disk_hits"] == 1
+        assert methods["seconds_saved"] == 4.0
+
+        # The disk tier survives a restart; entries expire after their TTL
+        cache.close()
+        cache = ResponseCache(path, ttls, clock=lambda: now[0])
+        assert cache.get("evaluate_circuit_request", key) == "R, C"
+        now[0] += 61
+        assert cache.get("evaluate_circuit_request", key) is None
+        cache.close()
+
+        # Provider calls: a repeated request skips the API, use_cache=False bypasses it
+        config = Config()
+        config.RESPONSE_CACHE_PATH = os.path.join(tmp_dir, "provider.sqlite3")
+        config.FAST_PATH_CLASSIFIER = False
+        calls = []
+        def fake_create(**kwargs):
+            calls.append(kwargs)
+            prompt = kwargs["messages"][-1]["content"]
+            content = "A description" if "circuit descriptions" in prompt else "V, R, C"
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+        original_create = openai.ChatCompletion.create
+        openai.ChatCompletion.create = fake_create
+        try:
+            provider = OpenAIProvider(config)
+            assert provider.evaluate_circuit_request("an RC filter") == "V, R, C"
+            assert OpenAIProvider(config).evaluate_circuit_request("an RC filter") == "V, R, C"
+            assert len(calls) == 1
+            assert provider.evaluate_circuit_request("an RC filter", use_cache=False) == "V, R, C"
+            assert len(calls) == 2
+            assert provider.create_description(None, "an RC filter") == "A description"
+            assert provider.create_description(None, "an RC filter") == "A description"
+            assert len(calls) == 3
+        finally:
+            openai.ChatCompletion.create = original_create
+
+        stats = provider.response_cache.stats()
+        print(stats)
+        assert stats["hits"] == 2 and stats["misses"] == 2 and stats["disk_entries"] == 2
+
+        # The async provider shares the cache but never touches SQLite on the event loop
+        async_provider = AsyncOpenAIProvider(config)
+        cache_threads = []
+        get, put = async_provider.response_cache.get, async_provider.response_cache.put
+
+        def spy(method):
+            def wrapper(*args):
+                cache_threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        async_provider.response_cache.get, async_provider.response_cache.put = spy(get), spy(put)
+
+        async def fake_complete(method, model, messages):
+            return "A description"
+
+        async def run():
+            async_provider._complete = fake_complete
+            hit = await async_provider.evaluate_circuit_request("an RC filter")
+            miss = await async_provider.create_description(None, "a diode clipper")
+            return threading.get_ident(), hit, miss
+
+        loop_thread, hit, miss = asyncio.run(run())
+        assert hit == "V, R, C" and miss == "A description"
+        assert len(cache_threads) == 3 and loop_thread not in cache_threads
+        provider.response_cache.close()
+
+if __name__ == "__main__":
+    test_response_cache()
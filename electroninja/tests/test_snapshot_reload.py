@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm import snapshot
+from electroninja.llm.embedders import HashingEmbedder
+from electroninja.llm.vector_store import VectorStore
+
+def make_config(tmp_dir):
+    config = Config()
+    for name in ("INDEX", "DOCUMENTS", "METADATA", "MANIFEST", "INDEX_INFO", "LEXICAL", "SNAPSHOTS"):
+        path = getattr(Config, f"VECTOR_DB_{name}")
+        setattr(config, f"VECTOR_DB_{name}", os.path.join(tmp_dir, os.path.basename(path)))
+    config.EMBEDDING_CACHE_ENABLED = False
+    return config
+
+def test_snapshot_reload():
+    """Test that saves commit whole snapshots and a running reader picks up new ones."""
+    print("\n====== TEST: SNAPSHOT RELOAD ======")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_config(tmp_dir)
+        config.VECTOR_DB_RELOAD_INTERVAL = 0
+        config.VECTOR_DB_KEEP_SNAPSHOTS = 2
+
+        writer = VectorStore(config, embedder=HashingEmbedder(dim=64))
+        writer.add_documents(["A voltage divider with two resistors", "A zener diode voltage regulator"])
+        assert writer.save()
+        assert snapshot.current_version(config.VECTOR_DB_SNAPSHOTS) == 1
+
+        reader = VectorStore(config, embedder=HashingEmbedder(dim=64))
+        assert reader.snapshot_version == 1
+        assert reader.get_document_count() == 2
+
+        # A staging directory left by a crashed writer is never visible to readers.
+        snapshot.begin_snapshot(config.VECTOR_DB_SNAPSHOTS)
+        assert not reader.reload_if_changed()
+
+        writer.add_documents(["An LC tank circuit with an inductor and a capacitor"])
+        assert writer.save()
+        writer.remove_documents([0])
+        assert writer.save()
+
+        # Searches keep running while the reader swaps in the new snapshot.
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(reader.search("zener regulator", top_k=1)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        assert reader.reload_if_changed()
+        for thread in threads:
+            thread.join()
+        assert all(len(result) == 1 for result in results)
+
+        print(f"Reader at snapshot v{reader.snapshot_version} with {reader.get_document_count()} documents")
+        assert reader.snapshot_version == 3
+        assert reader.get_document_count() == 2
+        assert reader.search("LC tank inductor", top_k=1)[0]["asc_code"].startswith("An LC tank")
+        assert snapshot.list_versions(config.VECTOR_DB_SNAPSHOTS) == [2, 3]
+
+        # Local changes are made on an in-memory copy and are not overwritten by reloads.
+        reader.add_documents(["A common emitter amplifier"])
+        writer.add_documents(["A full-wave bridge rectifier"])
+        assert writer.save()
+        assert not reader.reload_if_changed()
+        assert reader.get_document_count() == 3
+
+if __name__ == "__main__":
+    test_snapshot_reload()
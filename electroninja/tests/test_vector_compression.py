@@ -0,0 +1,42 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+from electroninja.llm import index_factory
+from electroninja.llm.vector_compression import compression_report, format_report, truncate_dimensions
+
+def test_vector_compression():
+    """Test storage codes and the recall-vs-memory report on synthetic clustered vectors."""
+    print("\n====== TEST: VECTOR COMPRESSION ======")
+
+    assert index_factory.storage_code("float16", 1536) == "SQfp16"
+    assert index_factory.storage_code("pq", 1536) == "PQ384np"
+    assert index_factory.storage_code("pq", 100, pq_m=30) == "PQ25np"
+    # PQ needs a large training set; small corpora use SQ8 instead.
+    assert index_factory.choose_index_factory(500, "PQ384np") == "SQ8"
+    assert index_factory.choose_index_factory(20000, "SQ8").endswith(",SQ8")
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 128))
+    vectors = (centers[rng.integers(0, 20, 600)] + 0.5 * rng.standard_normal((600, 128))).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    shortened = truncate_dimensions(vectors, 64)
+    assert shortened.shape == (600, 64)
+    assert np.allclose(np.linalg.norm(shortened, axis=1), 1.0, atol=1e-5)
+
+    rows = compression_report(faiss, vectors, dims=[128, 64], storages=["float32", "float16", "sq8"],
+                              ks=(1, 5), num_queries=100)
+    print(format_report(rows, ks=(1, 5)))
+    by_config = {(row["dim"], row["storage"]): row for row in rows}
+    assert by_config[(128, "float32")]["recall@5"] == 1.0
+    assert by_config[(128, "float32")]["compression"] == 1.0
+    assert by_config[(128, "sq8")]["compression"] > 3
+    assert by_config[(128, "sq8")]["recall@5"] > 0.9
+    assert by_config[(64, "float16")]["compression"] > by_config[(128, "float16")]["compression"]
+
+if __name__ == "__main__":
+    test_vector_compression()
@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import pickle
+import tempfile
+import threading
+import faiss
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electroninja.config.settings import Config
+from electroninja.llm.embedders import HashingEmbedder
+from electroninja.llm.vector_store import VectorStore
+
+def make_config(tmp_dir):
+    config = Config()
+    config.VECTOR_DB_INDEX = os.path.join(tmp_dir, "faiss_index.bin")
+    config.VECTOR_DB_DOCUMENTS = os.path.join(tmp_dir, "documents.bin")
+    config.VECTOR_DB_METADATA = os.path.join(tmp_dir, "metadata_list.pkl")
+    config.VECTOR_DB_MANIFEST = os.path.join(tmp_dir, "ingest_manifest.json")
+    config.VECTOR_DB_INDEX_INFO = os.path.join(tmp_dir, "index_info.json")
+    config.VECTOR_DB_LEXICAL = os.path.join(tmp_dir, "lexical_index.npz")
+    config.VECTOR_DB_SNAPSHOTS = os.path.join(tmp_dir, "snapshots")
+    config.EMBEDDING_CACHE_ENABLED = False
+    return config
+
+class SlowEmbedder(HashingEmbedder):
+    """Blocks embedding texts that mention "slow" until released."""
+
+    def __init__(self, dim):
+        super().__init__(dim=dim)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def embed(self, texts):
+        if any("slow" in text for text in texts):
+            self.started.set()
+            assert self.release.wait(10)
+        return super().embed(texts)
+
+def test_vector_store_updates():
+    """Test that documents keep stable ids through in-place updates, removals and reloads."""
+    print("\n====== TEST: VECTOR STORE UPDATES ======")
+
+    texts = [
+        "A voltage divider with two resistors",
+        "An RC low-pass filter with a resistor and a capacitor",
+        "A zener diode voltage regulator",
+        "An LC tank circuit with an inductor and a capacitor",
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for factory in ("Flat", "HNSW16"):
+            os.makedirs(os.path.join(tmp_dir, factory))
+            config = make_config(os.path.join(tmp_dir, factory))
+            config.VECTOR_INDEX_FACTORY = factory
+            store = VectorStore(config, embedder=HashingEmbedder(dim=64))
+            store.clear()
+            ids = store.add_documents(texts, [{"n": i} for i in range(len(texts))])
+            assert ids == [0, 1, 2, 3]
+
+            assert store.remove_documents([1]) == 1
+            assert store.update_document(2, "A full-wave bridge rectifier with four diodes", {"n": "bridge"})
+            assert not store.update_document(1, "removed documents cannot be updated")
+            assert store.save()
+
+            store = VectorStore(config, embedder=HashingEmbedder(dim=64))
+            print(f"{factory}: ids {store.documents.ids}")
+            assert store.documents.ids == [0, 2, 3]
+            assert store.search("bridge rectifier diodes", top_k=1)[0]["metadata"]["n"] == "bridge"
+            assert store.search("LC tank inductor", top_k=1)[0]["metadata"]["n"] == 3
+            # Ids are never reused, even after the highest id was touched.
+            assert store.add_documents(["A common emitter amplifier"]) == [4]
+
+        # Nor after clearing the store
+        assert store.clear() and store.add_documents(["A Colpitts oscillator"]) == [5]
+
+        # Embedding happens outside the write lock, so searches keep running meanwhile
+        config.VECTOR_INDEX_FACTORY = "Flat"
+        embedder = SlowEmbedder(dim=64)
+        store = VectorStore(config, embedder=embedder)
+        added = []
+        writer = threading.Thread(target=lambda: added.extend(store.add_documents(["A slow RC oscillator"])))
+        writer.start()
+        assert embedder.started.wait(10)
+        for mode in ("vector", "lexical", "hybrid"):
+            assert store.search("LC tank inductor", top_k=1, mode=mode)[0]["metadata"]["n"] == 3
+        embedder.release.set()
+        writer.join(10)
+        assert added == [4]
+        assert store.search("slow RC oscillator", top_k=1, mode="lexical")[0]["asc_code"] == "A slow RC oscillator"
+
+        # So is the query embedding: writes and other searches go ahead while it runs
+        embedder.started.clear()
+        embedder.release.clear()
+        found = []
+        reader = threading.Thread(target=lambda: found.extend(store.search("slow oscillator", top_k=1, mode="vector")))
+        reader.start()
+        assert embedder.started.wait(10)
+        assert store.add_documents(["A Wien bridge oscillator"]) == [5]
+        assert store.search("LC tank inductor", top_k=1, mode="lexical")[0]["metadata"]["n"] == 3
+        embedder.release.set()
+        reader.join(10)
+        assert len(found) == 1
+
+def test_legacy_metadata_migration():
+    """Test that migrating pickled metadata keeps the pickle and happens only once."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_config(tmp_dir)
+        embedder = HashingEmbedder(dim=64)
+        texts = ["A voltage divider with two resistors", "A zener diode voltage regulator"]
+        index = faiss.IndexFlatL2(64)
+        index.add(embedder.embed(texts))
+        faiss.write_index(index, config.VECTOR_DB_INDEX)
+        with open(config.VECTOR_DB_INDEX_INFO, "w", encoding="utf-8") as f:
+            json.dump({"embedder": embedder.name}, f)
+        with open(config.VECTOR_DB_METADATA, "wb") as f:
+            pickle.dump([{"asc_code": text} for text in texts], f)
+
+        store = VectorStore(config, embedder=embedder)
+        assert store.documents.ids == [0, 1]
+        assert os.path.exists(config.VECTOR_DB_METADATA) and os.path.exists(config.VECTOR_DB_DOCUMENTS)
+        store.documents.close()
+
+        # Later loads read the document store, even if the pickle no longer matches
+        with open(config.VECTOR_DB_METADATA, "wb") as f:
+            pickle.dump([], f)
+        store = VectorStore(config, embedder=embedder)
+        assert len(store.documents) == 2
+        store.documents.close()
+
+if __name__ == "__main__":
+    test_vector_store_updates()
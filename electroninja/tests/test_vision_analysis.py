@@ -15,20 +15,14 @@ logging.basicConfig(level=logging.INFO)
 def test_vision_analysis(prompt_id, iteration):
     """Test vision analysis of circuit images using prompt_id and iteration for description loading."""
     # Build the image path based on prompt_id and iteration (for informational display)
-    image_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-        "data", "output", f"prompt{prompt_id}", f"output{iteration}", "image.png"
-    )
+    image_path = os.path.join(Config.OUTPUT_DIR, f"prompt{prompt_id}", f"output{iteration}", "image.png")
     
     print("\n====== TEST: VISION ANALYSIS ======")
     print(f"Image path: {image_path}")
     print(f"Prompt ID: {prompt_id}, Iteration: {iteration}")
     
     # Load and print the full circuit description
-    description_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-        "data", "output", f"prompt{prompt_id}", "description.txt"
-    )
+    description_path = os.path.join(Config.OUTPUT_DIR, f"prompt{prompt_id}", "description.txt")
     if os.path.exists(description_path):
         with open(description_path, "r", encoding="utf-8") as f:
             circuit_description = f.read().strip()
@@ -4,8 +4,8 @@ Ingest examples from metadata.json into the FAISS vector store
 """
 
 import os
-import json
 import sys
+import time
 import logging
 from dotenv import load_dotenv
 
@@ -15,102 +15,95 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import the vector store
 from electroninja.config.settings import Config
 from electroninja.llm.vector_store import VectorStore
+from electroninja.llm.dedup import format_clusters
+from electroninja.llm.ingestion import IngestionPipeline, iter_examples
 from electroninja.config import logger
 
 # Load environment variables (needed for OpenAI API key)
 load_dotenv()
 
-def extract_clean_asc_code(asc_code):
+def ingest_examples(config=None, metadata_path=None):
     """
-    Extract only the pure ASC code starting from 'Version 4'
-    This ensures we don't include descriptions in the ASC code examples
-    """
-    if "Version 4" in asc_code:
-        idx = asc_code.find("Version 4")
-        return asc_code[idx:].strip()
-    return asc_code.strip()
-
-def ingest_examples():
-    """
-    Ingest examples from metadata.json into the vector database
+    Ingest examples from metadata.json (or metadata.jsonl) into the vector database.
+    
+    The file is streamed through an IngestionPipeline: ASC files are read in
+    parallel, new and changed examples are embedded concurrently within the
+    configured rate limits, and a single writer updates the index.
+    
+    A manifest stored next to the index records the content hash and document id
+    of every ingested example, so a rerun only embeds new or changed examples,
+    updates changed ones in place under their existing ids, removes deleted
+    ones and leaves unchanged vectors alone.
+    
+    With Config.DEDUP_ENABLED, examples that are the same circuit (identical
+    canonical ASC) or near duplicates (embedding similarity of at least
+    Config.DEDUP_SIMILARITY_THRESHOLD) are collapsed to one representative.
     """
     # Initialize the vector store with config
-    config = Config()
+    config = config or Config()
     vector_store = VectorStore(config)
     
-    # Path to metadata.json
-    metadata_path = os.path.join(config.EXAMPLES_DIR, "metadata.json")
+    # Path to metadata.json, or metadata.jsonl for large example sets
+    if metadata_path is None:
+        metadata_path = os.path.join(config.EXAMPLES_DIR, "metadata.json")
+        jsonl_path = os.path.join(config.EXAMPLES_DIR, "metadata.jsonl")
+        if not os.path.exists(metadata_path) and os.path.exists(jsonl_path):
+            metadata_path = jsonl_path
     
     # Check if metadata file exists
     if not os.path.exists(metadata_path):
         logger.error(f"Metadata file not found: {metadata_path}")
         return False
     
-    # Read metadata.json
+    # An index without a matching manifest (e.g. built before manifests existed)
+    # cannot be diffed, so rebuild it from scratch instead of duplicating vectors.
+    if len(vector_store.manifest) != vector_store.get_document_count():
+        logger.warning("Index and ingestion manifest are out of sync; rebuilding the index")
+        vector_store.clear()
+    
     logger.info(f"Reading examples from {metadata_path}")
-    with open(metadata_path, "r", encoding="utf-8") as f:
-        examples = json.load(f)
+    start = time.perf_counter()
+    pipeline = IngestionPipeline(vector_store, config)
+    try:
+        stats = pipeline.run(iter_examples(metadata_path))
+    except ValueError as e:
+        logger.error(f"Failed to read {metadata_path}: {str(e)}")
+        return False
+    elapsed = time.perf_counter() - start
     
-    logger.info(f"Found {len(examples)} examples in metadata.json")
+    if pipeline.deduplicator is not None:
+        clusters = pipeline.deduplicator.report()
+        for line in format_clusters(clusters):
+            logger.info(line)
+        if clusters:
+            logger.info(f"Collapsed {stats['duplicates']} near-duplicate examples into {len(clusters)} representatives")
+    if stats["failed"]:
+        logger.warning(f"Failed to ingest {stats['failed']} of {stats['failed'] + stats['added'] + stats['updated']} examples")
     
-    # Process each example
-    successful = 0
-    for i, example in enumerate(examples, 1):
-        asc_path = example.get("asc_path")
-        description = example.get("description", "No description")
-        
-        # Validate path
-        if not asc_path:
-            logger.warning(f"Example {i}: Missing asc_path")
-            continue
-            
-        # Convert relative path if needed
-        if not os.path.isabs(asc_path):
-            asc_path = os.path.join(config.BASE_DIR, asc_path)
-        
-        # Check if file exists
-        if not os.path.exists(asc_path):
-            logger.warning(f"Example {i}: File not found: {asc_path}")
-            continue
-        
-        # Read ASC file
-        try:
-            with open(asc_path, "r", encoding="utf-8") as asc_file:
-                full_asc_code = asc_file.read().strip()
-            
-            # Extract only the pure ASC code starting from "Version 4"
-            clean_asc_code = extract_clean_asc_code(full_asc_code)
-            
-            # Store the embeddings for the combined text, but keep ASC code separate from description
-            # in the storage to avoid duplication in prompts
-            combined_text = f"{description}\n\n{clean_asc_code}"
-            
-            # Add to vector store with properly separated fields
-            if vector_store.add_document(combined_text, metadata={
-                "asc_path": asc_path, 
-                "description": description, 
-                "pure_asc_code": clean_asc_code
-            }):
-                successful += 1
-                logger.info(f"Example {i}: Added {os.path.basename(asc_path)}")
-            else:
-                logger.warning(f"Example {i}: Failed to add {os.path.basename(asc_path)}")
-        
-        except Exception as e:
-            logger.error(f"Example {i}: Error processing {os.path.basename(asc_path)}: {str(e)}")
+    logger.info(f"{stats['unchanged']} examples unchanged, {stats['added']} added, {stats['updated']} updated, "
+                f"{stats['removed']} removed, {stats['duplicates']} duplicates skipped")
+    embedded = stats["added"] + stats["updated"]
+    if embedded:
+        logger.info(f"Embedded {embedded} examples in {elapsed:.1f}s ({embedded / elapsed:.1f}/s, "
+                    f"{pipeline.limiter.waited:.1f}s waiting for rate limits)")
     
-    # Save the index
-    if successful > 0:
-        if vector_store.save():
-            logger.info(f"Successfully ingested {successful} examples out of {len(examples)}")
-            logger.info(f"Index saved to {config.VECTOR_DB_INDEX}")
-            logger.info(f"Metadata saved to {config.VECTOR_DB_METADATA}")
-            return True
-        else:
-            logger.error("Failed to save index")
+    # Switch index type (e.g. flat -> IVF) as the corpus grows, then train it.
+    rebuilt = vector_store.ensure_index_type()
+    vector_store.train_index()
+    if not stats["removed"] and embedded == 0 and not rebuilt:
+        if stats["failed"]:
+            logger.error("No examples were successfully ingested")
             return False
+        logger.info("Index is already up to date")
+        return True
+    
+    # Save the index
+    if vector_store.save():
+        logger.info(f"Successfully ingested {embedded} examples")
+        logger.info(f"Snapshot v{vector_store.snapshot_version} saved to {config.VECTOR_DB_SNAPSHOTS}")
+        return True
     else:
-        logger.error("No examples were successfully ingested")
+        logger.error("Failed to save index")
         return False
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Report retrieval recall against index memory for shortened and quantized vectors
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from dotenv import load_dotenv
+
+# Setup path to allow imports from the main project
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from electroninja.config.settings import Config
+from electroninja.llm.vector_store import VectorStore
+from electroninja.llm.vector_compression import DEFAULT_STORAGES, compression_report, format_report
+from electroninja.config import logger
+
+load_dotenv()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--dims", type=int, nargs="+", help="Dimensions to evaluate (default: full size and halvings down to 64)")
+    parser.add_argument("--storages", nargs="+", default=list(DEFAULT_STORAGES), help="float32, float16, sq8 and/or pq")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 10], help="Recall cut-offs")
+    parser.add_argument("--queries", type=int, default=200, help="Stored vectors used as queries")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    config = Config()
+    vector_store = VectorStore(config)
+    if vector_store.get_document_count() == 0:
+        logger.error("The vector store is empty; run ingest_examples.py first")
+        return 1
+    if vector_store.index_factory.split(",")[-1].startswith(("SQ", "PQ")):
+        logger.warning(f"The stored index uses {vector_store.index_factory}; the reference vectors are not full precision")
+
+    _, vectors = vector_store.get_vectors()
+    rows = compression_report(
+        vector_store.faiss, vectors,
+        dims=args.dims, storages=args.storages, ks=args.k,
+        num_queries=args.queries, pq_m=config.VECTOR_INDEX_PQ_M, nprobe=config.VECTOR_INDEX_NPROBE
+    )
+    print(f"{len(vectors)} vectors from {vector_store.embedding_model}, {min(args.queries, len(vectors))} queries\n")
+    print(format_report(rows, ks=args.k))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "embedder": vector_store.embedding_model,
+                "count": len(vectors),
+                "rows": rows,
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(main())